@@ -0,0 +1,69 @@
+import threading
+from dataclasses import replace
+from typing import Callable
+
+from chess_game_data import ChessGameData
+from computer import SearchLimits, get_ai_move, get_book_move
+from move import Move
+
+
+class BackgroundSearch:
+    # runs get_ai_move in a worker thread so the caller (the pygame event
+    # loop) never blocks, on_done gets the move from the worker thread
+    # unless the search was cancelled first
+    def __init__(
+        self,
+        game_data: ChessGameData,
+        on_done: Callable[['BackgroundSearch', Move | None], None],
+        limits: SearchLimits | None = None,
+        ponder_move: Move | None = None
+    ):
+        self.on_done = on_done
+        self.limits = limits
+        self.stop_event = threading.Event()
+        # set once self.move is final, before on_done runs, the thread is
+        # still alive while on_done posts so is_alive can't tell
+        self.done = threading.Event()
+        self.move: Move | None = None
+        # when pondering, the player's expected reply is played on the copy
+        # and the computer's answer to it is searched on the player's time
+        self.ponder_move = ponder_move
+        # the worker searches its own headless copy, the caller keeps
+        # drawing (and reading) the real board in the meantime
+        board = type(game_data.board).from_compact(position=game_data.board.to_compact())
+        # the book looks at the last move for en passant, which a compact
+        # copy only has once the ponder move is played on it, so without
+        # one it's asked here on the real board
+        if ponder_move is None:
+            self.book_move = get_book_move(game_data=game_data)
+        else:
+            board.make_move(x1=ponder_move.x1, y1=ponder_move.y1, x2=ponder_move.x2, y2=ponder_move.y2)
+            self.book_move = get_book_move(game_data=replace(game_data, board=board))
+        self.game_data = replace(game_data, board=board, opening_book=None)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> 'BackgroundSearch':
+        self.thread.start()
+        return self
+
+    def is_running(self) -> bool:
+        return not self.done.is_set()
+
+    def cancel(self):
+        # aborts the search at its next node and waits for the worker
+        self.stop_event.set()
+        if self.thread.is_alive():
+            self.thread.join()
+
+    def _run(self):
+        try:
+            if self.book_move is not None:
+                self.move = self.book_move
+            else:
+                self.move = get_ai_move(game_data=self.game_data, limits=self.limits, stop_event=self.stop_event)
+        finally:
+            # a failed search still finishes, with no move, so the caller
+            # isn't left waiting for it
+            self.done.set()
+            if not self.stop_event.is_set():
+                self.on_done(self, self.move)
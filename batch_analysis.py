@@ -0,0 +1,169 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+from typing import Iterable, Iterator
+
+from board import Board, BoardAnalyzer
+from chess_enums import ChessPieceColor
+from chess_game_data import ChessGameData
+from computer import UNLIMITED_DEPTH, SearchLimits, get_ai_move, get_game_mode
+from epd import parse_epd_line
+from exceptions import InvalidFenException
+from search_stats import SearchStats
+from tablebase import Tablebases
+from transposition_table import TranspositionTable
+
+# tablebases opened by this worker process, by directory, so that their
+# files are mapped once instead of once per position
+_tablebases: dict[str, Tablebases] = dict()
+
+
+def analyse_position(fen: str, limits: SearchLimits, quiescence_depth: int = 4, tt_size_mb: float = 4, tablebase_directory: str | None = None) -> dict:
+    # runs in a worker process, searches fen for its side to move and
+    # reports the score from white's point of view
+    try:
+        board = Board.from_fen(fen)
+    except InvalidFenException as exception:
+        return {'fen': fen, 'error': exception.reason}
+
+    computers_color = board.get_side_to_move()
+    game_data = ChessGameData(
+        game_mode=get_game_mode(computers_color=computers_color),
+        board=board,
+        board_analyzer=BoardAnalyzer(),
+        depth=limits.max_depth if limits.max_depth is not None else UNLIMITED_DEPTH,
+        quiescence_depth=quiescence_depth,
+        transposition_table=TranspositionTable(size_mb=tt_size_mb),
+        tablebases=_get_tablebases(tablebase_directory) if tablebase_directory is not None else None
+    )
+    stats = SearchStats()
+    move = get_ai_move(game_data=game_data, limits=limits, stats=stats)
+
+    score = stats.score
+    if score is None and move is None:
+        # no legal moves, the position itself is mate or stalemate
+        score = BoardAnalyzer.evaluate_board(game_mode=game_data.game_mode, board=board)
+    # minimax scores from the computer's opponent's point of view
+    if score is not None and computers_color is ChessPieceColor.WHITE:
+        score = -score
+
+    return {
+        'fen': fen,
+        'best_move': move.to_uci() if move is not None else None,
+        'score': score,
+        'depth': stats.completed_depth,
+        'nodes': stats.nodes,
+        'seconds': stats.get_elapsed_time(),
+    }
+
+
+def _get_tablebases(directory: str) -> Tablebases:
+    if directory not in _tablebases:
+        _tablebases[directory] = Tablebases(directory=directory)
+    return _tablebases[directory]
+
+
+def analyse_positions(
+    positions: Iterable[tuple[str, dict[str, str]]],
+    limits: SearchLimits,
+    workers: int | None = None,
+    quiescence_depth: int = 4,
+    tt_size_mb: float = 4,
+    tablebase_directory: str | None = None,
+    max_pending: int | None = None,
+    executor: Executor | None = None
+) -> Iterator[dict]:
+    # fans (fen, EPD operations) pairs out over worker processes and yields
+    # results in the order they finish, at most max_pending positions are
+    # read ahead so memory doesn't grow with the size of the input
+    workers = workers if workers is not None else os.cpu_count() or 1
+    max_pending = max_pending if max_pending is not None else workers * 4
+    if (max_pending < 1):
+        raise ValueError(f"max_pending can't be less than 1 (given: {max_pending})")
+
+    owns_executor = executor is None
+    if owns_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+
+    pending: dict[Future, tuple[int, dict[str, str]]] = dict()
+
+    def collect(futures: set[Future]) -> Iterator[dict]:
+        for future in futures:
+            (index, operations) = pending.pop(future)
+            result = {'index': index, **future.result()}
+            if 'id' in operations:
+                result['id'] = operations['id']
+            yield result
+
+    try:
+        for (index, (fen, operations)) in enumerate(positions):
+            if len(pending) >= max_pending:
+                (done, _) = wait(pending, return_when=FIRST_COMPLETED)
+                yield from collect(done)
+            future = executor.submit(analyse_position, fen, limits, quiescence_depth, tt_size_mb, tablebase_directory)
+            pending[future] = (index, operations)
+
+        while pending:
+            (done, _) = wait(pending, return_when=FIRST_COMPLETED)
+            yield from collect(done)
+    finally:
+        if owns_executor:
+            # an abandoned generator drops whatever hasn't started yet
+            executor.shutdown(cancel_futures=True)
+
+def read_positions(lines: Iterable[str]) -> Iterator[tuple[str, dict[str, str]]]:
+    # blank lines and "#" comments are skipped, as in epd.iter_epd_lines
+    for line in lines:
+        if (line := line.strip()) and not line.startswith('#'):
+            yield parse_epd_line(line)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='analyse every position of a FEN/EPD file and write the results as JSON lines')
+    parser.add_argument('input', help="FEN/EPD file, '-' reads standard input")
+    parser.add_argument('--output', help='JSONL file to write, defaults to standard output')
+    parser.add_argument('--depth', type=int, help='maximum search depth per position')
+    parser.add_argument('--time-limit', type=float, help='seconds per position')
+    parser.add_argument('--node-limit', type=int, help='nodes per position')
+    parser.add_argument('--quiescence-depth', type=int, default=4)
+    parser.add_argument('--workers', type=int, help='defaults to the number of CPUs')
+    parser.add_argument('--tt-size', type=float, default=4, help='transposition table size per position in MB')
+    parser.add_argument('--tablebases', help='directory of endgame tables written by tablebase.py')
+    args = parser.parse_args(argv)
+
+    if args.depth is None and args.time_limit is None and args.node_limit is None:
+        parser.error('at least one of --depth, --time-limit and --node-limit is needed')
+    if args.workers is not None and args.workers < 1:
+        parser.error(f"workers can't be less than 1 (given: {args.workers})")
+    try:
+        limits = SearchLimits(max_depth=args.depth, time_limit=args.time_limit, node_limit=args.node_limit)
+    except ValueError as exception:
+        parser.error(str(exception))
+
+    input_file = sys.stdin if args.input == '-' else open(args.input)
+    output_file = sys.stdout if args.output is None else open(args.output, 'w')
+    try:
+        results = analyse_positions(
+            positions=read_positions(input_file),
+            limits=limits,
+            workers=args.workers,
+            quiescence_depth=args.quiescence_depth,
+            tt_size_mb=args.tt_size,
+            tablebase_directory=args.tablebases
+        )
+        for result in results:
+            output_file.write(json.dumps(result) + '\n')
+            output_file.flush()
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,19 +1,112 @@
 from copy import deepcopy
+from typing import Callable, Iterator, Self
 
-from chess_enums import ChessPieceColor, GameMode
-from exceptions import ChessPieceNotFoundException, KingPieceNotFoundException
-from historical_move import HistoricalMove, Move
-from intefaces import IChessPiece, IBoard
+from chess_enums import ChessPieceColor, ChessPieceType, GameMode
+from exceptions import ChessPieceNotFoundException, InvalidFenException, KingPieceNotFoundException
+from historical_move import HistoricalMove, Move, pack_move_record, unpack_move_record
+from move import get_move
+from intefaces import IChessPiece, IBoard, IChessPieceFactory
+from factory import SimpleChessPieceFactory
+from zobrist import BLACK_TO_MOVE_KEY, PIECE_KEYS, compute_hash
+from position_status import PositionStatus
+from piece_square_tables import ENDGAME_TABLES, MIDGAME_TABLES, PHASE_WEIGHTS, get_positional_score
+from move_strategy import KNIGHT_TARGETS, KING_TARGETS, PAWN_CAPTURE_TARGETS, ROOK_RAYS, BISHOP_RAYS
+
+FEN_PIECE_TYPES: dict[str, ChessPieceType] = {
+    'p': ChessPieceType.PAWN,
+    'n': ChessPieceType.KNIGHT,
+    'b': ChessPieceType.BISHOP,
+    'r': ChessPieceType.ROOK,
+    'q': ChessPieceType.QUEEN,
+    'k': ChessPieceType.KING,
+}
+FEN_PIECE_LETTERS: dict[ChessPieceType, str] = {piece_type: letter for (letter, piece_type) in FEN_PIECE_TYPES.items()}
+
+# (color, piece type, row, col) of every piece, the side to move and the
+# pawns' orientation (see Board.get_pawn_game_mode), plain values only so
+# that it can be pickled and sent to other processes
+CompactPosition = tuple[tuple[tuple[str, str, int, int], ...], str, int | None]
+
+def _to_mask(squares: tuple[tuple[int, int], ...]) -> int:
+    mask = 0
+    for (row, col) in squares:
+        mask |= 1 << (row * 8 + col)
+    return mask
+
+# the move_strategy tables as bit masks for BitBoard, indexed by square
+KNIGHT_MASKS = tuple(_to_mask(targets) for targets in KNIGHT_TARGETS)
+KING_MASKS = tuple(_to_mask(targets) for targets in KING_TARGETS)
+PAWN_CAPTURE_MASKS = {
+    direction: tuple(_to_mask(targets) for targets in table) for (direction, table) in PAWN_CAPTURE_TARGETS.items()
+}
+# (mask, whether it runs towards higher squares, masks of its first n
+# squares) for every non-empty ray of a square, the direction tells which
+# end the nearest piece on the ray is at
+RayMask = tuple[int, bool, tuple[int, ...]]
+
+def _build_ray_masks(ray_table: tuple[tuple[tuple[tuple[int, int], ...], ...], ...]) -> tuple[tuple[RayMask, ...], ...]:
+    return tuple(
+        tuple(
+            (_to_mask(ray), ray[0][0] * 8 + ray[0][1] > square, tuple(_to_mask(ray[:length]) for length in range(len(ray) + 1)))
+            for ray in rays if ray
+        )
+        for (square, rays) in enumerate(ray_table)
+    )
+
+ROOK_RAY_MASKS = _build_ray_masks(ROOK_RAYS)
+BISHOP_RAY_MASKS = _build_ray_masks(BISHOP_RAYS)
+QUEEN_RAY_MASKS = tuple(rook + bishop for (rook, bishop) in zip(ROOK_RAY_MASKS, BISHOP_RAY_MASKS))
+ALL_SQUARES = (1 << 64) - 1
+
+def get_nearest_bit(mask: int, increasing: bool) -> int:
+    # the bit of mask closest to the start of a ray
+    return mask & -mask if increasing else 1 << (mask.bit_length() - 1)
+
+def get_ray_distance(square: int, other: int) -> int:
+    # how many steps along a rook or bishop ray other is from square
+    return max(abs((other >> 3) - (square >> 3)), abs((other & 7) - (square & 7)))
+
+def is_insufficient_material(piece_counts: dict[tuple[ChessPieceColor, ChessPieceType], int], get_bishop_squares: Callable[[], list[int]]) -> bool:
+    # neither side can ever mate with bare kings, a single minor piece or
+    # one bishop each on squares of the same color, the bishops' squares
+    # are only looked up for that last case
+    if any(
+        piece_counts[(color, piece_type)]
+        for color in ChessPieceColor for piece_type in (ChessPieceType.PAWN, ChessPieceType.ROOK, ChessPieceType.QUEEN)
+    ):
+        return False
+
+    minors = {
+        color: piece_counts[(color, ChessPieceType.KNIGHT)] + piece_counts[(color, ChessPieceType.BISHOP)]
+        for color in ChessPieceColor
+    }
+    if minors[ChessPieceColor.WHITE] + minors[ChessPieceColor.BLACK] <= 1:
+        return True
+
+    return (
+        piece_counts[(ChessPieceColor.WHITE, ChessPieceType.BISHOP)] == 1
+        and piece_counts[(ChessPieceColor.BLACK, ChessPieceType.BISHOP)] == 1
+        and minors[ChessPieceColor.WHITE] == minors[ChessPieceColor.BLACK] == 1
+        and len({((square >> 3) + (square & 7)) % 2 for square in get_bishop_squares()}) == 1
+    )
 
 class Board:
-    def __init__(self, pieces: list[IChessPiece], max_history: int = 10000):
+    def __init__(self, pieces: list[IChessPiece], max_history: int = 10000, side_to_move: ChessPieceColor = ChessPieceColor.WHITE):
         self.game_board = [[None] * 8 for _ in range(8)]
         self.white_king = None
         self.black_king = None
         self.white_pieces: set[IChessPiece] = set()
         self.black_pieces: set[IChessPiece] = set()
-        self.game_history: list[HistoricalMove] = list()
+        if (max_history < 1):
+            raise ValueError(f"max_history can't be less than 1 (given: {max_history})")
+        # fixed size ring buffer of packed move records (see
+        # historical_move.pack_move_record) plus the captured pieces, once
+        # it is full the oldest move is overwritten
         self.max_history = max_history
+        self.history_records: list[int] = [0] * max_history
+        self.history_killed_pieces: list[IChessPiece | None] = [None] * max_history
+        self.history_end = 0
+        self.history_length = 0
 
 
         for piece in pieces:
@@ -27,6 +120,40 @@ class Board:
         
         if (not self.white_king): raise KingPieceNotFoundException(color=ChessPieceColor.WHITE)
         if (not self.black_king): raise KingPieceNotFoundException(color=ChessPieceColor.BLACK)
+
+        self.side_to_move = side_to_move
+        self.hash = compute_hash(pieces=pieces, side_to_move=side_to_move)
+
+        # running evaluation terms from white's point of view, kept up to
+        # date by make_move/unmake_move
+        self.material = 0
+        self.midgame_score = 0
+        self.endgame_score = 0
+        self.phase = 0
+        # number of pieces of every (color, type), only captures change it
+        self.piece_counts: dict[tuple[ChessPieceColor, ChessPieceType], int] = {
+            (color, piece_type): 0 for color in ChessPieceColor for piece_type in ChessPieceType
+        }
+        for piece in pieces:
+            self._add_piece_terms(piece=piece, square=piece.get_row() * 8 + piece.get_col(), sign=1)
+
+    def _add_piece_terms(self, piece: IChessPiece, square: int, sign: int):
+        # adds (sign 1) or removes (sign -1) everything a piece contributes
+        # to the running evaluation terms and piece counts
+        key = (piece.get_color(), piece.get_type())
+        self.piece_counts[key] += sign
+        points = piece.get_points()
+        self.material += sign * points if key[0] is ChessPieceColor.WHITE else -sign * points
+        self.midgame_score += sign * MIDGAME_TABLES[key][square]
+        self.endgame_score += sign * ENDGAME_TABLES[key][square]
+        self.phase += sign * PHASE_WEIGHTS[key[1]]
+
+    def _move_evaluation(self, piece: IChessPiece, from_square: int, to_square: int):
+        key = (piece.get_color(), piece.get_type())
+        midgame_table = MIDGAME_TABLES[key]
+        endgame_table = ENDGAME_TABLES[key]
+        self.midgame_score += midgame_table[to_square] - midgame_table[from_square]
+        self.endgame_score += endgame_table[to_square] - endgame_table[from_square]
     
     def make_move(self, x1: int, y1: int, x2: int, y2: int):
         piece = self.get_piece_at(x1, y1)
@@ -39,40 +166,82 @@ class Board:
             else:
                 self.black_pieces.remove(killed_piece)
 
-        if len(self.game_history) >= self.max_history:
-            self.game_history.pop(0)
-        
-        self.game_history.append(
-            HistoricalMove(
-                positions=Move(
-                    x1=x1,
-                    y1=y1,
-                    x2=x2,
-                    y2=y2
-                ),
-                moved_piece=piece,
-                killed_piece=killed_piece
-            )
-        )
+        index = self.history_end
+        self.history_records[index] = pack_move_record(x1, y1, x2, y2)
+        self.history_killed_pieces[index] = killed_piece
+        self.history_end = index + 1 if index + 1 < self.max_history else 0
+        if self.history_length < self.max_history:
+            self.history_length += 1
 
         self.game_board[x2][y2] = self.game_board[x1][y1]
         self.game_board[x1][y1] = None
 
         piece.set_position(x2, y2)
 
+        piece_keys = PIECE_KEYS[(piece.get_color(), piece.get_type())]
+        self.hash ^= piece_keys[x1 * 8 + y1] ^ piece_keys[x2 * 8 + y2] ^ BLACK_TO_MOVE_KEY
+        self._move_evaluation(piece=piece, from_square=x1 * 8 + y1, to_square=x2 * 8 + y2)
+        if killed_piece is not None:
+            self.hash ^= PIECE_KEYS[(killed_piece.get_color(), killed_piece.get_type())][x2 * 8 + y2]
+            self._add_piece_terms(piece=killed_piece, square=x2 * 8 + y2, sign=-1)
+        self.side_to_move = ChessPieceColor.BLACK if self.side_to_move is ChessPieceColor.WHITE else ChessPieceColor.WHITE
+
     def unmake_move(self):
-        if (self.game_history):
-            last_move = self.game_history.pop()
-            self.game_board[last_move.positions.x1][last_move.positions.y1] = last_move.moved_piece
-            self.game_board[last_move.positions.x2][last_move.positions.y2] = last_move.killed_piece
-            last_move.moved_piece.set_position(last_move.positions.x1, last_move.positions.y1)
-
-            if (last_move.killed_piece is not None):
-                if (last_move.killed_piece.get_color() is ChessPieceColor.WHITE):
-                    self.white_pieces.add(last_move.killed_piece)
+        if (self.history_length):
+            index = self.history_end - 1 if self.history_end else self.max_history - 1
+            record = self.history_records[index]
+            killed_piece = self.history_killed_pieces[index]
+            self.history_killed_pieces[index] = None
+            self.history_end = index
+            self.history_length -= 1
+
+            from_square = record & 63
+            to_square = (record >> 6) & 63
+            x1, y1, x2, y2 = from_square >> 3, from_square & 7, to_square >> 3, to_square & 7
+
+            moved_piece = self.game_board[x2][y2]
+            self.game_board[x1][y1] = moved_piece
+            self.game_board[x2][y2] = killed_piece
+            moved_piece.set_position(x1, y1)
+
+            if (killed_piece is not None):
+                if (killed_piece.get_color() is ChessPieceColor.WHITE):
+                    self.white_pieces.add(killed_piece)
                 else:
-                    self.black_pieces.add(last_move.killed_piece)
+                    self.black_pieces.add(killed_piece)
 
+            # xor is its own inverse so replaying make_move's updates restores the key
+            piece_keys = PIECE_KEYS[(moved_piece.get_color(), moved_piece.get_type())]
+            self.hash ^= piece_keys[from_square] ^ piece_keys[to_square] ^ BLACK_TO_MOVE_KEY
+            self._move_evaluation(piece=moved_piece, from_square=to_square, to_square=from_square)
+            if killed_piece is not None:
+                self.hash ^= PIECE_KEYS[(killed_piece.get_color(), killed_piece.get_type())][to_square]
+                self._add_piece_terms(piece=killed_piece, square=to_square, sign=1)
+            self.side_to_move = ChessPieceColor.BLACK if self.side_to_move is ChessPieceColor.WHITE else ChessPieceColor.WHITE
+
+    def peek_history(self) -> tuple[int, IChessPiece | None] | None:
+        # packed record and captured piece of the last move, without
+        # allocating a HistoricalMove
+        if not self.history_length:
+            return None
+
+        index = self.history_end - 1 if self.history_end else self.max_history - 1
+        return (self.history_records[index], self.history_killed_pieces[index])
+
+    def get_last_move(self) -> HistoricalMove | None:
+        if (last_record := self.peek_history()) is None:
+            return None
+
+        (record, killed_piece) = last_record
+        positions = unpack_move_record(record)
+        return HistoricalMove(
+            positions=positions,
+            moved_piece=self.game_board[positions.x2][positions.y2],
+            killed_piece=killed_piece
+        )
+
+    def get_history_length(self) -> int:
+        return self.history_length
 
     def get_piece_at(self, x: int, y: int) -> IChessPiece | None:
         if (0 <= x < 8 and 0 <= y < 8):
@@ -93,6 +262,217 @@ class Board:
             return self.white_pieces
         else:
             return self.black_pieces
+    
+    def get_piece_count(self, color: ChessPieceColor, piece_type: ChessPieceType) -> int:
+        return self.piece_counts[(color, piece_type)]
+
+    def get_piece_counts(self) -> dict[tuple[ChessPieceColor, ChessPieceType], int]:
+        return self.piece_counts
+
+    def get_side_to_move(self) -> ChessPieceColor:
+        return self.side_to_move
+    
+    def get_hash(self) -> int:
+        return self.hash
+
+    def get_material_balance(self) -> int:
+        return self.material
+
+    def get_positional_score(self) -> float:
+        return get_positional_score(midgame_score=self.midgame_score, endgame_score=self.endgame_score, phase=self.phase)
+
+    def get_pawn_game_mode(self) -> GameMode | None:
+        # which way pawns move is decided by the factory that created them
+        # (see PawnMoveStrategy), so it's read back from a pawn: white pawns
+        # move to higher rows in WHITE_DOWN, None when there are no pawns
+        for color in ChessPieceColor:
+            if not self.piece_counts[(color, ChessPieceType.PAWN)]:
+                continue
+            pawn = next(piece for piece in self.get_pieces(color=color) if piece.get_type() is ChessPieceType.PAWN)
+            moves_up = pawn.attacks(x=pawn.get_row() + 1, y=pawn.get_col() + 1, board=self, board_analyzer=BoardAnalyzer)
+            return GameMode.WHITE_DOWN if moves_up == (color is ChessPieceColor.WHITE) else GameMode.BLACK_DOWN
+        return None
+
+    def to_compact(self) -> CompactPosition:
+        pawn_game_mode = self.get_pawn_game_mode()
+        return (
+            tuple(
+                (piece.get_color().value, piece.get_type().value, piece.get_row(), piece.get_col())
+                for color in ChessPieceColor for piece in self.get_pieces(color=color)
+            ),
+            self.side_to_move.value,
+            pawn_game_mode.value if pawn_game_mode is not None else None
+        )
+
+    def to_fen(self) -> str:
+        # castling and en passant don't exist in this game and the move
+        # counters aren't tracked, so those fields are always "- - 0 1"
+        ranks = []
+        for row in range(7, -1, -1):
+            rank = ''
+            empty = 0
+            for col in range(8):
+                if (piece := self.game_board[row][col]) is None:
+                    empty += 1
+                    continue
+                if empty:
+                    rank += str(empty)
+                    empty = 0
+                letter = FEN_PIECE_LETTERS[piece.get_type()]
+                rank += letter.upper() if piece.get_color() is ChessPieceColor.WHITE else letter
+            ranks.append(rank + (str(empty) if empty else ''))
+
+        return f"{'/'.join(ranks)} {'w' if self.side_to_move is ChessPieceColor.WHITE else 'b'} - - 0 1"
+
+    @classmethod
+    def from_fen(cls, fen: str, chess_piece_factory: IChessPieceFactory | None = None, max_history: int = 10000) -> Self:
+        # accepts full FEN as well as the four field position part of an
+        # EPD line, castling, en passant and the counters are ignored
+        fields = fen.split()
+        if len(fields) < 2:
+            raise InvalidFenException(fen=fen, reason='expected piece placement and side to move')
+        if fields[1] not in ('w', 'b'):
+            raise InvalidFenException(fen=fen, reason=f"unknown side to move {fields[1]!r}")
+
+        ranks = fields[0].split('/')
+        if len(ranks) != 8:
+            raise InvalidFenException(fen=fen, reason=f"expected 8 ranks, got {len(ranks)}")
+
+        if chess_piece_factory is None:
+            chess_piece_factory = SimpleChessPieceFactory(game_mode=GameMode.WHITE_DOWN)
+
+        pieces = []
+        kings = {ChessPieceColor.WHITE: 0, ChessPieceColor.BLACK: 0}
+        for (index, rank) in enumerate(ranks):
+            row = 7 - index
+            col = 0
+            for char in rank:
+                if char.isdigit():
+                    col += int(char)
+                    continue
+                if (piece_type := FEN_PIECE_TYPES.get(char.lower())) is None:
+                    raise InvalidFenException(fen=fen, reason=f"unknown piece {char!r}")
+                if col > 7:
+                    raise InvalidFenException(fen=fen, reason=f"rank {8 - index} has more than 8 files")
+                color = ChessPieceColor.WHITE if char.isupper() else ChessPieceColor.BLACK
+                kings[color] += piece_type is ChessPieceType.KING
+                pieces.append(chess_piece_factory.create(piece_type, color, row, col))
+                col += 1
+            if col != 8:
+                raise InvalidFenException(fen=fen, reason=f"rank {8 - index} doesn't cover 8 files")
+
+        for (color, count) in kings.items():
+            if count != 1:
+                raise InvalidFenException(fen=fen, reason=f"expected one {color.value} king, got {count}")
+
+        return cls(
+            pieces=pieces,
+            max_history=max_history,
+            side_to_move=ChessPieceColor.WHITE if fields[1] == 'w' else ChessPieceColor.BLACK
+        )
+
+    @classmethod
+    def from_compact(cls, position: CompactPosition) -> Self:
+        # headless pieces that move the way the original board's pieces did
+        (pieces, side_to_move, pawn_game_mode) = position
+        chess_piece_factory = SimpleChessPieceFactory(
+            game_mode=GameMode(pawn_game_mode) if pawn_game_mode is not None else GameMode.WHITE_DOWN
+        )
+        return cls(
+            pieces=[
+                chess_piece_factory.create(ChessPieceType(piece_type), ChessPieceColor(color), row, col)
+                for (color, piece_type, row, col) in pieces
+            ],
+            side_to_move=ChessPieceColor(side_to_move)
+        )
+
+
+class BitBoard(Board):
+    # keeps one 64-bit integer per (color, piece type) plus occupancy masks
+    # next to the regular board, square (x, y) is stored at bit x * 8 + y;
+    # BitBoardAnalyzer generates moves and answers attack questions from the masks
+    def __init__(self, pieces: list[IChessPiece], max_history: int = 10000, side_to_move: ChessPieceColor = ChessPieceColor.WHITE):
+        self.bitboards: dict[tuple[ChessPieceColor, ChessPieceType], int] = {
+            (color, piece_type): 0 for color in ChessPieceColor for piece_type in ChessPieceType
+        }
+        self.occupancy: dict[ChessPieceColor, int] = {color: 0 for color in ChessPieceColor}
+        self.occupied = 0
+
+        super().__init__(pieces=pieces, max_history=max_history, side_to_move=side_to_move)
+
+        for piece in pieces:
+            self._toggle(piece, 1 << (piece.get_row() * 8 + piece.get_col()))
+
+        # pawns are never added later (there is no promotion), so their
+        # direction is fixed by the pieces the board starts with
+        white_moves_up = self.get_pawn_game_mode() is not GameMode.BLACK_DOWN
+        self.pawn_directions = {
+            ChessPieceColor.WHITE: 1 if white_moves_up else -1,
+            ChessPieceColor.BLACK: -1 if white_moves_up else 1,
+        }
+
+    def _toggle(self, piece: IChessPiece, mask: int):
+        color = piece.get_color()
+        self.bitboards[(color, piece.get_type())] ^= mask
+        self.occupancy[color] ^= mask
+        self.occupied ^= mask
+
+    def make_move(self, x1: int, y1: int, x2: int, y2: int):
+        piece = self.get_piece_at(x1, y1)
+        killed_piece = self.get_piece_at(x2, y2)
+
+        super().make_move(x1=x1, y1=y1, x2=x2, y2=y2)
+
+        to_mask = 1 << (x2 * 8 + y2)
+        if killed_piece is not None:
+            self._toggle(killed_piece, to_mask)
+        self._toggle(piece, (1 << (x1 * 8 + y1)) | to_mask)
+
+    def unmake_move(self):
+        if (last_record := self.peek_history()) is not None:
+            (record, killed_piece) = last_record
+            super().unmake_move()
+
+            from_square = record & 63
+            to_mask = 1 << ((record >> 6) & 63)
+            self._toggle(self.game_board[from_square >> 3][from_square & 7], (1 << from_square) | to_mask)
+            if killed_piece is not None:
+                self._toggle(killed_piece, to_mask)
+
+    def is_position_empty(self, x: int, y: int) -> bool:
+        return 0 <= x < 8 and 0 <= y < 8 and not (self.occupied >> (x * 8 + y)) & 1
+
+    def get_bitboard(self, color: ChessPieceColor, piece_type: ChessPieceType) -> int:
+        return self.bitboards[(color, piece_type)]
+
+    def get_occupancy(self, color: ChessPieceColor | None = None) -> int:
+        return self.occupied if color is None else self.occupancy[color]
+
+    def get_attackers(self, x: int, y: int, by_color: ChessPieceColor, occupied: int | None = None) -> int:
+        # mask of the pieces of by_color attacking (x, y), sliders are
+        # blocked by occupied (defaults to every piece on the board)
+        square = x * 8 + y
+        bitboards = self.bitboards
+        attackers = (
+            KNIGHT_MASKS[square] & bitboards[(by_color, ChessPieceType.KNIGHT)]
+            | KING_MASKS[square] & bitboards[(by_color, ChessPieceType.KING)]
+            # a pawn attacks square from where a pawn moving the other way would capture
+            | PAWN_CAPTURE_MASKS[-self.pawn_directions[by_color]][square] & bitboards[(by_color, ChessPieceType.PAWN)]
+        )
+
+        queens = bitboards[(by_color, ChessPieceType.QUEEN)]
+        occupied = self.occupied if occupied is None else occupied
+        for (ray_masks, sliders) in (
+            (ROOK_RAY_MASKS, bitboards[(by_color, ChessPieceType.ROOK)] | queens),
+            (BISHOP_RAY_MASKS, bitboards[(by_color, ChessPieceType.BISHOP)] | queens),
+        ):
+            if not sliders:
+                continue
+            for (ray_mask, increasing, _) in ray_masks[square]:
+                if (blockers := ray_mask & occupied):
+                    attackers |= get_nearest_bit(blockers, increasing) & sliders
+
+        return attackers
 
 
 class BoardAnalyzer:
@@ -104,109 +484,359 @@ class BoardAnalyzer:
     def are_opponents(cls, piece1: IChessPiece, piece2: IChessPiece) -> bool:
         return not cls.are_friends(piece1, piece2)
     
+    @classmethod
+    def iter_attackers(cls, x: int, y: int, by_color: ChessPieceColor, board: IBoard) -> Iterator[IChessPiece]:
+        # looks outward from (x, y) for pieces of by_color which could
+        # reach it instead of generating all of by_color's moves
+        square = x * 8 + y
+
+        for (row, col) in KNIGHT_TARGETS[square]:
+            if (
+                (piece := board.get_piece_at(row, col)) is not None
+                and piece.get_color() is by_color
+                and piece.get_type() is ChessPieceType.KNIGHT
+            ):
+                yield piece
+
+        for (row, col) in KING_TARGETS[square]:
+            if (
+                (piece := board.get_piece_at(row, col)) is not None
+                and piece.get_color() is by_color
+                and piece.get_type() is ChessPieceType.KING
+            ):
+                yield piece
+
+        for direction in (1, -1):
+            for (row, col) in PAWN_CAPTURE_TARGETS[direction][square]:
+                if (
+                    (piece := board.get_piece_at(row, col)) is not None
+                    and piece.get_color() is by_color
+                    and piece.get_type() is ChessPieceType.PAWN
+                    and piece.attacks(x=x, y=y, board=board, board_analyzer=cls)
+                ):
+                    yield piece
+
+        for (rays, slider_type) in ((ROOK_RAYS, ChessPieceType.ROOK), (BISHOP_RAYS, ChessPieceType.BISHOP)):
+            for ray in rays[square]:
+                for (row, col) in ray:
+                    if (piece := board.get_piece_at(row, col)) is not None:
+                        if (
+                            piece.get_color() is by_color
+                            and piece.get_type() in (slider_type, ChessPieceType.QUEEN)
+                        ):
+                            yield piece
+                        break
+
+    @classmethod
+    def is_square_attacked(cls, x: int, y: int, by_color: ChessPieceColor, board: IBoard) -> bool:
+        return next(cls.iter_attackers(x=x, y=y, by_color=by_color, board=board), None) is not None
+
+    @classmethod
+    def get_pinned_pieces(cls, color: ChessPieceColor, board: IBoard) -> dict[IChessPiece, set[tuple[int, int]]]:
+        # maps every absolutely pinned piece of color to the squares it
+        # may still move to (the ray between its king and the pinner)
+        king = board.get_king(color=color)
+        square = king.get_row() * 8 + king.get_col()
+        pins: dict[IChessPiece, set[tuple[int, int]]] = dict()
+
+        for (rays, slider_type) in ((ROOK_RAYS, ChessPieceType.ROOK), (BISHOP_RAYS, ChessPieceType.BISHOP)):
+            for ray in rays[square]:
+                pinned_piece = None
+                for (index, (row, col)) in enumerate(ray):
+                    if (piece := board.get_piece_at(row, col)) is None:
+                        continue
+                    elif pinned_piece is None and piece.get_color() is color:
+                        pinned_piece = piece
+                        continue
+                    elif (
+                        pinned_piece is not None
+                        and piece.get_color() is not color
+                        and piece.get_type() in (slider_type, ChessPieceType.QUEEN)
+                    ):
+                        pins[pinned_piece] = set(ray[:index + 1])
+                    break
+
+        return pins
+
     @classmethod
     def is_there_any_threat_to_king(cls, color: ChessPieceColor, board: IBoard) -> bool:
         king = board.get_king(color=color)
-        enemies = board.get_pieces(ChessPieceColor.BLACK) if color is ChessPieceColor.WHITE else board.get_pieces(ChessPieceColor.WHITE)
+        enemy_color = ChessPieceColor.BLACK if color is ChessPieceColor.WHITE else ChessPieceColor.WHITE
 
-        x, y = king.get_row(), king.get_col()
-        
-        for enemy in enemies:
-            moves = enemy.get_moves(board=board, board_analyzer=cls)
-            for move in moves:
-                if move.x2 == x and move.y2 == y:
-                    return True
-        
-        return False
+        return cls.is_square_attacked(x=king.get_row(), y=king.get_col(), by_color=enemy_color, board=board)
     
     @classmethod
-    def filter_moves(cls, color: ChessPieceColor, moves: set[Move], board: IBoard) -> set[Move]:
-        output_moves = moves.copy()
+    def filter_moves(cls, color: ChessPieceColor, moves: list[Move], board: IBoard) -> list[Move]:
+        output_moves = []
         for move in moves:
             board.make_move(x1=move.x1, y1=move.y1, x2=move.x2, y2=move.y2)
-            if (cls.is_there_any_threat_to_king(color=color, board=board)):
-                output_moves.remove(move)
+            if (not cls.is_there_any_threat_to_king(color=color, board=board)):
+                output_moves.append(move)
             board.unmake_move()
         
         return output_moves
 
     
     @classmethod
-    def get_all_valid_moves(cls, color: ChessPieceColor, board: IBoard) -> set[Move]:
-        valid_moves = set()
-        for piece in (board.get_pieces(color=color)):
-            valid_moves = valid_moves.union(
-                cls.filter_moves(
-                    color=color,
-                    board=board,
-                    moves=piece.get_moves(
-                        board=board, board_analyzer=cls
-                    )
-                )
-            )
+    def iter_king_moves(cls, color: ChessPieceColor, board: IBoard) -> Iterator[Move]:
+        king = board.get_king(color=color)
+        enemy_color = ChessPieceColor.BLACK if color is ChessPieceColor.WHITE else ChessPieceColor.WHITE
 
-        return valid_moves
+        for move in king.get_moves(board=board, board_analyzer=cls):
+            # the king has to be lifted off its square so that sliders
+            # attacking through it are still seen
+            board.make_move(x1=move.x1, y1=move.y1, x2=move.x2, y2=move.y2)
+            is_safe = not cls.is_square_attacked(x=move.x2, y=move.y2, by_color=enemy_color, board=board)
+            board.unmake_move()
+            if is_safe:
+                yield move
 
-    
     @classmethod
-    def has_moves(cls, color: ChessPieceColor, board: IBoard):
-        comrade_pieces = board.get_pieces(color=color)
+    def get_king_moves(cls, color: ChessPieceColor, board: IBoard) -> list[Move]:
+        return list(cls.iter_king_moves(color=color, board=board))
 
-        for piece in comrade_pieces:
-            if (len(cls.filter_moves(color=piece.get_color(), moves=piece.get_moves(board=board, board_analyzer=cls), board=board))):
-                return True
+    @classmethod
+    def iter_valid_moves(cls, color: ChessPieceColor, board: IBoard) -> Iterator[Move]:
+        # moves are produced lazily so callers that only need to know
+        # whether a legal move exists can stop at the first one; the board
+        # is always restored before a move is yielded, so the consumer may
+        # make and unmake moves while iterating
+        king = board.get_king(color=color)
+        enemy_color = ChessPieceColor.BLACK if color is ChessPieceColor.WHITE else ChessPieceColor.WHITE
+        king_x, king_y = king.get_row(), king.get_col()
+
+        yield from cls.iter_king_moves(color=color, board=board)
+
+        checkers = list(cls.iter_attackers(x=king_x, y=king_y, by_color=enemy_color, board=board))
+        if len(checkers) > 1:
+            return
         
-        return False
+        # in check only capturing the checker or blocking its ray can help
+        evasion_squares: set[tuple[int, int]] | None = None
+        if checkers:
+            checker = checkers[0]
+            checker_x, checker_y = checker.get_row(), checker.get_col()
+            evasion_squares = {(checker_x, checker_y)}
+            if checker.get_type() in (ChessPieceType.ROOK, ChessPieceType.BISHOP, ChessPieceType.QUEEN):
+                step_x = (checker_x > king_x) - (checker_x < king_x)
+                step_y = (checker_y > king_y) - (checker_y < king_y)
+                x, y = king_x + step_x, king_y + step_y
+                while (x, y) != (checker_x, checker_y):
+                    evasion_squares.add((x, y))
+                    x, y = x + step_x, y + step_y
+
+        pins = cls.get_pinned_pieces(color=color, board=board)
+        # the piece set is copied because the consumer may capture and
+        # restore pieces between two yields
+        for piece in tuple(board.get_pieces(color=color)):
+            if piece is king:
+                continue
+            pin_squares = pins.get(piece)
+            for move in piece.iter_moves(board=board, board_analyzer=cls):
+                if (
+                    (pin_squares is None or (move.x2, move.y2) in pin_squares)
+                    and (evasion_squares is None or (move.x2, move.y2) in evasion_squares)
+                ):
+                    yield move
+
+    @classmethod
+    def get_all_valid_moves(cls, color: ChessPieceColor, board: IBoard) -> list[Move]:
+        return list(cls.iter_valid_moves(color=color, board=board))
+
+    @classmethod
+    def get_valid_moves(cls, piece: IChessPiece, board: IBoard) -> list[Move]:
+        row, col = piece.get_row(), piece.get_col()
+        return [
+            move for move in cls.iter_valid_moves(color=piece.get_color(), board=board)
+            if move.x1 == row and move.y1 == col
+        ]
+
+    @classmethod
+    def has_moves(cls, color: ChessPieceColor, board: IBoard):
+        return next(cls.iter_valid_moves(color=color, board=board), None) is not None
     
     @classmethod
     def insufficient_material(cls, board: IBoard) -> bool:
-        # TODO: figure out how to write a scaleable and
-        # dependency injection based implementation for
-        # this method
-        return False
+        return is_insufficient_material(
+            piece_counts=board.get_piece_counts(),
+            get_bishop_squares=lambda: [
+                piece.get_row() * 8 + piece.get_col()
+                for color in ChessPieceColor for piece in board.get_pieces(color=color)
+                if piece.get_type() is ChessPieceType.BISHOP
+            ]
+        )
     
     @classmethod
-    def is_winner(cls, color: ChessPieceColor, board: IBoard) -> bool:
-        opponent_color = ChessPieceColor.BLACK if color is ChessPieceColor.WHITE else ChessPieceColor.WHITE
-        return (
-            cls.is_there_any_threat_to_king(color=opponent_color, board=board)
-            and not cls.has_moves(color=opponent_color, board=board)
+    def get_position_status(cls, board: IBoard) -> PositionStatus:
+        # only the side to move can be mated or stalemated, so one threat
+        # scan and one legal move cover every end-of-game check
+        color = board.get_side_to_move()
+        return PositionStatus(
+            side_to_move=color,
+            in_check=cls.is_there_any_threat_to_king(color=color, board=board),
+            has_moves=cls.has_moves(color=color, board=board),
+            insufficient_material=cls.insufficient_material(board=board)
         )
+
+    @classmethod
+    def is_winner(cls, color: ChessPieceColor, board: IBoard, status: PositionStatus | None = None) -> bool:
+        status = status or cls.get_position_status(board=board)
+        return status.get_winner() is color
     
     @classmethod
-    def is_draw(cls, board: IBoard) -> bool:
-        return (
-            not cls.is_winner(color=ChessPieceColor.WHITE, board=board)
-            and not cls.is_winner(color=ChessPieceColor.BLACK, board=board)
-            and cls.insufficient_material(board=board)
-        )
+    def is_draw(cls, board: IBoard, status: PositionStatus | None = None) -> bool:
+        status = status or cls.get_position_status(board=board)
+        return status.is_draw()
     
     @classmethod
-    def is_terminal(cls, board: IBoard) -> bool:
-        return (
-            cls.is_winner(color=ChessPieceColor.WHITE, board=board)
-            or cls.is_winner(color=ChessPieceColor.BLACK, board=board)
-            or cls.is_draw(board=board)
-        )
+    def is_terminal(cls, board: IBoard, status: PositionStatus | None = None) -> bool:
+        status = status or cls.get_position_status(board=board)
+        return status.is_terminal()
     
     @classmethod
     def evaluate_delta_points_for_given_board(cls, board: IBoard) -> int:
-        delta_points = 0
-        for piece in board.get_pieces(ChessPieceColor.WHITE):
-            delta_points += piece.get_points()
-        
-        for piece in board.get_pieces(ChessPieceColor.BLACK):
-            delta_points -= piece.get_points()
-
-        return delta_points
+        return board.get_material_balance()
     
     @classmethod
-    def evaluate_board(cls, game_mode: GameMode, board: IBoard) -> int:
-        if (game_mode is GameMode.BLACK_DOWN): return -cls.evaluate_board(GameMode.WHITE_DOWN, board=board)
+    def evaluate_board(cls, game_mode: GameMode, board: IBoard, status: PositionStatus | None = None) -> float:
+        if (game_mode is GameMode.BLACK_DOWN): return -cls.evaluate_board(GameMode.WHITE_DOWN, board=board, status=status)
         
         kings_score_sum = board.get_king(ChessPieceColor.WHITE).get_points() + board.get_king(ChessPieceColor.BLACK).get_points()
 
-        if cls.is_winner(ChessPieceColor.WHITE, board=board): return kings_score_sum
-        elif cls.is_winner(ChessPieceColor.BLACK, board=board): return -kings_score_sum
-        elif cls.is_draw(board=board): return 0
-        else: return cls.evaluate_delta_points_for_given_board(board=board)
+        status = status or cls.get_position_status(board=board)
+        winner = status.get_winner()
+
+        if winner is ChessPieceColor.WHITE: return kings_score_sum
+        elif winner is ChessPieceColor.BLACK: return -kings_score_sum
+        elif status.is_draw(): return 0
+        else: return cls.evaluate_delta_points_for_given_board(board=board) + board.get_positional_score()
+
+
+class BitBoardAnalyzer(BoardAnalyzer):
+    # BoardAnalyzer for BitBoard: attacks, pins, check evasions and the
+    # moves of everything but pawns are worked out on the masks instead of
+    # walking the 8x8 list, the rest is inherited
+    @classmethod
+    def iter_attackers(cls, x: int, y: int, by_color: ChessPieceColor, board: BitBoard) -> Iterator[IChessPiece]:
+        attackers = board.get_attackers(x=x, y=y, by_color=by_color)
+        while attackers:
+            bit = attackers & -attackers
+            square = bit.bit_length() - 1
+            yield board.get_piece_at(square >> 3, square & 7)
+            attackers ^= bit
+
+    @classmethod
+    def is_square_attacked(cls, x: int, y: int, by_color: ChessPieceColor, board: BitBoard) -> bool:
+        return board.get_attackers(x=x, y=y, by_color=by_color) != 0
+
+    @classmethod
+    def get_pin_masks(cls, color: ChessPieceColor, board: BitBoard) -> dict[int, int]:
+        # square of every absolutely pinned piece of color -> mask of the
+        # squares it may still move to (the ray up to and including the pinner)
+        king = board.get_king(color=color)
+        square = king.get_row() * 8 + king.get_col()
+        enemy_color = ChessPieceColor.BLACK if color is ChessPieceColor.WHITE else ChessPieceColor.WHITE
+        own = board.get_occupancy(color=color)
+        occupied = board.get_occupancy()
+        enemy_queens = board.get_bitboard(color=enemy_color, piece_type=ChessPieceType.QUEEN)
+        pins: dict[int, int] = dict()
+
+        for (ray_masks, slider_type) in ((ROOK_RAY_MASKS, ChessPieceType.ROOK), (BISHOP_RAY_MASKS, ChessPieceType.BISHOP)):
+            if not (sliders := board.get_bitboard(color=enemy_color, piece_type=slider_type) | enemy_queens):
+                continue
+            for (ray_mask, increasing, prefixes) in ray_masks[square]:
+                # pinned: the first piece on the ray is ours, the second an enemy slider
+                if not (ray_mask & sliders) or not (blockers := ray_mask & occupied):
+                    continue
+                first = get_nearest_bit(blockers, increasing)
+                if not first & own or not (rest := blockers ^ first):
+                    continue
+                if (second := get_nearest_bit(rest, increasing)) & sliders:
+                    pins[first.bit_length() - 1] = prefixes[get_ray_distance(square, second.bit_length() - 1)]
+
+        return pins
+
+    @classmethod
+    def iter_king_moves(cls, color: ChessPieceColor, board: BitBoard) -> Iterator[Move]:
+        king = board.get_king(color=color)
+        (row, col) = (king.get_row(), king.get_col())
+        square = row * 8 + col
+        enemy_color = ChessPieceColor.BLACK if color is ChessPieceColor.WHITE else ChessPieceColor.WHITE
+        # without the king in the occupancy sliders see through its square,
+        # so no move has to be made to test the target
+        occupied = board.get_occupancy() ^ (1 << square)
+        targets = KING_MASKS[square] & ~board.get_occupancy(color=color)
+        while targets:
+            bit = targets & -targets
+            target = bit.bit_length() - 1
+            if not board.get_attackers(x=target >> 3, y=target & 7, by_color=enemy_color, occupied=occupied):
+                yield get_move(row, col, target >> 3, target & 7)
+            targets ^= bit
+
+    @classmethod
+    def get_targets(cls, piece_type: ChessPieceType, square: int, own: int, occupied: int) -> int:
+        # squares a knight, bishop, rook or queen on square can move to
+        if piece_type is ChessPieceType.KNIGHT:
+            return KNIGHT_MASKS[square] & ~own
+        elif piece_type is ChessPieceType.ROOK:
+            ray_masks = ROOK_RAY_MASKS[square]
+        elif piece_type is ChessPieceType.BISHOP:
+            ray_masks = BISHOP_RAY_MASKS[square]
+        else:
+            ray_masks = QUEEN_RAY_MASKS[square]
+
+        targets = 0
+        for (ray_mask, increasing, prefixes) in ray_masks:
+            if (blockers := ray_mask & occupied):
+                # the ray stops at the nearest piece, own pieces are removed below
+                targets |= prefixes[get_ray_distance(square, get_nearest_bit(blockers, increasing).bit_length() - 1)]
+            else:
+                targets |= ray_mask
+        return targets & ~own
+
+    @classmethod
+    def iter_valid_moves(cls, color: ChessPieceColor, board: BitBoard) -> Iterator[Move]:
+        # checkers, pins and evasions are masks, and pieces other than pawns
+        # get their moves by intersecting their target mask with them
+        king = board.get_king(color=color)
+        enemy_color = ChessPieceColor.BLACK if color is ChessPieceColor.WHITE else ChessPieceColor.WHITE
+        king_square = king.get_row() * 8 + king.get_col()
+
+        yield from cls.iter_king_moves(color=color, board=board)
+
+        checkers = board.get_attackers(x=king_square >> 3, y=king_square & 7, by_color=enemy_color)
+        if checkers & (checkers - 1):
+            return
+
+        # the checker's square plus, for a slider, the ray up to it
+        allowed = ALL_SQUARES
+        if checkers:
+            allowed = checkers
+            checker_square = checkers.bit_length() - 1
+            for (ray_mask, _, prefixes) in QUEEN_RAY_MASKS[king_square]:
+                if ray_mask & checkers and board.get_piece_at(checker_square >> 3, checker_square & 7).get_type() is not ChessPieceType.KNIGHT:
+                    allowed = prefixes[get_ray_distance(king_square, checker_square)]
+                    break
+
+        pins = cls.get_pin_masks(color=color, board=board)
+        own = board.get_occupancy(color=color)
+        occupied = board.get_occupancy()
+        for piece in tuple(board.get_pieces(color=color)):
+            if piece is king:
+                continue
+            (row, col) = (piece.get_row(), piece.get_col())
+            square = row * 8 + col
+            if not (piece_allowed := allowed & pins.get(square, ALL_SQUARES)):
+                continue
+            if (piece_type := piece.get_type()) is ChessPieceType.PAWN:
+                for move in piece.iter_moves(board=board, board_analyzer=cls):
+                    if (piece_allowed >> (move.x2 * 8 + move.y2)) & 1:
+                        yield move
+                continue
+
+            targets = cls.get_targets(piece_type=piece_type, square=square, own=own, occupied=occupied) & piece_allowed
+            while targets:
+                bit = targets & -targets
+                target = bit.bit_length() - 1
+                yield get_move(row, col, target >> 3, target & 7)
+                targets ^= bit
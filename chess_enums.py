@@ -5,12 +5,29 @@ class ChessPieceColor(str, Enum):
     BLACK = 'black'
     WHITE = 'white'
 
+class ChessPieceType(str, Enum):
+    PAWN = 'pawn'
+    KNIGHT = 'knight'
+    BISHOP = 'bishop'
+    ROOK = 'rook'
+    QUEEN = 'queen'
+    KING = 'king'
+
 class BoardBackgroundTile(str, Enum):
     LIGHT = 'light'
     DARK = 'dark'
     HIGHLIGHTED = 'highlight'
 
-class GameMode:
+class GameMode(Enum):
     WHITE_DOWN = auto()
     BLACK_DOWN = auto()
-    
\ No newline at end of file
+
+class BoundType(Enum):
+    EXACT = auto()
+    LOWER = auto()
+    UPPER = auto()
+
+class TablebaseResult(Enum):
+    WIN = auto()
+    DRAW = auto()
+    LOSS = auto()
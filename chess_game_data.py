@@ -2,6 +2,9 @@ from dataclasses import dataclass, field
 
 from chess_enums import GameMode
 from intefaces import IBoard, IBoardAnalyzer
+from opening_book import OpeningBook
+from tablebase import Tablebases
+from transposition_table import TranspositionTable
 
 @dataclass(frozen=True)
 class ChessGameData:
@@ -10,9 +13,29 @@ class ChessGameData:
     board_analyzer: IBoardAnalyzer
     depth: int = field(default=2)
     play_with_ai: bool = field(default=False)
+    # search the computer's answer to the player's expected reply while the player thinks
+    ponder: bool = field(default=False)
+    # how many plies of captures are searched past depth, 0 evaluates right at the horizon
+    quiescence_depth: int = field(default=4)
+    # kept between moves of the same game, pass a TranspositionTable(size_mb=...) to change its memory budget
+    transposition_table: TranspositionTable = field(default_factory=TranspositionTable)
+    # when given, positions found in the book are played without searching
+    opening_book: OpeningBook | None = field(default=None)
+    # endgame tables probed during the search, see tablebase.py
+    tablebases: Tablebases | None = field(default=None)
+    # above 1 the root moves are split over this many worker processes, see parallel_search.py
+    threads: int = field(default=1)
 
     def __post_init__(self):
         if (self.depth < 1):
             raise ValueError(
                 f"depth of minimax tree can't be less than 1 (give: {self.depth})"
             )
+        if (self.quiescence_depth < 0):
+            raise ValueError(
+                f"quiescence depth can't be less than 0 (give: {self.quiescence_depth})"
+            )
+        if (self.threads < 1):
+            raise ValueError(
+                f"number of search threads can't be less than 1 (give: {self.threads})"
+            )
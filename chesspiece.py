@@ -1,13 +1,17 @@
-from typing import Type
+from __future__ import annotations
+from typing import TYPE_CHECKING, Iterator, Type
 
-from pygame import SurfaceType
-
-from chess_enums import ChessPieceColor
+from chess_enums import ChessPieceColor, ChessPieceType
 from move_strategy import ChessPieceMoveStrategy
 from historical_move import Move
 from intefaces import IBoard, IBoardAnalyzer
 
+if TYPE_CHECKING:
+    from pygame import SurfaceType
+
 class ChessPiece:
+    __slots__ = ('row', 'col', 'color', 'points', 'is_king_piece', 'piece_type', 'move_strategies', 'image')
+
     def __init__(
         self,
         color: ChessPieceColor,
@@ -15,6 +19,7 @@ class ChessPiece:
         col: int,
         points: int,
         is_king_piece: bool,
+        piece_type: ChessPieceType,
         move_strategies: list[Type[ChessPieceMoveStrategy]],
         image: SurfaceType | None = None # for gui support @decided not to go with decorator pattern,
     ):
@@ -23,6 +28,7 @@ class ChessPiece:
         self.color = color
         self.points = points
         self.is_king_piece = is_king_piece
+        self.piece_type = piece_type
         self.move_strategies = move_strategies.copy()
         self.image = image
     
@@ -41,17 +47,35 @@ class ChessPiece:
     def is_king(self):
         return self.is_king_piece
     
+    def get_type(self) -> ChessPieceType:
+        return self.piece_type
+    
     def set_position(self, row: int, col: int):
         self.row = row
         self.col = col
 
     
-    def get_moves(self, board: IBoard, board_analyzer: IBoardAnalyzer) -> set[Move]:
-        moves: set[Move] = set()
+    def get_moves(self, board: IBoard, board_analyzer: IBoardAnalyzer) -> list[Move]:
+        if len(self.move_strategies) == 1:
+            return self.move_strategies[0].get_moves(row=self.row, col=self.col, board=board, board_analyzer=board_analyzer)
+
+        # strategies never overlap (a queen is a rook plus a bishop), so
+        # their moves are simply concatenated
+        moves: list[Move] = []
         for strategy in self.move_strategies:
-            moves = moves.union(strategy.get_moves(row=self.row, col=self.col, board=board, board_analyzer=board_analyzer))
+            moves.extend(strategy.get_moves(row=self.row, col=self.col, board=board, board_analyzer=board_analyzer))
         
         return moves
+
+    def iter_moves(self, board: IBoard, board_analyzer: IBoardAnalyzer) -> Iterator[Move]:
+        for strategy in self.move_strategies:
+            yield from strategy.iter_moves(row=self.row, col=self.col, board=board, board_analyzer=board_analyzer)
+    
+    def attacks(self, x: int, y: int, board: IBoard, board_analyzer: IBoardAnalyzer) -> bool:
+        return any(
+            strategy.attacks(row=self.row, col=self.col, x=x, y=y, board=board, board_analyzer=board_analyzer)
+            for strategy in self.move_strategies
+        )
     
     def get_image(self) -> SurfaceType | None:
         return self.image
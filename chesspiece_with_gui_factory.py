@@ -3,7 +3,7 @@ from typing import override
 from factory import AbstractChessPieceFactory
 from chesspiece import ChessPiece
 from move_strategy import PawnMoveStrategy, KinghtMoveStrategy, BishopMoveStrategy, RookMoveStrategy, KingMoveStrategy
-from chess_enums import ChessPieceColor, GameMode
+from chess_enums import ChessPieceColor, ChessPieceType, GameMode
 from intefaces import IChessPiece
 
 import pygame
@@ -45,6 +45,7 @@ class ChessPieceWithGUIFactory(AbstractChessPieceFactory):
             col=col,
             points=1,
             is_king_piece=False,
+            piece_type=ChessPieceType.PAWN,
             move_strategies=[self.pawn_strategy],
             image=assets[(color, "pawn")]
         )
@@ -57,6 +58,7 @@ class ChessPieceWithGUIFactory(AbstractChessPieceFactory):
             col=col,
             points=3,
             is_king_piece=False,
+            piece_type=ChessPieceType.KNIGHT,
             move_strategies=[self.knight_strategy],
             image=assets[(color, "knight")]
         )
@@ -69,6 +71,7 @@ class ChessPieceWithGUIFactory(AbstractChessPieceFactory):
             col=col,
             points=3,
             is_king_piece=False,
+            piece_type=ChessPieceType.BISHOP,
             move_strategies=[self.bishop_strategy],
             image=assets[(color, "bishop")]
         )
@@ -81,6 +84,7 @@ class ChessPieceWithGUIFactory(AbstractChessPieceFactory):
             col=col,
             points=5,
             is_king_piece=False,
+            piece_type=ChessPieceType.ROOK,
             move_strategies=[self.rook_strategy],
             image=assets[(color, "rook")]
         )
@@ -93,6 +97,7 @@ class ChessPieceWithGUIFactory(AbstractChessPieceFactory):
             col=col,
             points=9,
             is_king_piece=False,
+            piece_type=ChessPieceType.QUEEN,
             move_strategies=[self.rook_strategy, self.bishop_strategy],
             image=assets[(color, "queen")]
         )
@@ -105,6 +110,7 @@ class ChessPieceWithGUIFactory(AbstractChessPieceFactory):
             col=col,
             points=100,
             is_king_piece=True,
+            piece_type=ChessPieceType.KING,
             move_strategies=[self.king_strategy],
             image=assets[(color, "king")]
         )
@@ -1,72 +1,344 @@
 import math
 from board import Board
 import random
+import threading
+import time
+from dataclasses import dataclass, field
 
-from chess_enums import ChessPieceColor, GameMode
+from chess_enums import BoundType, ChessPieceColor, GameMode, TablebaseResult
 from move import Move
 from chess_game_data import ChessGameData
 from intefaces import IChessPiece
+from exceptions import SearchAbortedException
+from move_ordering import MoveOrderer
+from search_stats import ProgressCallback, SearchStats
+from tablebase import TablebaseProbe
 
-i = 0
-def minimax(game_data: ChessGameData, curr_depth: int, computers_turn: bool, alpha: int = math.inf, beta: int = -math.inf) -> tuple[int, Move | None]:
-    global i
+# iterative deepening cap for searches bounded only by time, nodes or a stop
+UNLIMITED_DEPTH = 64
+
+@dataclass(frozen=True)
+class SearchLimits:
+    # None means no limit, max_depth falls back to ChessGameData.depth
+    max_depth: int | None = field(default=None)
+    time_limit: float | None = field(default=None)
+    node_limit: int | None = field(default=None)
+
+    def __post_init__(self):
+        if (self.max_depth is not None and self.max_depth < 1):
+            raise ValueError(f"max_depth can't be less than 1 (given: {self.max_depth})")
+        if (self.time_limit is not None and self.time_limit <= 0):
+            raise ValueError(f"time_limit has to be positive (given: {self.time_limit})")
+        if (self.node_limit is not None and self.node_limit < 1):
+            raise ValueError(f"node_limit can't be less than 1 (given: {self.node_limit})")
+
+
+class SearchContext:
+    def __init__(
+        self,
+        limits: SearchLimits,
+        stop_event: threading.Event | None = None,
+        move_orderer: MoveOrderer | None = None,
+        stats: SearchStats | None = None,
+        progress_callback: ProgressCallback | None = None,
+        progress_interval: int | None = None
+    ):
+        self.limits = limits
+        self.move_orderer = move_orderer if move_orderer is not None else MoveOrderer()
+        # setting the event from any thread cancels the search
+        self.stop_event = stop_event if stop_event is not None else threading.Event()
+        self.deadline = time.monotonic() + limits.time_limit if limits.time_limit is not None else None
+        self.stats = stats if stats is not None else SearchStats()
+        # progress_callback gets the stats every progress_interval nodes
+        # (if given) and after every completed depth
+        self.progress_callback = progress_callback
+        self.progress_interval = progress_interval
+
+    def visit_node(self):
+        self.stats.nodes += 1
+        if self.stop_event.is_set():
+            raise SearchAbortedException(reason="stopped")
+        if self.limits.node_limit is not None and self.stats.nodes > self.limits.node_limit:
+            raise SearchAbortedException(reason="node limit reached")
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise SearchAbortedException(reason="time limit reached")
+        if self.progress_interval and self.progress_callback is not None and self.stats.nodes % self.progress_interval == 0:
+            self.progress_callback(self.stats)
+
+    def complete_depth(self, depth: int, seconds: float):
+        self.stats.completed_depth = depth
+        self.stats.depth_times[depth] = seconds
+        if self.progress_callback is not None:
+            self.progress_callback(self.stats)
+
+
+def get_game_mode(computers_color: ChessPieceColor) -> GameMode:
+    # the game mode names the player's color (at the bottom of the screen),
+    # headless callers only know which color the computer should play
+    return GameMode.WHITE_DOWN if computers_color is ChessPieceColor.BLACK else GameMode.BLACK_DOWN
+
+
+# a capture is skipped when even winning the victim plus this many points
+# can't move the score past the bound
+DELTA_MARGIN = 2
+
+def quiescence(game_data: ChessGameData, computers_turn: bool, alpha: int, beta: int, ply: int, context: SearchContext, quiescence_depth: int) -> tuple[int, Move | None]:
+    # resolves pending captures at the horizon so that the evaluation
+    # isn't taken in the middle of an exchange, either side may also
+    # "stand pat" on the static evaluation instead of capturing
+    context.visit_node()
+    context.stats.quiescence_nodes += 1
+    # the horizon (or a capture) may have reached tablebase material
+    if ply > 0 and (tablebase_score := probe_tablebases(game_data=game_data, computers_turn=computers_turn, context=context)) is not None:
+        return (tablebase_score, None)
+    context.stats.leaf_evaluations += 1
+    stand_pat = game_data.board_analyzer.evaluate_board(game_mode=game_data.game_mode, board=game_data.board)
+    if quiescence_depth <= 0:
+        return (stand_pat, None)
+
+    if computers_turn:
+        alpha = min(alpha, stand_pat)
+        color = ChessPieceColor.BLACK if game_data.game_mode is GameMode.WHITE_DOWN else ChessPieceColor.WHITE
+    else:
+        beta = max(beta, stand_pat)
+        color = ChessPieceColor.WHITE if game_data.game_mode is GameMode.WHITE_DOWN else ChessPieceColor.BLACK
+    
+    if alpha < beta:
+        return (stand_pat, None)
+
+    captures = [
+        move for move in game_data.board_analyzer.iter_valid_moves(color=color, board=game_data.board)
+        if game_data.board.get_piece_at(move.x2, move.y2) is not None
+    ]
+
+    best_score = stand_pat
+    best_move = None
+    for (index, move) in enumerate(context.move_orderer.order_moves(moves=captures, board=game_data.board, ply=ply)):
+        victim_points = game_data.board.get_piece_at(move.x2, move.y2).get_points()
+        if (
+            computers_turn and stand_pat - victim_points - DELTA_MARGIN >= alpha
+            or not computers_turn and stand_pat + victim_points + DELTA_MARGIN <= beta
+        ):
+            continue
+
+        game_data.board.make_move(x1=move.x1, y1=move.y1, x2=move.x2, y2=move.y2)
+        try:
+            (curr_score, _) = quiescence(game_data, computers_turn=not computers_turn, alpha=alpha, beta=beta, ply=ply + 1, context=context, quiescence_depth=quiescence_depth - 1)
+        finally:
+            game_data.board.unmake_move()
+
+        if computers_turn and curr_score < best_score or not computers_turn and curr_score > best_score:
+            best_score = curr_score
+            best_move = move
+
+        if computers_turn:
+            alpha = min(alpha, curr_score)
+        else:
+            beta = max(beta, curr_score)
+
+        if alpha < beta:
+            context.stats.cutoffs += 1
+            context.stats.first_move_cutoffs += index == 0
+            break
+
+    return (best_score, best_move)
+
+def get_tablebase_score(game_data: ChessGameData, probe: TablebaseProbe, computers_turn: bool) -> float:
+    # a known win scores just below a mate on the board (see evaluate_board)
+    # and less the longer the mate takes, from the player's point of view
+    if probe.result is TablebaseResult.DRAW:
+        return 0
+    kings_score_sum = (
+        game_data.board.get_king(ChessPieceColor.WHITE).get_points()
+        + game_data.board.get_king(ChessPieceColor.BLACK).get_points()
+    )
+    score = kings_score_sum - 1 - probe.distance_to_mate / 100
+    side_to_move_wins = probe.result is TablebaseResult.WIN
+    return -score if side_to_move_wins == computers_turn else score
+
+def probe_tablebases(game_data: ChessGameData, computers_turn: bool, context: SearchContext) -> float | None:
+    if game_data.tablebases is None or (probe := game_data.tablebases.probe(board=game_data.board)) is None:
+        return None
+    context.stats.tablebase_hits += 1
+    return get_tablebase_score(game_data=game_data, probe=probe, computers_turn=computers_turn)
+
+def minimax(game_data: ChessGameData, curr_depth: int, computers_turn: bool, alpha: int = math.inf, beta: int = -math.inf, ply: int = 0, context: SearchContext | None = None) -> tuple[int, Move | None]:
+    # alpha is the best score the computer (minimizing) is already
+    # guaranteed, beta the best score the player (maximizing) is
+    if context is None:
+        context = SearchContext(limits=SearchLimits())
+    if curr_depth <= 0:
+        return quiescence(game_data, computers_turn=computers_turn, alpha=alpha, beta=beta, ply=ply, context=context, quiescence_depth=game_data.quiescence_depth)
+    # below the root a tablebase result ends the search, the root still
+    # searches so that it can pick the move leading there
+    if ply > 0 and (tablebase_score := probe_tablebases(game_data=game_data, computers_turn=computers_turn, context=context)) is not None:
+        return (tablebase_score, None)
+
+    context.visit_node()
     players_color = ChessPieceColor.WHITE if game_data.game_mode is GameMode.WHITE_DOWN else ChessPieceColor.BLACK
     computers_color = ChessPieceColor.BLACK if game_data.game_mode is GameMode.WHITE_DOWN else ChessPieceColor.WHITE
-    if curr_depth <= 0 or game_data.board_analyzer.is_terminal(board=game_data.board):
-        return (game_data.board_analyzer.evaluate_board(game_mode=game_data.game_mode, board=game_data.board), None)
-    elif computers_turn:
+    status = game_data.board_analyzer.get_position_status(board=game_data.board)
+    if status.is_terminal():
+        context.stats.leaf_evaluations += 1
+        return (game_data.board_analyzer.evaluate_board(game_mode=game_data.game_mode, board=game_data.board, status=status), None)
+
+    transposition_table = game_data.transposition_table
+    key = game_data.board.get_hash()
+    tt_move = None
+    context.stats.tt_probes += 1
+    if (entry := transposition_table.probe(key)) is not None:
+        context.stats.tt_hits += 1
+        tt_move = entry.best_move
+        # the root always searches so that it can hand back a verified move
+        if ply > 0 and entry.depth >= curr_depth:
+            if entry.bound is BoundType.EXACT:
+                return (entry.score, entry.best_move)
+            elif entry.bound is BoundType.LOWER:
+                beta = max(beta, entry.score)
+            else:
+                alpha = min(alpha, entry.score)
+
+            if alpha <= beta:
+                return (entry.score, entry.best_move)
+
+    alpha_orig, beta_orig = alpha, beta
+
+    if computers_turn:
         min_score = math.inf
         best_move = None
-        for move in game_data.board_analyzer.get_all_valid_moves(color=computers_color, board=game_data.board):
+        moves = game_data.board_analyzer.get_all_valid_moves(color=computers_color, board=game_data.board)
+        for (index, move) in enumerate(context.move_orderer.order_moves(moves=moves, board=game_data.board, ply=ply, tt_move=tt_move)):
             game_data.board.make_move(x1=move.x1, y1=move.y1, x2=move.x2, y2=move.y2)
-            (curr_score, next_move) = minimax(game_data, curr_depth - 1, computers_turn=False, alpha=alpha, beta=beta)
+            try:
+                (curr_score, next_move) = minimax(game_data, curr_depth - 1, computers_turn=False, alpha=alpha, beta=beta, ply=ply + 1, context=context)
+            finally:
+                game_data.board.unmake_move()
+
             if curr_score < min_score:
                 min_score = curr_score
                 best_move = move
             elif curr_score == min_score and random.random() > 0.5:
                 best_move = move
-            
-            game_data.board.unmake_move()
+
             alpha = min(alpha, curr_score)
 
             if alpha < beta:
+                context.move_orderer.record_cutoff(move=move, board=game_data.board, ply=ply, depth=curr_depth)
+                context.stats.cutoffs += 1
+                context.stats.first_move_cutoffs += index == 0
                 break
 
-        
-        i += 1
-        if (i % 100 == 0): print(i, alpha, beta)
 
-        return (min_score, best_move)
+        score = min_score
 
     else:
         max_score = -math.inf
         best_move = None
-        for move in game_data.board_analyzer.get_all_valid_moves(color=players_color, board=game_data.board):
+        moves = game_data.board_analyzer.get_all_valid_moves(color=players_color, board=game_data.board)
+        for (index, move) in enumerate(context.move_orderer.order_moves(moves=moves, board=game_data.board, ply=ply, tt_move=tt_move)):
             game_data.board.make_move(x1=move.x1, y1=move.y1, x2=move.x2, y2=move.y2)
-            (curr_score, next_move) = minimax(game_data, curr_depth - 1, computers_turn=True, alpha=alpha, beta=beta)
+            try:
+                (curr_score, next_move) = minimax(game_data, curr_depth - 1, computers_turn=True, alpha=alpha, beta=beta, ply=ply + 1, context=context)
+            finally:
+                game_data.board.unmake_move()
+
             if curr_score > max_score:
                 max_score = curr_score
                 best_move = move
             elif curr_score == max_score and random.random() > 0.5:
                 best_move = move
-            
-            game_data.board.unmake_move()
+
             beta = max(beta, curr_score)
 
             if alpha < beta:
+                context.move_orderer.record_cutoff(move=move, board=game_data.board, ply=ply, depth=curr_depth)
+                context.stats.cutoffs += 1
+                context.stats.first_move_cutoffs += index == 0
                 break
 
 
-        if (i % 100 == 0): print(i, alpha, beta)
-        i += 1
+        score = max_score
+
+    if score <= beta_orig:
+        bound = BoundType.UPPER
+    elif score >= alpha_orig:
+        bound = BoundType.LOWER
+    else:
+        bound = BoundType.EXACT
+    transposition_table.store(key=key, depth=curr_depth, bound=bound, score=score, best_move=best_move)
+
+    return (score, best_move)
+
+
+
+def get_book_move(game_data: ChessGameData) -> Move | None:
+    if game_data.opening_book is None:
+        return None
+    return game_data.opening_book.get_move(board=game_data.board, board_analyzer=game_data.board_analyzer)
+
+def get_ponder_move(game_data: ChessGameData) -> Move | None:
+    # guesses the player's reply in the current position: the move the
+    # last search expected (its transposition table entry for this
+    # position) if it's legal here, else the best ordered move
+    players_color = ChessPieceColor.WHITE if game_data.game_mode is GameMode.WHITE_DOWN else ChessPieceColor.BLACK
+    moves = game_data.board_analyzer.get_all_valid_moves(color=players_color, board=game_data.board)
+    if not moves:
+        return None
+    if (entry := game_data.transposition_table.probe(game_data.board.get_hash())) is not None and entry.best_move in moves:
+        return entry.best_move
+    return MoveOrderer().order_moves(moves=moves, board=game_data.board, ply=0)[0]
 
-        return (max_score, best_move)
+def get_ai_move(
+    game_data: ChessGameData,
+    limits: SearchLimits | None = None,
+    stop_event: threading.Event | None = None,
+    stats: SearchStats | None = None,
+    progress_callback: ProgressCallback | None = None,
+    progress_interval: int | None = None
+) -> Move | None:
+    # iterative deepening: every completed depth seeds the transposition
+    # table for the next one, and when a limit is hit (or stop_event is
+    # set) the move of the last completed depth is returned
+    if game_data.threads > 1:
+        # imported here because parallel_search builds on this module
+        from parallel_search import get_ai_move_parallel
+        return get_ai_move_parallel(
+            game_data=game_data,
+            workers=game_data.threads,
+            limits=limits,
+            stop_event=stop_event,
+            stats=stats,
+            progress_callback=progress_callback
+        )
+    if (book_move := get_book_move(game_data=game_data)) is not None:
+        return book_move
 
+    limits = limits if limits is not None else SearchLimits()
+    max_depth = limits.max_depth if limits.max_depth is not None else game_data.depth
+    context = SearchContext(
+        limits=limits,
+        stop_event=stop_event,
+        stats=stats,
+        progress_callback=progress_callback,
+        progress_interval=progress_interval
+    )
+    game_data.transposition_table.new_search()
 
+    best_move = None
+    for depth in range(1, max_depth + 1):
+        depth_start = time.perf_counter()
+        try:
+            (score, move) = minimax(game_data=game_data, curr_depth=depth, computers_turn=True, context=context)
+        except SearchAbortedException:
+            break
+        best_move = move
+        context.stats.score = score
+        context.stats.best_move = move
+        context.complete_depth(depth=depth, seconds=time.perf_counter() - depth_start)
 
-def get_ai_move(game_data: ChessGameData) -> Move:
-    global i
-    i = 0
-    (_, move) = minimax(game_data=game_data, curr_depth=game_data.depth, computers_turn=True)
-    return move
+    if best_move is None:
+        # stopped before depth 1 finished, still hand back a legal move
+        computers_color = ChessPieceColor.BLACK if game_data.game_mode is GameMode.WHITE_DOWN else ChessPieceColor.WHITE
+        best_move = next(game_data.board_analyzer.iter_valid_moves(color=computers_color, board=game_data.board), None)
 
+    return best_move
@@ -0,0 +1,48 @@
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+from board import Board
+from exceptions import InvalidFenException
+from intefaces import IChessPieceFactory
+
+
+@dataclass(frozen=True, slots=True)
+class EpdRecord:
+    board: Board
+    # EPD operations such as "id" or "bm", quotes around operands are removed
+    operations: dict[str, str]
+    line_number: int
+
+
+def parse_epd_line(line: str) -> tuple[str, dict[str, str]]:
+    # splits a FEN or EPD line into the position and its operations, a
+    # line whose 5th and 6th fields are numbers is treated as plain FEN
+    fields = line.split(maxsplit=6)
+    position_fields = 6 if len(fields) >= 6 and fields[4].isdigit() and fields[5].isdigit() else 4
+    fields = line.split(maxsplit=position_fields)
+    operations = dict()
+    if len(fields) > position_fields:
+        for operation in fields[position_fields].split(';'):
+            if not (operation := operation.strip()):
+                continue
+            (opcode, _, operand) = operation.partition(' ')
+            operations[opcode] = operand.strip().strip('"')
+
+    return (' '.join(fields[:position_fields]), operations)
+
+def iter_epd_lines(lines: Iterable[str], chess_piece_factory: IChessPieceFactory | None = None, board_class: type[Board] = Board, max_history: int = 10000) -> Iterator[EpdRecord]:
+    # boards are built one line at a time, so arbitrarily large files never
+    # have to be held in memory, blank lines and "#" comments are skipped
+    for (line_number, line) in enumerate(lines, start=1):
+        if not (line := line.strip()) or line.startswith('#'):
+            continue
+        (fen, operations) = parse_epd_line(line)
+        try:
+            board = board_class.from_fen(fen, chess_piece_factory=chess_piece_factory, max_history=max_history)
+        except InvalidFenException as error:
+            raise InvalidFenException(fen=error.fen, reason=f"line {line_number}: {error.reason}") from error
+        yield EpdRecord(board=board, operations=operations, line_number=line_number)
+
+def iter_epd_file(path: str, chess_piece_factory: IChessPieceFactory | None = None, board_class: type[Board] = Board, max_history: int = 10000) -> Iterator[EpdRecord]:
+    with open(path) as file:
+        yield from iter_epd_lines(file, chess_piece_factory=chess_piece_factory, board_class=board_class, max_history=max_history)
@@ -10,3 +10,14 @@ class KingPieceNotFoundException(Exception):
     def __init__(self, color: ChessPieceColor) -> None:
         super().__init__(f"no king found for {color.value} pieces")
 
+
+class SearchAbortedException(Exception):
+    def __init__(self, reason: str) -> None:
+        self.reason = reason
+        super().__init__(f"search aborted ({self.reason})")
+
+class InvalidFenException(Exception):
+    def __init__(self, fen: str, reason: str) -> None:
+        self.fen = fen
+        self.reason = reason
+        super().__init__(f"invalid FEN {self.fen!r} ({self.reason})")
@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import override
 
-from chess_enums import ChessPieceColor, GameMode
+from chess_enums import ChessPieceColor, ChessPieceType, GameMode
 from chesspiece import ChessPiece
 from intefaces import IChessPiece
 from move_strategy import PawnMoveStrategy, KinghtMoveStrategy, BishopMoveStrategy, RookMoveStrategy, KingMoveStrategy
@@ -29,6 +29,17 @@ class AbstractChessPieceFactory(ABC):
     @abstractmethod
     def create_king(self, color: ChessPieceColor, row: int, col: int) -> IChessPiece:...
 
+    def create(self, piece_type: ChessPieceType, color: ChessPieceColor, row: int, col: int) -> IChessPiece:
+        creators = {
+            ChessPieceType.PAWN: self.create_pawn,
+            ChessPieceType.KNIGHT: self.create_knight,
+            ChessPieceType.BISHOP: self.create_bishop,
+            ChessPieceType.ROOK: self.create_rook,
+            ChessPieceType.QUEEN: self.create_queen,
+            ChessPieceType.KING: self.create_king,
+        }
+        return creators[piece_type](color, row, col)
+
 
 class SimpleChessPieceFactory(AbstractChessPieceFactory):
     def __init__(self, game_mode: GameMode) -> None:
@@ -47,6 +58,7 @@ class SimpleChessPieceFactory(AbstractChessPieceFactory):
             col=col,
             points=1,
             is_king_piece=False,
+            piece_type=ChessPieceType.PAWN,
             move_strategies=[self.pawn_strategy]
         )
     
@@ -58,6 +70,7 @@ class SimpleChessPieceFactory(AbstractChessPieceFactory):
             col=col,
             points=3,
             is_king_piece=False,
+            piece_type=ChessPieceType.KNIGHT,
             move_strategies=[self.knight_strategy]
         )
     
@@ -69,6 +82,7 @@ class SimpleChessPieceFactory(AbstractChessPieceFactory):
             col=col,
             points=3,
             is_king_piece=False,
+            piece_type=ChessPieceType.BISHOP,
             move_strategies=[self.bishop_strategy]
         )
     
@@ -80,6 +94,7 @@ class SimpleChessPieceFactory(AbstractChessPieceFactory):
             col=col,
             points=5,
             is_king_piece=False,
+            piece_type=ChessPieceType.ROOK,
             move_strategies=[self.rook_strategy]
         )
     
@@ -91,6 +106,7 @@ class SimpleChessPieceFactory(AbstractChessPieceFactory):
             col=col,
             points=9,
             is_king_piece=False,
+            piece_type=ChessPieceType.QUEEN,
             move_strategies=[self.rook_strategy, self.bishop_strategy]
         )
     
@@ -102,6 +118,7 @@ class SimpleChessPieceFactory(AbstractChessPieceFactory):
             col=col,
             points=100,
             is_king_piece=True,
+            piece_type=ChessPieceType.KING,
             move_strategies=[self.king_strategy]
         )
 
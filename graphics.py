@@ -2,10 +2,12 @@ import itertools
 
 import pygame
 
+from background_search import BackgroundSearch
 from chesspiece import ChessPiece
-from computer import get_ai_move
 from chess_game_data import ChessGameData
 from chess_enums import ChessPieceColor, BoardBackgroundTile, GameMode
+from computer import get_ponder_move
+from move import Move, get_move
 
 assets = dict()
 assets[BoardBackgroundTile.DARK] = pygame.transform.scale(pygame.image.load('assets/JohnPablok Cburnett Chess set/128px/square brown dark_png_shadow_128px.png'), (75, 75))
@@ -16,6 +18,11 @@ assets[BoardBackgroundTile.HIGHLIGHTED] = pygame.transform.scale(pygame.image.lo
 pygame.font.init()
 font = pygame.font.SysFont('Comic Sans MS', 30)
 
+# posted by the search thread with the computer's move (event.move) and
+# the BackgroundSearch that found it (event.search)
+AI_MOVE_EVENT = pygame.event.custom_type()
+FPS = 30
+
 
 class Graphics:
     def __init__(self, game_data: ChessGameData, size: tuple[int, int] = (600, 650)): 
@@ -27,6 +34,11 @@ class Graphics:
         self.screen = pygame.display.set_mode(size=size)
         self.screen.fill((0, 0, 0))
         self.game_data = game_data
+        # the computer's search while it's thinking, None on the player's turn
+        self.search: BackgroundSearch | None = None
+        # the computer's answer to the player's expected reply, searched
+        # on the player's time when game_data.ponder is set
+        self.ponder: BackgroundSearch | None = None
 
     def draw_background(self):
         block_x = 0
@@ -43,7 +55,7 @@ class Graphics:
         step_x = 0
         surface_width = pygame.display.get_surface().get_size()[0]
 
-        for piece in itertools.chain(self.game_data.board.get_pieces(ChessPieceColor.WHITE), self.game_data.board.black_pieces):
+        for piece in itertools.chain(self.game_data.board.get_pieces(ChessPieceColor.WHITE), self.game_data.board.get_pieces(ChessPieceColor.BLACK)):
             row, col = piece.get_row(), piece.get_col()
             step_x = col * 75
             step_y = surface_width - 75 * (row + 1)
@@ -65,23 +77,84 @@ class Graphics:
         self.screen.blit(text_surface_restart, (150, 620))
         pygame.display.update()
 
+    def draw_thinking(self, frame: int | None):
+        # animated dots while the computer searches, None clears the indicator
+        surface = pygame.Surface((400, 50))
+        surface.fill((0, 0, 0))
+        self.screen.blit(surface, (100, 600))
+        if frame is not None:
+            text_surface = font.render('THINKING' + '.' * (frame // (FPS // 2) % 4), False, (237, 237, 237))
+            self.screen.blit(text_surface, (240, 610))
+        pygame.display.update()
+
+    def start_ai_search(self, ponder_move: Move | None = None) -> BackgroundSearch:
+        # pygame.event.post is thread safe, so the worker hands its move
+        # back through the event queue
+        def on_done(search: BackgroundSearch, move):
+            pygame.event.post(pygame.event.Event(AI_MOVE_EVENT, move=move, search=search))
+
+        return BackgroundSearch(game_data=self.game_data, on_done=on_done, ponder_move=ponder_move).start()
+
+    def start_pondering(self):
+        if self.game_data.ponder and (ponder_move := get_ponder_move(game_data=self.game_data)) is not None:
+            self.ponder = self.start_ai_search(ponder_move=ponder_move)
+
+    def reply_to(self, move: Move) -> BackgroundSearch:
+        # a ponder search for the move the player made becomes the
+        # computer's search, finished or not, anything else starts over
+        ponder, self.ponder = self.ponder, None
+        if ponder is None or ponder.ponder_move != move:
+            if ponder is not None:
+                ponder.cancel()
+            return self.start_ai_search()
+
+        if not ponder.is_running():
+            # its AI_MOVE_EVENT was ignored while it was only a guess
+            pygame.event.post(pygame.event.Event(AI_MOVE_EVENT, move=ponder.move, search=ponder))
+        return ponder
+
+    def get_game_over_text(self) -> str | None:
+        status = self.game_data.board_analyzer.get_position_status(board=self.game_data.board)
+        if status.get_winner() is ChessPieceColor.WHITE:
+            return 'WHITE WINS!'
+        elif status.get_winner() is ChessPieceColor.BLACK:
+            return 'BLACK WINS!'
+        elif status.is_draw():
+            return 'DRAW!'
+        return None
+
+    def cancel_ai_search(self):
+        for search in (self.search, self.ponder):
+            if search is not None:
+                search.cancel()
+        (self.search, self.ponder) = (None, None)
+
     def start(self):
+        try:
+            return self.run_game()
+        finally:
+            # closing the window or restarting drops a search still running
+            self.cancel_ai_search()
+
+    def run_game(self):
         possible_piece_moves = []
         running = True
         visible_moves = False
         dimensions = pygame.display.get_surface().get_size()
         game_over = False
         piece = None
+        clock = pygame.time.Clock()
+        frame = 0
         player_color = ChessPieceColor.WHITE if self.game_data.game_mode is GameMode.WHITE_DOWN else ChessPieceColor.BLACK
         if self.game_data.game_mode is GameMode.BLACK_DOWN and self.game_data.play_with_ai:
-            move = get_ai_move(self.game_data)
-            self.game_data.board.make_move(x1=move.x1, y1=move.y1, x2=move.x2, y2=move.y2)
-            self.draw_background()
+            self.search = self.start_ai_search()
 
         moving_piece = None
         while running:
             if game_over:
                 self.draw_text(game_over_txt)
+            elif self.search is not None:
+                self.draw_thinking(frame=frame)
 
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -91,16 +164,30 @@ class Graphics:
                         return True # restart game
                     else:
                         return False # game over
-                if event.type == pygame.MOUSEBUTTONDOWN and not game_over:
+                if event.type == AI_MOVE_EVENT and event.search is self.search:
+                    self.search = None
+                    self.draw_thinking(frame=None)
+                    if (move := event.move) is not None:
+                        self.game_data.board.make_move(x1=move.x1, y1=move.y1, x2=move.x2, y2=move.y2)
+                        self.draw_background()
+                    if (game_over_txt := self.get_game_over_text()) is not None:
+                        game_over = True
+                    else:
+                        self.start_pondering()
+                # the board belongs to the computer until its move arrives
+                if event.type == pygame.MOUSEBUTTONDOWN and not game_over and self.search is None:
                     x = 7 - pygame.mouse.get_pos()[1] // 75
                     y = pygame.mouse.get_pos()[0] // 75
-                    if (piece := self.game_data.board.get_piece_at(x, y)) and (player_color == piece.get_color() or not self.game_data.play_with_ai) and (x, y) not in possible_piece_moves:
+                    # only the side to move may move, also without the computer,
+                    # game over detection only looks at the side to move
+                    if (
+                        (piece := self.game_data.board.get_piece_at(x, y))
+                        and piece.get_color() is self.game_data.board.get_side_to_move()
+                        and (player_color == piece.get_color() or not self.game_data.play_with_ai)
+                        and (x, y) not in possible_piece_moves
+                    ):
                         moving_piece = piece
-                        moves = self.game_data.board_analyzer.filter_moves(
-                            color=piece.get_color(),
-                            moves=piece.get_moves(board=self.game_data.board, board_analyzer=self.game_data.board_analyzer),
-                            board=self.game_data.board
-                        )
+                        moves = self.game_data.board_analyzer.get_valid_moves(piece=piece, board=self.game_data.board)
                         move_positions = []
                         possible_piece_moves.clear()
                         
@@ -123,25 +210,20 @@ class Graphics:
                         clicked_move = (x, y)
                         try:
                             if clicked_move in possible_piece_moves:
+                                players_move = get_move(x1=moving_piece.get_row(), y1=moving_piece.get_col(), x2=x, y2=y)
                                 self.game_data.board.make_move(moving_piece.get_row(), moving_piece.get_col(), x, y)
                                 possible_piece_moves.clear()
                                 self.draw_background()
-                                if self.game_data.play_with_ai:
-                                    move = get_ai_move(self.game_data)
-                                    if (move is not None):
-                                        self.game_data.board.make_move(x1=move.x1, y1=move.y1, x2=move.x2, y2=move.y2)
-                                        self.draw_background()
-                                        
-                            if self.game_data.board_analyzer.is_winner(color=ChessPieceColor.WHITE, board=self.game_data.board):
-                                game_over = True
-                                game_over_txt = 'WHITE WINS!'
-                            elif self.game_data.board_analyzer.is_winner(color=ChessPieceColor.BLACK, board=self.game_data.board):
-                                game_over = True
-                                game_over_txt = 'BLACK WINS!'
-                            elif self.game_data.board_analyzer.is_draw(board=self.game_data.board):
-                                game_over = True
-                                game_over_txt = 'DRAW!'
+                                if (game_over_txt := self.get_game_over_text()) is not None:
+                                    game_over = True
+                                    self.cancel_ai_search()
+                                elif self.game_data.play_with_ai:
+                                    # the computer replies from a worker thread, see AI_MOVE_EVENT
+                                    self.search = self.reply_to(move=players_move)
                         except UnboundLocalError:
                             print("Error")
+
+            clock.tick(FPS)
+            frame += 1
         
         return False
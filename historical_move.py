@@ -3,7 +3,18 @@ from typing import Type
 from dataclasses import dataclass, field
 from intefaces import IChessPiece
 
-from move import Move
+from move import Move, get_move
+
+# Board keeps its history as packed ints: bits 0-5 hold the from square
+# and bits 6-11 the to square (square = row * 8 + col), the captured piece
+# itself is kept next to the record so unmake_move can put it back
+def pack_move_record(x1: int, y1: int, x2: int, y2: int) -> int:
+    return (x1 * 8 + y1) | (x2 * 8 + y2) << 6
+
+def unpack_move_record(record: int) -> Move:
+    from_square = record & 63
+    to_square = (record >> 6) & 63
+    return get_move(from_square >> 3, from_square & 7, to_square >> 3, to_square & 7)
 
 
 @dataclass(frozen=True)
@@ -1,10 +1,14 @@
 from __future__ import annotations
-from typing import Protocol, Type
+from typing import TYPE_CHECKING, Iterator, Protocol, Type
 
-import pygame
-
-from chess_enums import ChessPieceColor, GameMode
+from chess_enums import ChessPieceColor, ChessPieceType, GameMode
 from move import Move
+from position_status import PositionStatus
+
+# pygame is only needed for type hints, headless users never load it
+if TYPE_CHECKING:
+    import pygame
+    from historical_move import HistoricalMove
 
 class IChessPiece(Protocol):
     def get_row(self) -> int:...
@@ -13,7 +17,10 @@ class IChessPiece(Protocol):
     def set_position(self, x: int, y: int):...
     def get_points(self) -> int:...
     def is_king(self):...
-    def get_moves(self, board: IBoard, board_analyzer: IBoardAnalyzer) -> set[Move]:...
+    def get_type(self) -> ChessPieceType:...
+    def get_moves(self, board: IBoard, board_analyzer: IBoardAnalyzer) -> list[Move]:...
+    def iter_moves(self, board: IBoard, board_analyzer: IBoardAnalyzer) -> Iterator[Move]:...
+    def attacks(self, x: int, y: int, board: IBoard, board_analyzer: IBoardAnalyzer) -> bool:...
     def get_image(self) -> pygame.SurfaceType | None:...
 
 
@@ -25,6 +32,15 @@ class IBoard(Protocol):
     def is_position_empty(self, x: int, y: int) -> bool:...
     def get_king(self, color: ChessPieceColor) -> IChessPiece:...
     def get_pieces(self, color: ChessPieceColor) -> set[IChessPiece]:...
+    def get_side_to_move(self) -> ChessPieceColor:...
+    def get_hash(self) -> int:...
+    def get_material_balance(self) -> int:...
+    def get_positional_score(self) -> float:...
+    def get_history_length(self) -> int:...
+    def get_piece_count(self, color: ChessPieceColor, piece_type: ChessPieceType) -> int:...
+    def get_piece_counts(self) -> dict[tuple[ChessPieceColor, ChessPieceType], int]:...
+    def get_last_move(self) -> HistoricalMove | None:...
+    def get_pawn_game_mode(self) -> GameMode | None:...
 
 
 class IBoardAnalyzer(Protocol):
@@ -34,14 +50,23 @@ class IBoardAnalyzer(Protocol):
     @classmethod
     def are_opponents(cls, piece1: IChessPiece, piece2: IChessPiece) -> bool:...
     
+    @classmethod
+    def is_square_attacked(cls, x: int, y: int, by_color: ChessPieceColor, board: IBoard) -> bool:...
+
     @classmethod
     def is_there_any_threat_to_king(cls, color: ChessPieceColor, board: IBoard) -> bool:...
 
     @classmethod
-    def filter_moves(cls, color: ChessPieceColor, moves: set[Move], board: IBoard) -> set[Move]:...
+    def filter_moves(cls, color: ChessPieceColor, moves: list[Move], board: IBoard) -> list[Move]:...
     
     @classmethod
-    def get_all_valid_moves(cls, color: ChessPieceColor, board: IBoard) -> set[Move]:...
+    def iter_valid_moves(cls, color: ChessPieceColor, board: IBoard) -> Iterator[Move]:...
+
+    @classmethod
+    def get_all_valid_moves(cls, color: ChessPieceColor, board: IBoard) -> list[Move]:...
+
+    @classmethod
+    def get_valid_moves(cls, piece: IChessPiece, board: IBoard) -> list[Move]:...
     
     @classmethod
     def has_moves(cls, color: ChessPieceColor, board: IBoard):...
@@ -50,19 +75,23 @@ class IBoardAnalyzer(Protocol):
     def insufficient_material(cls, board: IBoard) -> bool:...
     
     @classmethod
-    def is_winner(cls, color: ChessPieceColor, board: IBoard) -> bool:...
+    def get_position_status(cls, board: IBoard) -> PositionStatus:...
+
+    @classmethod
+    def is_winner(cls, color: ChessPieceColor, board: IBoard, status: PositionStatus | None = None) -> bool:...
     
     @classmethod
-    def is_draw(cls, board: IBoard) -> bool:...
+    def is_draw(cls, board: IBoard, status: PositionStatus | None = None) -> bool:...
     
     @classmethod
-    def is_terminal(cls, board: IBoard) -> bool:...
+    def is_terminal(cls, board: IBoard, status: PositionStatus | None = None) -> bool:...
     
     @classmethod
     def evaluate_delta_points_for_given_board(cls, game_mode: GameMode, board: IBoard) -> int:...
 
     @classmethod
-    def evaluate_board(cls, game_mode: GameMode, board: IBoard) -> int:...
-
+    def evaluate_board(cls, game_mode: GameMode, board: IBoard, status: PositionStatus | None = None) -> float:...
 
 
+class IChessPieceFactory(Protocol):
+    def create(self, piece_type: ChessPieceType, color: ChessPieceColor, row: int, col: int) -> IChessPiece:...
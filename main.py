@@ -6,6 +6,7 @@ from chess_game_data import ChessGameData
 from chess_enums import GameMode
 from factory import normal_chess_board_pieces_factory
 from chesspiece_with_gui_factory import ChessPieceWithGUIFactory
+from opening_book import OpeningBook
 
 
 if __name__ == '__main__':
@@ -17,6 +18,9 @@ if __name__ == '__main__':
         print("invalid value for depth taking default depth = 2")
         depth = 2
 
+    # an optional Polyglot .bin book for the computer's opening moves
+    opening_book = OpeningBook(path=sys.argv[2]) if len(sys.argv) > 2 else None
+
     game_mode = GameMode.WHITE_DOWN
     chess_piece_factory = ChessPieceWithGUIFactory(game_mode=game_mode)
 
@@ -28,7 +32,9 @@ if __name__ == '__main__':
         board=board,
         board_analyzer=board_analyzer,
         depth=depth,
-        play_with_ai=True
+        play_with_ai=True,
+        ponder=True,
+        opening_book=opening_book
     )
 
     gui = Graphics(game_data=game_data)
@@ -1,9 +1,37 @@
 from dataclasses import dataclass
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Move:
     x1: int
     y1: int
     x2: int
     y2: int
-    
\ No newline at end of file
+
+    def to_uci(self) -> str:
+        # rows are ranks and cols are files, e.g. Move(1, 4, 3, 4) is "e2e4"
+        return f"{chr(ord('a') + self.y1)}{self.x1 + 1}{chr(ord('a') + self.y2)}{self.x2 + 1}"
+
+    @classmethod
+    def from_uci(cls, text: str) -> 'Move':
+        if len(text) != 4 or not all(
+            'a' <= text[index] <= 'h' and '1' <= text[index + 1] <= '8' for index in (0, 2)
+        ):
+            raise ValueError(f"invalid move: {text!r}")
+
+        return get_move(
+            x1=int(text[1]) - 1,
+            y1=ord(text[0]) - ord('a'),
+            x2=int(text[3]) - 1,
+            y2=ord(text[2]) - ord('a')
+        )
+
+
+# every possible move is created once, move generation hands out these
+# shared instances instead of allocating new ones
+MOVES: tuple[tuple[Move, ...], ...] = tuple(
+    tuple(Move(from_square >> 3, from_square & 7, to_square >> 3, to_square & 7) for to_square in range(64))
+    for from_square in range(64)
+)
+
+def get_move(x1: int, y1: int, x2: int, y2: int) -> Move:
+    return MOVES[x1 * 8 + y1][x2 * 8 + y2]
@@ -0,0 +1,42 @@
+from intefaces import IBoard
+from move import Move
+
+
+class MoveOrderer:
+    # orders moves as: transposition table move, captures by most valuable
+    # victim / least valuable attacker, the two killer moves of the ply,
+    # then quiet moves by their history score
+    def __init__(self, max_ply: int = 128):
+        self.killers: list[list[Move | None]] = [[None, None] for _ in range(max_ply)]
+        self.history: list[int] = [0] * (64 * 64)
+
+    def score_move(self, move: Move, board: IBoard, ply: int, tt_move: Move | None) -> tuple[int, int]:
+        if move == tt_move:
+            return (3, 0)
+        elif (victim := board.get_piece_at(move.x2, move.y2)) is not None:
+            attacker = board.get_piece_at(move.x1, move.y1)
+            return (2, victim.get_points() * 1000 - attacker.get_points())
+        elif ply < len(self.killers) and move in self.killers[ply]:
+            return (1, -self.killers[ply].index(move))
+        else:
+            return (0, self.history[(move.x1 * 8 + move.y1) * 64 + move.x2 * 8 + move.y2])
+
+    def order_moves(self, moves: list[Move], board: IBoard, ply: int, tt_move: Move | None = None) -> list[Move]:
+        # ties fall back to the squares, moves are generated in the set order
+        # of the pieces (by object id), which differs from run to run
+        return sorted(
+            moves,
+            key=lambda move: (self.score_move(move=move, board=board, ply=ply, tt_move=tt_move), move.x1, move.y1, move.x2, move.y2),
+            reverse=True
+        )
+
+    def record_cutoff(self, move: Move, board: IBoard, ply: int, depth: int):
+        # only quiet moves are remembered, captures are already ordered first
+        if board.get_piece_at(move.x2, move.y2) is not None:
+            return
+
+        if ply < len(self.killers) and self.killers[ply][0] != move:
+            self.killers[ply][1] = self.killers[ply][0]
+            self.killers[ply][0] = move
+
+        self.history[(move.x1 * 8 + move.y1) * 64 + move.x2 * 8 + move.y2] += depth * depth
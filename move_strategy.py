@@ -1,30 +1,83 @@
-from typing import override, Type
+from typing import Iterator, override
 from abc import ABC, abstractmethod
-import operator
-import itertools
 
-from move import Move
+from move import Move, get_move
 from intefaces import IBoard, IBoardAnalyzer
 from chess_enums import ChessPieceColor, GameMode
 
+
+KNIGHT_DELTAS = ((1, 2), (2, 1), (-1, 2), (-2, 1), (1, -2), (2, -1), (-1, -2), (-2, -1))
+KING_DELTAS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+ROOK_DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+BISHOP_DIRECTIONS = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+def _build_jump_table(deltas: tuple[tuple[int, int], ...]) -> tuple[tuple[tuple[int, int], ...], ...]:
+    return tuple(
+        tuple(
+            (row + delta_row, col + delta_col)
+            for (delta_row, delta_col) in deltas
+            if 0 <= row + delta_row < 8 and 0 <= col + delta_col < 8
+        )
+        for row in range(8) for col in range(8)
+    )
+
+def _build_ray_table(directions: tuple[tuple[int, int], ...]) -> tuple[tuple[tuple[tuple[int, int], ...], ...], ...]:
+    table = []
+    for row in range(8):
+        for col in range(8):
+            rays = []
+            for (delta_row, delta_col) in directions:
+                ray = []
+                x, y = row + delta_row, col + delta_col
+                while 0 <= x < 8 and 0 <= y < 8:
+                    ray.append((x, y))
+                    x, y = x + delta_row, y + delta_col
+                rays.append(tuple(ray))
+            table.append(tuple(rays))
+
+    return tuple(table)
+
+
+# all tables are indexed by square = row * 8 + col
+KNIGHT_TARGETS = _build_jump_table(KNIGHT_DELTAS)
+KING_TARGETS = _build_jump_table(KING_DELTAS)
+PAWN_CAPTURE_TARGETS = {
+    direction: _build_jump_table(((direction, -1), (direction, 1))) for direction in (1, -1)
+}
+ROOK_RAYS = _build_ray_table(ROOK_DIRECTIONS)
+BISHOP_RAYS = _build_ray_table(BISHOP_DIRECTIONS)
+
+
 class ChessPieceMoveStrategy(ABC):
     @abstractmethod
-    def get_moves(self, row: int, col: int, board: IBoard, board_analyzer: IBoardAnalyzer) -> set[Move]:...
+    def iter_moves(self, row: int, col: int, board: IBoard, board_analyzer: IBoardAnalyzer) -> Iterator[Move]:...
+
+    def get_moves(self, row: int, col: int, board: IBoard, board_analyzer: IBoardAnalyzer) -> list[Move]:
+        return list(self.iter_moves(row=row, col=col, board=board, board_analyzer=board_analyzer))
+
+    def attacks(self, row: int, col: int, x: int, y: int, board: IBoard, board_analyzer: IBoardAnalyzer) -> bool:
+        return any(
+            move.x2 == x and move.y2 == y
+            for move in self.iter_moves(row=row, col=col, board=board, board_analyzer=board_analyzer)
+        )
 
 
 class PawnMoveStrategy(ChessPieceMoveStrategy):
     def __init__(self, game_mode: GameMode) -> None:
         self.game_mode = game_mode
 
+    def get_direction(self, color: ChessPieceColor) -> int:
+        if self.game_mode is GameMode.WHITE_DOWN and color is ChessPieceColor.WHITE or self.game_mode is GameMode.BLACK_DOWN and color is ChessPieceColor.BLACK:
+            return 1
+        else:
+            return -1
+
     @override
-    def get_moves(self, row: int, col: int, board: IBoard, board_analyzer: IBoardAnalyzer) -> set[Move]:
+    def iter_moves(self, row: int, col: int, board: IBoard, board_analyzer: IBoardAnalyzer) -> Iterator[Move]:
         curr_piece = board.get_piece_at(row, col)
 
-        moves = set()
-        if self.game_mode is GameMode.WHITE_DOWN and curr_piece.color is ChessPieceColor.WHITE or self.game_mode is GameMode.BLACK_DOWN and curr_piece.color is ChessPieceColor.BLACK:
-            direction = 1
-        else:
-            direction = -1
+        direction = self.get_direction(curr_piece.get_color())
         
         x = row + direction
         y = col
@@ -33,130 +86,65 @@ class PawnMoveStrategy(ChessPieceMoveStrategy):
             board.is_valid_position(x, y)
             and board.get_piece_at(x, y) is None
         ):
-            moves.add(Move(row, col, x, y))
+            yield get_move(row, col, x, y)
             if (
                 min(row, 7 - row) == 1
                 and board.is_valid_position(x + direction, y)
                 and board.get_piece_at(x + direction, y) is None
             ):
-                moves.add(Move(row, col, x + direction, y))
+                yield get_move(row, col, x + direction, y)
 
-        curr_piece = board.get_piece_at(row, col)
-        for y_diagonal in (y - 1, y + 1):
+        for (x, y_diagonal) in PAWN_CAPTURE_TARGETS[direction][row * 8 + col]:
             if (
-                board.is_valid_position(x, y_diagonal)
-                and (other_piece := board.get_piece_at(x, y_diagonal)) is not None
+                (other_piece := board.get_piece_at(x, y_diagonal)) is not None
                 and board_analyzer.are_opponents(curr_piece, other_piece)
             ):
-                moves.add(Move(row, col, x, y_diagonal))
+                yield get_move(row, col, x, y_diagonal)
 
-        return moves
+    @override
+    def attacks(self, row: int, col: int, x: int, y: int, board: IBoard, board_analyzer: IBoardAnalyzer) -> bool:
+        direction = self.get_direction(board.get_piece_at(row, col).get_color())
+        return x == row + direction and abs(y - col) == 1
 
 class KinghtMoveStrategy(ChessPieceMoveStrategy):
     @override
-    def get_moves(self, row: int, col: int, board: IBoard, board_analyzer: IBoardAnalyzer) -> set[Move]:
+    def iter_moves(self, row: int, col: int, board: IBoard, board_analyzer: IBoardAnalyzer) -> Iterator[Move]:
         curr_piece = board.get_piece_at(row, col)
-        moves = set()
-        add = operator.add
-        sub = operator.sub
-        op_list = [(add, sub), (sub, add), (add, add), (sub, sub)]
-        delta = [(1, 2), (2, 1)]
-        for comb in itertools.product(op_list, delta):
-            x = comb[0][0](row, comb[1][0])
-            y = comb[0][1](col, comb[1][1])
+        for (x, y) in KNIGHT_TARGETS[row * 8 + col]:
             if (
-                board.is_position_empty(x, y)
-                or (
-                    (other_piece := board.get_piece_at(x, y))
-                    and board_analyzer.are_opponents(curr_piece, other_piece)
-                )
+                (other_piece := board.get_piece_at(x, y)) is None
+                or board_analyzer.are_opponents(curr_piece, other_piece)
             ):
-                moves.add(Move(row, col, x, y))
-        
-        return moves
+                yield get_move(row, col, x, y)
+
+class SlidingPieceMoveStrategy(ChessPieceMoveStrategy):
+    rays: tuple[tuple[tuple[tuple[int, int], ...], ...], ...] = ()
 
-class BishopMoveStrategy(ChessPieceMoveStrategy):
     @override
-    def get_moves(self, row: int, col: int, board: IBoard, board_analyzer: IBoardAnalyzer) -> set[Move]:
+    def iter_moves(self, row: int, col: int, board: IBoard, board_analyzer: IBoardAnalyzer) -> Iterator[Move]:
         curr_piece = board.get_piece_at(row, col)
-        moves = set()
-        add = operator.add
-        sub = operator.sub
-        operators = [(add, add), (add, sub), (sub, add), (sub, sub)]
-        for ops in operators:
-            i = 0
-            while True:
-                i += 1
-                x = ops[0](row, i)
-                y = ops[1](col, i)
-                if not board.is_valid_position(x, y):
-                    break
-                elif (other_piece := board.get_piece_at(x, y)):
+        for ray in self.rays[row * 8 + col]:
+            for (x, y) in ray:
+                if (other_piece := board.get_piece_at(x, y)) is None:
+                    yield get_move(row, col, x, y)
+                else:
                     if board_analyzer.are_opponents(curr_piece, other_piece):
-                        moves.add(Move(row, col, x, y))
+                        yield get_move(row, col, x, y)
                     break
-                else:
-                    moves.add(Move(row, col, x, y))
 
-        return moves
+class BishopMoveStrategy(SlidingPieceMoveStrategy):
+    rays = BISHOP_RAYS
 
-class RookMoveStrategy(ChessPieceMoveStrategy):
-    @override
-    def get_moves(self, row: int, col: int, board: IBoard, board_analyzer: IBoardAnalyzer) -> set[Move]:
-        curr_piece = board.get_piece_at(row, col)
-        moves = set()
-
-        for op in [operator.add, operator.sub]:
-            i = 0
-            while True:
-                i += 1
-                x = op(row, i)
-                if not board.is_valid_position(x, col):
-                    break
-                elif (other_piece := board.get_piece_at(x, col)):
-                    if (board_analyzer.are_opponents(curr_piece, other_piece)):
-                        moves.add(Move(row, col, x, col))
-                    break
-                else:
-                    moves.add(Move(row, col, x, col))
-
-        
-        for op in [operator.add, operator.sub]:
-            i = 0
-            while True:
-                i += 1
-                y = op(col, i)
-                if not board.is_valid_position(row, y):
-                    break
-                elif (other_piece := board.get_piece_at(row, y)):
-                    if (board_analyzer.are_opponents(curr_piece, other_piece)):
-                        moves.add(Move(row, col, row, y))
-                    break
-                else:
-                    moves.add(Move(row, col, row, y))
-        
-        return moves
+class RookMoveStrategy(SlidingPieceMoveStrategy):
+    rays = ROOK_RAYS
 
 class KingMoveStrategy(ChessPieceMoveStrategy):
     @override
-    def get_moves(self, row: int, col: int, board: IBoard, board_analyzer: IBoardAnalyzer) -> set[Move]:
+    def iter_moves(self, row: int, col: int, board: IBoard, board_analyzer: IBoardAnalyzer) -> Iterator[Move]:
         curr_piece = board.get_piece_at(row, col)
-        moves = set()
-
-        for delta_row in range(-1, 2):
-            for delta_col in range(-1, 2):
-                    x = row + delta_row
-                    y = col + delta_col
-
-                    if (
-                        (delta_row or delta_col)
-                        and board.is_valid_position(x, y)
-                        and (
-                                (other_piece := board.get_piece_at(x, y)) is None
-                                or board_analyzer.are_opponents(curr_piece, other_piece)
-                            )
-                    ):
-                        moves.add(Move(row, col, x, y))
-        
-        return moves
-
+        for (x, y) in KING_TARGETS[row * 8 + col]:
+            if (
+                (other_piece := board.get_piece_at(x, y)) is None
+                or board_analyzer.are_opponents(curr_piece, other_piece)
+            ):
+                yield get_move(row, col, x, y)
@@ -0,0 +1,184 @@
+import math
+import multiprocessing
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import replace
+from multiprocessing.synchronize import Event
+
+from board import Board, BoardAnalyzer, CompactPosition
+from chess_enums import ChessPieceColor, GameMode
+from chess_game_data import ChessGameData
+from computer import SearchContext, SearchLimits, get_book_move, minimax
+from exceptions import SearchAbortedException
+from move import Move
+from move_ordering import MoveOrderer
+from search_stats import ProgressCallback, SearchStats
+from tablebase import Tablebases
+
+# how often (in seconds) the parent checks the caller's stop event and
+# the time limit while the workers search
+STOP_POLL_INTERVAL = 0.02
+
+# set in every worker process by _init_worker, shared with the parent so
+# that it can abort all workers at once
+_stop_event: Event | None = None
+
+
+def _init_worker(stop_event: Event):
+    global _stop_event
+    _stop_event = stop_event
+
+def _search_root_moves(
+    position: CompactPosition,
+    board_class: type[Board],
+    board_analyzer_class: type[BoardAnalyzer],
+    game_mode: GameMode,
+    quiescence_depth: int,
+    tablebase_directory: str | None,
+    max_depth: int,
+    limits: SearchLimits,
+    root_moves: list[Move]
+) -> tuple[dict[int, list[tuple[float, Move]]], int]:
+    # runs in a worker process: the pieces of the parent hold pygame
+    # surfaces, so the board is rebuilt headless from its compact form;
+    # every worker has its own transposition table, nothing is shared
+    # with the parent's table or the other workers
+    board = board_class.from_compact(position=position)
+    tablebases = Tablebases(directory=tablebase_directory) if tablebase_directory is not None else None
+    game_data = ChessGameData(
+        game_mode=game_mode,
+        board=board,
+        board_analyzer=board_analyzer_class(),
+        depth=max_depth,
+        quiescence_depth=quiescence_depth,
+        tablebases=tablebases
+    )
+    context = SearchContext(limits=limits, stop_event=_stop_event)
+    try:
+        return (_deepen_root_moves(game_data=game_data, context=context, max_depth=max_depth, root_moves=root_moves), context.stats.nodes)
+    finally:
+        if tablebases is not None:
+            tablebases.close()
+
+def _deepen_root_moves(
+    game_data: ChessGameData,
+    context: SearchContext,
+    max_depth: int,
+    root_moves: list[Move]
+) -> dict[int, list[tuple[float, Move]]]:
+    board = game_data.board
+    results: dict[int, list[tuple[float, Move]]] = dict()
+    for depth in range(1, max_depth + 1):
+        depth_results = []
+        # the computer minimizes, so alpha is the best score found so far
+        alpha = math.inf
+        try:
+            for move in root_moves:
+                board.make_move(x1=move.x1, y1=move.y1, x2=move.x2, y2=move.y2)
+                try:
+                    (score, _) = minimax(game_data, depth - 1, computers_turn=False, alpha=alpha, ply=1, context=context)
+                finally:
+                    board.unmake_move()
+                depth_results.append((score, move))
+                alpha = min(alpha, score)
+        except SearchAbortedException:
+            break
+
+        results[depth] = depth_results
+        # search the best move of this depth first at the next one
+        root_moves = [move for (_, move) in sorted(depth_results, key=lambda result: result[0])]
+
+    return results
+
+
+def get_ai_move_parallel(
+    game_data: ChessGameData,
+    workers: int,
+    limits: SearchLimits | None = None,
+    stop_event: threading.Event | None = None,
+    stats: SearchStats | None = None,
+    progress_callback: ProgressCallback | None = None
+) -> Move | None:
+    # splits the root moves over worker processes, each one deepens its own
+    # share and the deepest depth completed by every worker decides the move;
+    # setting stop_event or reaching the time limit stops all workers, and
+    # the node limit is split between them
+    if (book_move := get_book_move(game_data=game_data)) is not None:
+        return book_move
+
+    limits = limits if limits is not None else SearchLimits()
+    max_depth = limits.max_depth if limits.max_depth is not None else game_data.depth
+    computers_color = ChessPieceColor.BLACK if game_data.game_mode is GameMode.WHITE_DOWN else ChessPieceColor.WHITE
+
+    moves = MoveOrderer().order_moves(
+        moves=game_data.board_analyzer.get_all_valid_moves(color=computers_color, board=game_data.board),
+        board=game_data.board,
+        ply=0
+    )
+    if len(moves) <= 1:
+        return next(iter(moves), None)
+
+    workers = min(workers, len(moves))
+    # round robin keeps the strongest looking moves spread over all workers
+    chunks = [moves[index::workers] for index in range(workers)]
+    position = game_data.board.to_compact()
+    stats = stats if stats is not None else SearchStats()
+    worker_limits = limits
+    if limits.node_limit is not None:
+        worker_limits = replace(limits, node_limit=max(limits.node_limit // workers, 1))
+    # the workers' own deadlines start late by the process start-up time,
+    # the parent stops them at the caller's deadline
+    deadline = time.monotonic() + limits.time_limit if limits.time_limit is not None else None
+    def should_stop() -> bool:
+        return (stop_event is not None and stop_event.is_set()) or (deadline is not None and time.monotonic() >= deadline)
+    workers_stop_event = multiprocessing.Event()
+    if should_stop():
+        workers_stop_event.set()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(workers_stop_event,)) as executor:
+        futures = [
+            executor.submit(
+                _search_root_moves,
+                position,
+                type(game_data.board),
+                type(game_data.board_analyzer),
+                game_data.game_mode,
+                game_data.quiescence_depth,
+                game_data.tablebases.directory if game_data.tablebases is not None else None,
+                max_depth,
+                worker_limits,
+                chunk
+            )
+            for chunk in chunks
+        ]
+        pending = set(futures)
+        while pending:
+            (_, pending) = wait(pending, timeout=STOP_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            if should_stop():
+                workers_stop_event.set()
+        worker_results = [future.result() for future in futures]
+
+    stats.nodes += sum(nodes for (_, nodes) in worker_results)
+    completed_depth = min((max(results) if results else 0) for (results, _) in worker_results)
+    if completed_depth == 0:
+        # some worker couldn't finish even depth 1, fall back to move ordering
+        return moves[0]
+
+    best_score = math.inf
+    best_move = None
+    for (results, _) in worker_results:
+        for (score, move) in results[completed_depth]:
+            if score < best_score:
+                best_score = score
+                best_move = move
+            elif score == best_score and random.random() > 0.5:
+                best_move = move
+
+    stats.completed_depth = completed_depth
+    stats.score = best_score
+    stats.best_move = best_move
+    if progress_callback is not None:
+        progress_callback(stats)
+    return best_move
@@ -0,0 +1,133 @@
+import argparse
+import json
+import sys
+import time
+
+from board import Board, BitBoard, BitBoardAnalyzer, BoardAnalyzer
+from chess_enums import GameMode
+from factory import SimpleChessPieceFactory, normal_chess_board_pieces_factory
+from intefaces import IBoard, IBoardAnalyzer
+from move import Move
+
+# reference positions as moves played from the start position
+REFERENCE_POSITIONS: dict[str, list[str]] = {
+    'startpos': [],
+    'two-knights': ['e2e4', 'e7e5', 'g1f3', 'b8c6', 'f1c4', 'g8f6'],
+    'queens-gambit': ['d2d4', 'd7d5', 'c2c4', 'e7e6', 'b1c3', 'g8f6', 'c1g5', 'f8e7'],
+    'open-sicilian': ['e2e4', 'c7c5', 'g1f3', 'd7d6', 'd2d4', 'c5d4', 'f3d4', 'g8f6', 'b1c3', 'a7a6'],
+}
+
+# this game has no castling, en passant or promotion, none of which can
+# happen within 4 plies of the start, so these are the standard values
+KNOWN_NODE_COUNTS: dict[str, dict[int, int]] = {
+    'startpos': {1: 20, 2: 400, 3: 8902, 4: 197281},
+}
+
+
+def create_board(position: str, board_class: type[Board] = Board) -> Board:
+    board = board_class(
+        pieces=normal_chess_board_pieces_factory(
+            chess_piece_factory=SimpleChessPieceFactory(game_mode=GameMode.WHITE_DOWN)
+        )
+    )
+    for text in REFERENCE_POSITIONS[position]:
+        move = Move.from_uci(text)
+        board.make_move(x1=move.x1, y1=move.y1, x2=move.x2, y2=move.y2)
+
+    return board
+
+def perft(board: IBoard, board_analyzer: IBoardAnalyzer, depth: int) -> int:
+    color = board.get_side_to_move()
+    moves = board_analyzer.get_all_valid_moves(color=color, board=board)
+    if depth <= 1:
+        return len(moves) if depth == 1 else 1
+
+    nodes = 0
+    for move in moves:
+        board.make_move(x1=move.x1, y1=move.y1, x2=move.x2, y2=move.y2)
+        nodes += perft(board=board, board_analyzer=board_analyzer, depth=depth - 1)
+        board.unmake_move()
+
+    return nodes
+
+def divide(board: IBoard, board_analyzer: IBoardAnalyzer, depth: int) -> dict[str, int]:
+    # leaf count below every root move, handy for finding which move a
+    # wrong total comes from
+    results = dict()
+    for move in board_analyzer.get_all_valid_moves(color=board.get_side_to_move(), board=board):
+        board.make_move(x1=move.x1, y1=move.y1, x2=move.x2, y2=move.y2)
+        results[move.to_uci()] = perft(board=board, board_analyzer=board_analyzer, depth=depth - 1)
+        board.unmake_move()
+
+    return dict(sorted(results.items()))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='count leaf nodes of the move generator to a fixed depth')
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--position', action='append', choices=sorted(REFERENCE_POSITIONS), help='defaults to all reference positions')
+    parser.add_argument('--fen', action='append', help='count from this FEN instead of the reference positions')
+    parser.add_argument('--divide', action='store_true', help='print the node count below every root move')
+    parser.add_argument('--bitboard', action='store_true', help='use BitBoard and BitBoardAnalyzer instead of Board')
+    parser.add_argument('--baseline', help='JSON file with earlier results to compare against')
+    parser.add_argument('--record', action='store_true', help='write the results to --baseline')
+    args = parser.parse_args(argv)
+
+    if args.depth < 1:
+        parser.error(f"depth can't be less than 1 (given: {args.depth})")
+    if args.record and not args.baseline:
+        parser.error('--record needs --baseline')
+
+    baseline = dict()
+    if args.baseline and not args.record:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    board_class = BitBoard if args.bitboard else Board
+    board_analyzer = BitBoardAnalyzer() if args.bitboard else BoardAnalyzer()
+    results = dict()
+    failed = False
+
+    positions = [
+        (position, create_board(position=position, board_class=board_class))
+        for position in args.position or ([] if args.fen else REFERENCE_POSITIONS)
+    ]
+    positions += [(fen, board_class.from_fen(fen)) for fen in args.fen or []]
+
+    for (position, board) in positions:
+        start = time.perf_counter()
+        if args.divide:
+            breakdown = divide(board=board, board_analyzer=board_analyzer, depth=args.depth)
+            nodes = sum(breakdown.values())
+        else:
+            nodes = perft(board=board, board_analyzer=board_analyzer, depth=args.depth)
+        elapsed = time.perf_counter() - start
+        nodes_per_second = nodes / elapsed if elapsed > 0 else 0.0
+
+        if args.divide:
+            for (move, count) in breakdown.items():
+                print(f"  {move}: {count}")
+
+        status = ''
+        expected = KNOWN_NODE_COUNTS.get(position, dict()).get(args.depth)
+        if (previous := baseline.get(position)) is not None and previous['depth'] == args.depth:
+            expected = expected if expected is not None else previous['nodes']
+            # a run too fast for the timer records 0 nodes/s
+            if previous['nodes_per_second'] > 0:
+                status = f" ({nodes_per_second / previous['nodes_per_second']:.2f}x baseline speed)"
+        if expected is not None and expected != nodes:
+            failed = True
+            status += f" MISMATCH: expected {expected} nodes"
+
+        print(f"{position}: depth {args.depth}, {nodes} nodes in {elapsed:.3f}s, {nodes_per_second:.0f} nodes/s{status}")
+        results[position] = {'depth': args.depth, 'nodes': nodes, 'seconds': elapsed, 'nodes_per_second': nodes_per_second}
+
+    if args.record:
+        with open(args.baseline, 'w') as file:
+            json.dump(results, file, indent=4)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+from chess_enums import ChessPieceColor, ChessPieceType
+
+# bonuses in hundredths of a pawn, written from white's point of view with
+# rank 8 on the first line and file a in the first column; black uses the
+# same tables mirrored vertically
+_PAWN_MIDGAME = (
+      0,   0,   0,   0,   0,   0,   0,   0,
+     50,  50,  50,  50,  50,  50,  50,  50,
+     10,  10,  20,  30,  30,  20,  10,  10,
+      5,   5,  10,  25,  25,  10,   5,   5,
+      0,   0,   0,  20,  20,   0,   0,   0,
+      5,  -5, -10,   0,   0, -10,  -5,   5,
+      5,  10,  10, -20, -20,  10,  10,   5,
+      0,   0,   0,   0,   0,   0,   0,   0,
+)
+_PAWN_ENDGAME = (
+      0,   0,   0,   0,   0,   0,   0,   0,
+     80,  80,  80,  80,  80,  80,  80,  80,
+     50,  50,  50,  50,  50,  50,  50,  50,
+     30,  30,  30,  30,  30,  30,  30,  30,
+     20,  20,  20,  20,  20,  20,  20,  20,
+     10,  10,  10,  10,  10,  10,  10,  10,
+      0,   0,   0,   0,   0,   0,   0,   0,
+      0,   0,   0,   0,   0,   0,   0,   0,
+)
+_KNIGHT = (
+    -50, -40, -30, -30, -30, -30, -40, -50,
+    -40, -20,   0,   0,   0,   0, -20, -40,
+    -30,   0,  10,  15,  15,  10,   0, -30,
+    -30,   5,  15,  20,  20,  15,   5, -30,
+    -30,   0,  15,  20,  20,  15,   0, -30,
+    -30,   5,  10,  15,  15,  10,   5, -30,
+    -40, -20,   0,   5,   5,   0, -20, -40,
+    -50, -40, -30, -30, -30, -30, -40, -50,
+)
+_BISHOP = (
+    -20, -10, -10, -10, -10, -10, -10, -20,
+    -10,   0,   0,   0,   0,   0,   0, -10,
+    -10,   0,   5,  10,  10,   5,   0, -10,
+    -10,   5,   5,  10,  10,   5,   5, -10,
+    -10,   0,  10,  10,  10,  10,   0, -10,
+    -10,  10,  10,  10,  10,  10,  10, -10,
+    -10,   5,   0,   0,   0,   0,   5, -10,
+    -20, -10, -10, -10, -10, -10, -10, -20,
+)
+_ROOK = (
+      0,   0,   0,   0,   0,   0,   0,   0,
+      5,  10,  10,  10,  10,  10,  10,   5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+      0,   0,   0,   5,   5,   0,   0,   0,
+)
+_QUEEN = (
+    -20, -10, -10,  -5,  -5, -10, -10, -20,
+    -10,   0,   0,   0,   0,   0,   0, -10,
+    -10,   0,   5,   5,   5,   5,   0, -10,
+     -5,   0,   5,   5,   5,   5,   0,  -5,
+      0,   0,   5,   5,   5,   5,   0,  -5,
+    -10,   5,   5,   5,   5,   5,   0, -10,
+    -10,   0,   5,   0,   0,   0,   0, -10,
+    -20, -10, -10,  -5,  -5, -10, -10, -20,
+)
+_KING_MIDGAME = (
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -20, -30, -30, -40, -40, -30, -30, -20,
+    -10, -20, -20, -20, -20, -20, -20, -10,
+     20,  20,   0,   0,   0,   0,  20,  20,
+     20,  30,  10,   0,   0,  10,  30,  20,
+)
+_KING_ENDGAME = (
+    -50, -40, -30, -20, -20, -30, -40, -50,
+    -30, -20, -10,   0,   0, -10, -20, -30,
+    -30, -10,  20,  30,  30,  20, -10, -30,
+    -30, -10,  30,  40,  40,  30, -10, -30,
+    -30, -10,  30,  40,  40,  30, -10, -30,
+    -30, -10,  20,  30,  30,  20, -10, -30,
+    -30, -30,   0,   0,   0,   0, -30, -30,
+    -50, -30, -30, -30, -30, -30, -30, -50,
+)
+
+_TABLES: dict[ChessPieceType, tuple[tuple[int, ...], tuple[int, ...]]] = {
+    ChessPieceType.PAWN: (_PAWN_MIDGAME, _PAWN_ENDGAME),
+    ChessPieceType.KNIGHT: (_KNIGHT, _KNIGHT),
+    ChessPieceType.BISHOP: (_BISHOP, _BISHOP),
+    ChessPieceType.ROOK: (_ROOK, _ROOK),
+    ChessPieceType.QUEEN: (_QUEEN, _QUEEN),
+    ChessPieceType.KING: (_KING_MIDGAME, _KING_ENDGAME),
+}
+
+def _orient(table: tuple[int, ...], color: ChessPieceColor) -> tuple[int, ...]:
+    # re-indexes a table by board square (row * 8 + col, row 0 is rank 1)
+    # and makes black's bonuses negative so that all scores are from
+    # white's point of view
+    if color is ChessPieceColor.WHITE:
+        return tuple(table[(7 - (square >> 3)) * 8 + (square & 7)] for square in range(64))
+    return tuple(-table[square] for square in range(64))
+
+MIDGAME_TABLES: dict[tuple[ChessPieceColor, ChessPieceType], tuple[int, ...]] = {
+    (color, piece_type): _orient(tables[0], color)
+    for color in ChessPieceColor for (piece_type, tables) in _TABLES.items()
+}
+ENDGAME_TABLES: dict[tuple[ChessPieceColor, ChessPieceType], tuple[int, ...]] = {
+    (color, piece_type): _orient(tables[1], color)
+    for color in ChessPieceColor for (piece_type, tables) in _TABLES.items()
+}
+
+# game phase contributed by every piece, the sum is MAX_PHASE with all
+# pieces on the board and drops towards 0 as pieces are traded
+PHASE_WEIGHTS: dict[ChessPieceType, int] = {
+    ChessPieceType.PAWN: 0,
+    ChessPieceType.KNIGHT: 1,
+    ChessPieceType.BISHOP: 1,
+    ChessPieceType.ROOK: 2,
+    ChessPieceType.QUEEN: 4,
+    ChessPieceType.KING: 0,
+}
+MAX_PHASE = 24
+
+
+def get_positional_score(midgame_score: int, endgame_score: int, phase: int) -> float:
+    # blends both phases by the material left and converts to pawns
+    phase = min(phase, MAX_PHASE)
+    return (midgame_score * phase + endgame_score * (MAX_PHASE - phase)) / (MAX_PHASE * 100)
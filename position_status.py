@@ -0,0 +1,30 @@
+from dataclasses import dataclass
+
+from chess_enums import ChessPieceColor
+
+
+@dataclass(frozen=True, slots=True)
+class PositionStatus:
+    # everything needed to decide whether a position is over, computed
+    # once per position for the side to move
+    side_to_move: ChessPieceColor
+    in_check: bool
+    has_moves: bool
+    insufficient_material: bool
+
+    def is_checkmate(self) -> bool:
+        return self.in_check and not self.has_moves
+
+    def is_stalemate(self) -> bool:
+        return not self.in_check and not self.has_moves
+
+    def is_draw(self) -> bool:
+        return self.is_stalemate() or self.has_moves and self.insufficient_material
+
+    def is_terminal(self) -> bool:
+        return not self.has_moves or self.insufficient_material
+
+    def get_winner(self) -> ChessPieceColor | None:
+        if not self.is_checkmate():
+            return None
+        return ChessPieceColor.BLACK if self.side_to_move is ChessPieceColor.WHITE else ChessPieceColor.WHITE
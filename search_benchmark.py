@@ -0,0 +1,152 @@
+import argparse
+import json
+import random
+import sys
+import time
+
+from board import Board, BoardAnalyzer
+from chess_game_data import ChessGameData
+from computer import SearchContext, SearchLimits, get_game_mode, minimax
+from epd import iter_epd_file
+
+# name -> (FEN, depth)
+BENCHMARK_POSITIONS: dict[str, tuple[str, int]] = {
+    'italian-middlegame': ('r1bq1rk1/ppp2ppp/2np1n2/2b1p1B1/2B1P3/2NP1N2/PPP2PPP/R2Q1RK1 w - - 0 1', 2),
+    'queens-gambit-middlegame': ('r1b2rk1/pp1nqppp/2pbpn2/3p4/2PP1B2/2NBPN2/PPQ2PPP/R4RK1 b - - 0 1', 2),
+    'rook-endgame': ('8/5p2/5kp1/p6p/R6P/1Pr3P1/5PK1/8 w - - 0 1', 3),
+    'queen-endgame': ('6k1/6p1/2q4p/1p6/3Q4/P6P/6PK/8 b - - 0 1', 3),
+    'minor-piece-endgame': ('8/8/p2bk1p1/1p3p2/5P2/1PN1K1P1/P7/8 w - - 0 1', 3),
+}
+# depth for positions read from an EPD file unless --depth is given
+DEFAULT_EPD_DEPTH = 2
+
+
+def run_benchmark(board: Board, depth: int, quiescence_depth: int = 4, seed: str | None = None) -> dict:
+    # deepens one position with a fresh transposition table and reports
+    # the cost of every completed depth, minimax breaks ties at random so
+    # runs are only comparable with the same seed
+    if seed is None:
+        return _run_benchmark(board=board, depth=depth, quiescence_depth=quiescence_depth, seed=seed)
+
+    # the seed only applies to this run, the caller's random sequence resumes afterwards
+    random_state = random.getstate()
+    random.seed(seed)
+    try:
+        return _run_benchmark(board=board, depth=depth, quiescence_depth=quiescence_depth, seed=seed)
+    finally:
+        random.setstate(random_state)
+
+def _run_benchmark(board: Board, depth: int, quiescence_depth: int, seed: str | None) -> dict:
+    game_data = ChessGameData(
+        game_mode=get_game_mode(computers_color=board.get_side_to_move()),
+        board=board,
+        board_analyzer=BoardAnalyzer(),
+        depth=depth,
+        quiescence_depth=quiescence_depth
+    )
+    context = SearchContext(limits=SearchLimits(max_depth=depth))
+    stats = context.stats
+
+    depths = []
+    best_move = None
+    for curr_depth in range(1, depth + 1):
+        nodes_before = stats.nodes
+        depth_start = time.perf_counter()
+        (score, best_move) = minimax(game_data=game_data, curr_depth=curr_depth, computers_turn=True, context=context)
+        context.complete_depth(depth=curr_depth, seconds=time.perf_counter() - depth_start)
+        depths.append({
+            'depth': curr_depth,
+            'nodes': stats.nodes - nodes_before,
+            'seconds': stats.depth_times[curr_depth],
+            'score': score,
+        })
+
+    # growth of the tree from one depth to the next
+    branching_factors = [
+        current['nodes'] / previous['nodes']
+        for (previous, current) in zip(depths, depths[1:]) if previous['nodes']
+    ]
+    return {
+        'depth': depth,
+        'seed': seed,
+        'seconds': stats.get_elapsed_time(),
+        'nodes': stats.nodes,
+        'nodes_per_second': stats.get_nodes_per_second(),
+        'effective_branching_factor': branching_factors[-1] if branching_factors else None,
+        'first_move_cutoff_rate': stats.get_first_move_cutoff_rate(),
+        'tt_hit_rate': stats.get_tt_hit_rate(),
+        'best_move': best_move.to_uci() if best_move is not None else None,
+        'depths': depths,
+    }
+
+def compare(results: dict, baseline: dict) -> list[str]:
+    lines = []
+    for (name, result) in results.items():
+        if (previous := baseline.get(name)) is None or previous['depth'] != result['depth'] or previous.get('seed') != result['seed']:
+            continue
+        lines.append(
+            f"{name}: nodes {previous['nodes']} -> {result['nodes']} ({_change(previous['nodes'], result['nodes'])}), "
+            f"time {previous['seconds']:.3f}s -> {result['seconds']:.3f}s ({_change(previous['seconds'], result['seconds'])})"
+            + (f", best move {previous['best_move']} -> {result['best_move']}" if previous['best_move'] != result['best_move'] else '')
+        )
+
+    return lines
+
+def _change(before: float, after: float) -> str:
+    return f"{(after - before) / before * 100:+.1f}%" if before else 'n/a'
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='benchmark minimax on a fixed set of positions')
+    parser.add_argument('--position', action='append', choices=sorted(BENCHMARK_POSITIONS), help='defaults to all benchmark positions')
+    parser.add_argument('--epd', help='benchmark the positions of this FEN/EPD file instead')
+    parser.add_argument('--depth', type=int, help='overrides the depth of every position')
+    parser.add_argument('--quiescence-depth', type=int, default=4)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--compare', help='JSON file of an earlier run to diff against')
+    args = parser.parse_args(argv)
+
+    if args.depth is not None and args.depth < 1:
+        parser.error(f"depth can't be less than 1 (given: {args.depth})")
+    if args.epd and args.position:
+        parser.error('--position and --epd are mutually exclusive')
+
+    if args.epd:
+        # positions are named by their EPD "id" operation when they have one
+        positions = (
+            (record.operations.get('id', f"{args.epd}:{record.line_number}"), record.board, DEFAULT_EPD_DEPTH)
+            for record in iter_epd_file(path=args.epd)
+        )
+    else:
+        positions = (
+            (name, Board.from_fen(BENCHMARK_POSITIONS[name][0]), BENCHMARK_POSITIONS[name][1])
+            for name in args.position or BENCHMARK_POSITIONS
+        )
+
+    results = dict()
+    for (name, board, depth) in positions:
+        # seeded by name so that --compare diffs the same searches
+        result = run_benchmark(board=board, depth=args.depth or depth, quiescence_depth=args.quiescence_depth, seed=name)
+        results[name] = result
+
+        branching_factor = result['effective_branching_factor']
+        print(
+            f"{name}: depth {result['depth']} in {result['seconds']:.3f}s, {result['nodes']} nodes, "
+            f"{result['nodes_per_second']:.0f} nodes/s, branching factor "
+            + (f"{branching_factor:.2f}" if branching_factor is not None else 'n/a')
+        )
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=4)
+
+    if args.compare:
+        with open(args.compare) as file:
+            for line in compare(results=results, baseline=json.load(file)):
+                print(line)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
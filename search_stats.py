@@ -0,0 +1,61 @@
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from move import Move
+
+
+@dataclass
+class SearchStats:
+    nodes: int = field(default=0)
+    quiescence_nodes: int = field(default=0)
+    leaf_evaluations: int = field(default=0)
+    cutoffs: int = field(default=0)
+    first_move_cutoffs: int = field(default=0)
+    tt_probes: int = field(default=0)
+    tt_hits: int = field(default=0)
+    tablebase_hits: int = field(default=0)
+    completed_depth: int = field(default=0)
+    # minimax score and move of the last completed depth (see evaluate_board)
+    score: float | None = field(default=None)
+    best_move: Move | None = field(default=None)
+    # seconds spent on every completed depth of iterative deepening
+    depth_times: dict[int, float] = field(default_factory=dict)
+    start_time: float = field(default_factory=time.perf_counter)
+
+    def get_elapsed_time(self) -> float:
+        return time.perf_counter() - self.start_time
+
+    def get_nodes_per_second(self) -> float:
+        elapsed = self.get_elapsed_time()
+        return self.nodes / elapsed if elapsed > 0 else 0.0
+
+    def get_first_move_cutoff_rate(self) -> float:
+        # close to 1 means move ordering puts the refuting move first
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    def get_tt_hit_rate(self) -> float:
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            'nodes': self.nodes,
+            'quiescence_nodes': self.quiescence_nodes,
+            'leaf_evaluations': self.leaf_evaluations,
+            'cutoffs': self.cutoffs,
+            'first_move_cutoffs': self.first_move_cutoffs,
+            'first_move_cutoff_rate': self.get_first_move_cutoff_rate(),
+            'tt_probes': self.tt_probes,
+            'tt_hits': self.tt_hits,
+            'tt_hit_rate': self.get_tt_hit_rate(),
+            'tablebase_hits': self.tablebase_hits,
+            'completed_depth': self.completed_depth,
+            'score': self.score,
+            'best_move': self.best_move.to_uci() if self.best_move is not None else None,
+            'depth_times': dict(self.depth_times),
+            'seconds': self.get_elapsed_time(),
+            'nodes_per_second': self.get_nodes_per_second(),
+        }
+
+
+ProgressCallback = Callable[[SearchStats], None]
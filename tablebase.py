@@ -0,0 +1,440 @@
+import argparse
+import itertools
+import mmap
+import os
+import sys
+import time
+from dataclasses import dataclass
+
+from board import is_insufficient_material
+from chess_enums import ChessPieceColor, ChessPieceType, GameMode, TablebaseResult
+from intefaces import IBoard
+from move_strategy import BISHOP_RAYS, KING_TARGETS, KNIGHT_TARGETS, PAWN_CAPTURE_TARGETS, ROOK_RAYS
+
+# a table holds one byte per (side to move, square of every piece): 0 is a
+# draw (or an impossible position), 1-127 a win for the side to move in
+# that many plies and 128 + n a loss in n plies
+LOSS_OFFSET = 128
+MAX_DISTANCE_TO_MATE = 127
+TABLE_SUFFIX = '.tb'
+
+SIGNATURE_LETTERS: dict[str, ChessPieceType] = {
+    'K': ChessPieceType.KING,
+    'Q': ChessPieceType.QUEEN,
+    'R': ChessPieceType.ROOK,
+    'B': ChessPieceType.BISHOP,
+    'N': ChessPieceType.KNIGHT,
+    'P': ChessPieceType.PAWN,
+}
+# pieces of a signature are always listed in this order
+SIGNATURE_ORDER = tuple(SIGNATURE_LETTERS.values())
+SIGNATURE_LETTER_OF_TYPE = {piece_type: letter for (letter, piece_type) in SIGNATURE_LETTERS.items()}
+
+# every 3-piece ending with something to win, for both colors
+DEFAULT_SIGNATURES = ('KQvK', 'KRvK', 'KPvK', 'KvKQ', 'KvKR', 'KvKP')
+
+# the move tables of move_strategy turned into plain square numbers
+_KING_SQUARES = tuple(tuple(x * 8 + y for (x, y) in targets) for targets in KING_TARGETS)
+_KNIGHT_SQUARES = tuple(tuple(x * 8 + y for (x, y) in targets) for targets in KNIGHT_TARGETS)
+_PAWN_CAPTURE_SQUARES = {
+    direction: tuple(tuple(x * 8 + y for (x, y) in targets) for targets in table)
+    for (direction, table) in PAWN_CAPTURE_TARGETS.items()
+}
+_ROOK_RAYS = tuple(tuple(tuple(x * 8 + y for (x, y) in ray) for ray in rays) for rays in ROOK_RAYS)
+_BISHOP_RAYS = tuple(tuple(tuple(x * 8 + y for (x, y) in ray) for ray in rays) for rays in BISHOP_RAYS)
+_SLIDER_RAYS = {
+    ChessPieceType.ROOK: _ROOK_RAYS,
+    ChessPieceType.BISHOP: _BISHOP_RAYS,
+    ChessPieceType.QUEEN: tuple(rook + bishop for (rook, bishop) in zip(_ROOK_RAYS, _BISHOP_RAYS)),
+}
+_JUMP_SQUARES = {
+    ChessPieceType.KING: _KING_SQUARES,
+    ChessPieceType.KNIGHT: _KNIGHT_SQUARES,
+}
+# tables are built for white pawns moving up the board, as in Board.from_fen
+_PAWN_DIRECTIONS = {ChessPieceColor.WHITE: 1, ChessPieceColor.BLACK: -1}
+
+Piece = tuple[ChessPieceColor, ChessPieceType]
+
+
+@dataclass(frozen=True, slots=True)
+class TablebaseProbe:
+    # result for the side to move, distance_to_mate is in plies
+    result: TablebaseResult
+    distance_to_mate: int | None
+
+
+def parse_signature(signature: str) -> tuple[Piece, ...]:
+    # "KQvK" -> white king, black king, white queen; both kings come first,
+    # then white's and black's other pieces in SIGNATURE_ORDER
+    sides = signature.split('v')
+    if len(sides) != 2 or any(not side.startswith('K') or side.count('K') != 1 for side in sides):
+        raise ValueError(f"invalid signature {signature!r}, expected e.g. 'KQvK'")
+
+    others = []
+    for (color, side) in zip((ChessPieceColor.WHITE, ChessPieceColor.BLACK), sides):
+        for letter in side[1:]:
+            if letter not in SIGNATURE_LETTERS:
+                raise ValueError(f"invalid signature {signature!r}, unknown piece {letter!r}")
+            others.append((color, SIGNATURE_LETTERS[letter]))
+
+    pieces = ((ChessPieceColor.WHITE, ChessPieceType.KING), (ChessPieceColor.BLACK, ChessPieceType.KING))
+    return pieces + tuple(sorted(
+        others, key=lambda piece: (piece[0] is ChessPieceColor.BLACK, SIGNATURE_ORDER.index(piece[1]))
+    ))
+
+def format_signature(pieces: tuple[Piece, ...]) -> str:
+    return 'v'.join(
+        ''.join(
+            SIGNATURE_LETTER_OF_TYPE[piece_type]
+            for piece_type in SIGNATURE_ORDER
+            for _ in range(sum(piece == (color, piece_type) for piece in pieces))
+        )
+        for color in (ChessPieceColor.WHITE, ChessPieceColor.BLACK)
+    )
+
+def _get_piece_counts(pieces: tuple[Piece, ...]) -> dict[Piece, int]:
+    counts = {(color, piece_type): 0 for color in ChessPieceColor for piece_type in ChessPieceType}
+    for piece in pieces:
+        counts[piece] += 1
+    return counts
+
+def _is_always_drawn(pieces: tuple[Piece, ...]) -> bool:
+    # bishops are put on squares of different colors, so only material that
+    # is insufficient wherever it stands counts
+    return is_insufficient_material(piece_counts=_get_piece_counts(pieces), get_bishop_squares=lambda: [0, 1])
+
+def _encode(result: TablebaseResult, distance_to_mate: int) -> int:
+    if distance_to_mate > MAX_DISTANCE_TO_MATE:
+        raise ValueError(f"distance to mate {distance_to_mate} doesn't fit into a table")
+    return distance_to_mate if result is TablebaseResult.WIN else LOSS_OFFSET + distance_to_mate
+
+def _decode(value: int) -> TablebaseProbe:
+    if value == 0:
+        return TablebaseProbe(result=TablebaseResult.DRAW, distance_to_mate=None)
+    elif value < LOSS_OFFSET:
+        return TablebaseProbe(result=TablebaseResult.WIN, distance_to_mate=value)
+    else:
+        return TablebaseProbe(result=TablebaseResult.LOSS, distance_to_mate=value - LOSS_OFFSET)
+
+
+def _is_attacked(target: int, by_color: ChessPieceColor, pieces: tuple[Piece, ...], squares: list[int], occupied: set[int]) -> bool:
+    for ((color, piece_type), square) in zip(pieces, squares):
+        if color is not by_color or square < 0:
+            continue
+        if piece_type is ChessPieceType.PAWN:
+            if target in _PAWN_CAPTURE_SQUARES[_PAWN_DIRECTIONS[color]][square]:
+                return True
+        elif piece_type in _JUMP_SQUARES:
+            if target in _JUMP_SQUARES[piece_type][square]:
+                return True
+        else:
+            for ray in _SLIDER_RAYS[piece_type][square]:
+                for ray_square in ray:
+                    if ray_square == target:
+                        return True
+                    if ray_square in occupied:
+                        break
+    return False
+
+def _iter_moves(pieces: tuple[Piece, ...], squares: list[int], color: ChessPieceColor):
+    # pseudo-legal (piece index, to square, captured piece index or None)
+    # with the same rules as move_strategy
+    occupant = {square: index for (index, square) in enumerate(squares)}
+    for (index, ((piece_color, piece_type), square)) in enumerate(zip(pieces, squares)):
+        if piece_color is not color:
+            continue
+        if piece_type is ChessPieceType.PAWN:
+            direction = _PAWN_DIRECTIONS[color]
+            row = square >> 3
+            if 0 <= row + direction < 8 and square + 8 * direction not in occupant:
+                yield (index, square + 8 * direction, None)
+                if (
+                    min(row, 7 - row) == 1
+                    and 0 <= row + 2 * direction < 8
+                    and square + 16 * direction not in occupant
+                ):
+                    yield (index, square + 16 * direction, None)
+            targets = _PAWN_CAPTURE_SQUARES[direction][square]
+            for target in targets:
+                if (other := occupant.get(target)) is not None and pieces[other][0] is not color:
+                    yield (index, target, other)
+        elif piece_type in _JUMP_SQUARES:
+            for target in _JUMP_SQUARES[piece_type][square]:
+                other = occupant.get(target)
+                if other is None or pieces[other][0] is not color:
+                    yield (index, target, other)
+        else:
+            for ray in _SLIDER_RAYS[piece_type][square]:
+                for target in ray:
+                    other = occupant.get(target)
+                    if other is None:
+                        yield (index, target, None)
+                        continue
+                    if pieces[other][0] is not color:
+                        yield (index, target, other)
+                    break
+
+def _iter_unmoves(pieces: tuple[Piece, ...], squares: list[int], color: ChessPieceColor):
+    # (piece index, from square) of every non-capturing move of color that
+    # could have led to this position
+    occupied = set(squares)
+    for (index, ((piece_color, piece_type), square)) in enumerate(zip(pieces, squares)):
+        if piece_color is not color:
+            continue
+        if piece_type is ChessPieceType.PAWN:
+            direction = _PAWN_DIRECTIONS[color]
+            row = square >> 3
+            source_row = row - direction
+            if 0 <= source_row < 8 and (source := square - 8 * direction) not in occupied:
+                yield (index, source)
+                source_row -= direction
+                if 0 <= source_row < 8 and min(source_row, 7 - source_row) == 1 and (source := square - 16 * direction) not in occupied:
+                    yield (index, source)
+        elif piece_type in _JUMP_SQUARES:
+            for source in _JUMP_SQUARES[piece_type][square]:
+                if source not in occupied:
+                    yield (index, source)
+        else:
+            for ray in _SLIDER_RAYS[piece_type][square]:
+                for source in ray:
+                    if source in occupied:
+                        break
+                    yield (index, source)
+
+def _get_index(side: int, squares: list[int]) -> int:
+    index = side
+    for square in squares:
+        index = index * 64 + square
+    return index
+
+
+def generate_table(signature: str, sub_tables: dict[str, bytes | bytearray | mmap.mmap]) -> bytearray:
+    # retrograde analysis: every legal position is set up once to count its
+    # moves and to score its captures from the smaller tables in
+    # sub_tables, then results spread backwards from the mates along
+    # un-moves in order of distance to mate
+    pieces = parse_signature(signature)
+    count = len(pieces)
+    size = 2 * 64 ** count
+    colors = (ChessPieceColor.WHITE, ChessPieceColor.BLACK)
+    counts = _get_piece_counts(pieces)
+    may_be_insufficient = is_insufficient_material(piece_counts=counts, get_bishop_squares=lambda: [0, 0])
+
+    values = bytearray(size)
+    legal = bytearray(size)
+    resolved = bytearray(size)
+    # moves whose result is still unknown, and the longest loss among the
+    # ones that turned out as wins for the opponent
+    open_moves = bytearray(size)
+    loss_distances = bytearray(size)
+    # buckets[n] holds (index, result) candidates with distance to mate n
+    buckets: list[list[tuple[int, TablebaseResult]]] = [[] for _ in range(MAX_DISTANCE_TO_MATE + 2)]
+
+    capture_tables = dict()
+    for captured in range(2, count):
+        remaining = pieces[:captured] + pieces[captured + 1:]
+        capture_tables[captured] = None if _is_always_drawn(remaining) else sub_tables[format_signature(remaining)]
+
+    for squares in itertools.product(range(64), repeat=count):
+        if len(set(squares)) != count:
+            continue
+        squares = list(squares)
+        occupied = set(squares)
+        for (side, color) in enumerate(colors):
+            opponent = colors[1 - side]
+            # the side that just moved can't be left in check
+            if _is_attacked(squares[1 - side], color, pieces, squares, occupied):
+                continue
+            index = _get_index(side, squares)
+            legal[index] = 1
+
+            if may_be_insufficient and is_insufficient_material(
+                piece_counts=counts,
+                get_bishop_squares=lambda: [square for (piece, square) in zip(pieces, squares) if piece[1] is ChessPieceType.BISHOP]
+            ):
+                resolved[index] = 1
+                continue
+
+            has_moves = False
+            for (moved, target, captured) in _iter_moves(pieces, squares, color):
+                child_squares = list(squares)
+                child_squares[moved] = target
+                if captured is not None:
+                    child_squares[captured] = -1
+                child_occupied = {square for square in child_squares if square >= 0}
+                if _is_attacked(child_squares[side], opponent, pieces, child_squares, child_occupied):
+                    continue
+                has_moves = True
+
+                if captured is None:
+                    open_moves[index] += 1
+                    continue
+                if (table := capture_tables[captured]) is None:
+                    probe = _decode(0)
+                else:
+                    probe = _decode(table[_get_index(1 - side, [square for square in child_squares if square >= 0])])
+                if probe.result is TablebaseResult.LOSS:
+                    buckets[probe.distance_to_mate + 1].append((index, TablebaseResult.WIN))
+                elif probe.result is TablebaseResult.WIN:
+                    loss_distances[index] = max(loss_distances[index], probe.distance_to_mate + 1)
+                else:
+                    # a drawn capture keeps the position from ever being lost
+                    open_moves[index] += 1
+
+            if not has_moves:
+                if _is_attacked(squares[side], opponent, pieces, squares, occupied):
+                    buckets[0].append((index, TablebaseResult.LOSS))
+                else:
+                    resolved[index] = 1
+            elif open_moves[index] == 0:
+                buckets[loss_distances[index]].append((index, TablebaseResult.LOSS))
+
+    for distance in range(MAX_DISTANCE_TO_MATE + 1):
+        for (index, result) in buckets[distance]:
+            if resolved[index]:
+                continue
+            resolved[index] = 1
+            values[index] = _encode(result, distance)
+
+            side = index // 64 ** count
+            squares = [(index >> (6 * (count - 1 - position))) & 63 for position in range(count)]
+            for (moved, source) in _iter_unmoves(pieces, squares, colors[1 - side]):
+                parent_squares = list(squares)
+                parent_squares[moved] = source
+                parent = _get_index(1 - side, parent_squares)
+                if not legal[parent] or resolved[parent]:
+                    continue
+                if result is TablebaseResult.LOSS:
+                    buckets[distance + 1].append((parent, TablebaseResult.WIN))
+                else:
+                    open_moves[parent] -= 1
+                    loss_distances[parent] = max(loss_distances[parent], distance + 1)
+                    if open_moves[parent] == 0:
+                        buckets[loss_distances[parent]].append((parent, TablebaseResult.LOSS))
+
+    if any(buckets[MAX_DISTANCE_TO_MATE + 1]):
+        raise ValueError(f"{signature} has mates longer than {MAX_DISTANCE_TO_MATE} plies")
+    return values
+
+def generate(signature: str, directory: str, log=None) -> str:
+    # writes directory/<signature>.tb, generating every table a capture can
+    # lead to first, tables that already exist are reused
+    path = os.path.join(directory, signature + TABLE_SUFFIX)
+    if os.path.exists(path):
+        return path
+
+    pieces = parse_signature(signature)
+    sub_tables = dict()
+    for captured in range(2, len(pieces)):
+        remaining = pieces[:captured] + pieces[captured + 1:]
+        if not _is_always_drawn(remaining):
+            sub_signature = format_signature(remaining)
+            with open(generate(sub_signature, directory=directory, log=log), 'rb') as file:
+                sub_tables[sub_signature] = file.read()
+
+    start = time.perf_counter()
+    values = generate_table(signature=signature, sub_tables=sub_tables)
+    os.makedirs(directory, exist_ok=True)
+    with open(path + '.tmp', 'wb') as file:
+        file.write(values)
+    os.replace(path + '.tmp', path)
+    if log is not None:
+        log(f"{signature}: {len(values)} positions in {time.perf_counter() - start:.1f}s")
+
+    return path
+
+
+class Tablebases:
+    # probes tables written by generate, every table is memory mapped the
+    # first time a position with its material is probed
+    def __init__(self, directory: str, max_pieces: int = 4):
+        self.directory = directory
+        self.max_pieces = max_pieces
+        # signature -> (open file, map), None when there is no such table
+        self.tables: dict[str, tuple | None] = dict()
+
+    def close(self):
+        for table in self.tables.values():
+            if table is not None:
+                (file, data) = table
+                data.close()
+                file.close()
+        self.tables.clear()
+
+    def __enter__(self) -> 'Tablebases':
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def _get_table(self, signature: str, count: int) -> mmap.mmap | None:
+        if signature not in self.tables:
+            path = os.path.join(self.directory, signature + TABLE_SUFFIX)
+            if not os.path.exists(path):
+                self.tables[signature] = None
+            else:
+                file = open(path, 'rb')
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                if len(data) != 2 * 64 ** count:
+                    data.close()
+                    file.close()
+                    raise ValueError(f"{path} has the wrong size for {signature}")
+                self.tables[signature] = (file, data)
+
+        table = self.tables[signature]
+        return table[1] if table is not None else None
+
+    def probe(self, board: IBoard) -> TablebaseProbe | None:
+        white_pieces = board.get_pieces(ChessPieceColor.WHITE)
+        black_pieces = board.get_pieces(ChessPieceColor.BLACK)
+        count = len(white_pieces) + len(black_pieces)
+        if count > self.max_pieces:
+            return None
+
+        ordered = sorted(
+            (*white_pieces, *black_pieces),
+            key=lambda piece: (
+                not piece.is_king(),
+                piece.get_color() is ChessPieceColor.BLACK,
+                SIGNATURE_ORDER.index(piece.get_type())
+            )
+        )
+        signature = format_signature(tuple((piece.get_color(), piece.get_type()) for piece in ordered))
+        if (table := self._get_table(signature, count)) is None:
+            return None
+
+        side = 0 if board.get_side_to_move() is ChessPieceColor.WHITE else 1
+        # tables are built for white pawns moving up, a board whose pawns
+        # move the other way is looked up upside down
+        if board.get_pawn_game_mode() is GameMode.BLACK_DOWN:
+            squares = [(7 - piece.get_row()) * 8 + piece.get_col() for piece in ordered]
+        else:
+            squares = [piece.get_row() * 8 + piece.get_col() for piece in ordered]
+        return _decode(table[_get_index(side, squares)])
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='generate endgame tablebases by retrograde analysis')
+    parser.add_argument('signature', nargs='*', help=f"e.g. KRvK, defaults to {' '.join(DEFAULT_SIGNATURES)}")
+    parser.add_argument('--directory', default='tablebases')
+    args = parser.parse_args(argv)
+
+    signatures = args.signature or DEFAULT_SIGNATURES
+    for signature in signatures:
+        try:
+            pieces = parse_signature(signature)
+        except ValueError as exception:
+            parser.error(str(exception))
+        if _is_always_drawn(pieces):
+            parser.error(f"{signature} is always a draw, there is nothing to generate")
+
+    for signature in signatures:
+        # 4 pieces are 33 million positions, that takes a while in pure Python
+        generate(signature=signature, directory=args.directory, log=print)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+import threading
+from dataclasses import replace
+
+import pytest
+
+import background_search
+from background_search import BackgroundSearch
+from board import Board, BoardAnalyzer
+from chess_enums import ChessPieceColor
+from chess_game_data import ChessGameData
+from computer import get_game_mode
+from move import Move
+from opening_book import OpeningBook, polyglot_key
+from test_opening_book import write_book
+
+FEN = '4k3/8/8/8/8/8/4P3/4K3 b - - 0 1'
+
+
+def create_game_data() -> ChessGameData:
+    return ChessGameData(
+        game_mode=get_game_mode(computers_color=ChessPieceColor.BLACK),
+        board=Board.from_fen(FEN),
+        board_analyzer=BoardAnalyzer(),
+        depth=1
+    )
+
+def run_search(game_data: ChessGameData) -> tuple[BackgroundSearch, list[tuple[bool, object]]]:
+    results = []
+    finished = threading.Event()
+    def on_done(search: BackgroundSearch, move):
+        # the worker thread is still alive here
+        results.append((search.is_running(), move))
+        finished.set()
+
+    search = BackgroundSearch(game_data=game_data, on_done=on_done).start()
+    assert finished.wait(timeout=30)
+    return (search, results)
+
+
+def test_search_is_done_before_its_move_is_posted():
+    (search, results) = run_search(create_game_data())
+    [(running, move)] = results
+    assert not running
+    assert move is not None and move is search.move
+
+@pytest.mark.filterwarnings('ignore::pytest.PytestUnhandledThreadExceptionWarning')
+def test_failed_search_still_finishes_without_a_move(monkeypatch):
+    def fail(**kwargs):
+        raise RuntimeError('search failed')
+    monkeypatch.setattr(background_search, 'get_ai_move', fail)
+
+    (search, results) = run_search(create_game_data())
+    search.thread.join()
+    assert results == [(False, None)]
+    assert not search.is_running()
+
+def test_cancelled_search_never_reports():
+    results = []
+    game_data = replace(create_game_data(), depth=30)
+    search = BackgroundSearch(game_data=game_data, on_done=lambda search, move: results.append(move)).start()
+    assert search.is_running()
+    search.cancel()
+    assert not search.thread.is_alive()
+    assert results == []
+    # the search ran on a copy
+    assert game_data.board.get_history_length() == 0
+    assert game_data.board.to_fen() == FEN
+
+def test_book_move_is_played_without_searching(tmp_path):
+    path = str(tmp_path / 'book.bin')
+    game_data = create_game_data()
+    write_book(path, [(polyglot_key(game_data.board), 'e8d7', 1)])
+    with OpeningBook(path=path) as book:
+        (search, results) = run_search(replace(game_data, opening_book=book))
+    assert results == [(False, Move.from_uci('e8d7'))]
+
+def test_ponder_search_answers_the_expected_reply():
+    results = []
+    finished = threading.Event()
+    game_data = ChessGameData(
+        game_mode=get_game_mode(computers_color=ChessPieceColor.WHITE),
+        board=Board.from_fen(FEN),
+        board_analyzer=BoardAnalyzer(),
+        depth=1
+    )
+    ponder_move = Move.from_uci('e8d8')
+    search = BackgroundSearch(game_data=game_data, on_done=lambda search, move: (results.append(move), finished.set()), ponder_move=ponder_move).start()
+    assert finished.wait(timeout=30)
+
+    # the computer's (white's) answer to Kd8, the real board is untouched
+    assert game_data.board.to_fen() == FEN
+    game_data.board.make_move(x1=ponder_move.x1, y1=ponder_move.y1, x2=ponder_move.x2, y2=ponder_move.y2)
+    assert results == [search.move]
+    assert search.move in BoardAnalyzer.get_all_valid_moves(color=ChessPieceColor.WHITE, board=game_data.board)
@@ -0,0 +1,54 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from batch_analysis import analyse_position, analyse_positions, main, read_positions
+from computer import SearchLimits
+
+WHITE_MATES_FEN = '6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1'
+BLACK_MATES_FEN = '1r4k1/8/8/8/8/8/5PPP/6K1 b - - 0 1'
+STALEMATE_FEN = '7k/5Q2/6K1/8/8/8/8/8 b - - 0 1'
+LIMITS = SearchLimits(max_depth=2)
+
+
+def test_scores_are_from_whites_point_of_view():
+    white_mates = analyse_position(WHITE_MATES_FEN, LIMITS, quiescence_depth=0)
+    black_mates = analyse_position(BLACK_MATES_FEN, LIMITS, quiescence_depth=0)
+    assert (white_mates['best_move'], black_mates['best_move']) == ('a1a8', 'b8b1')
+    assert white_mates['score'] > 0 > black_mates['score']
+    assert white_mates['depth'] == 2
+
+def test_position_without_moves_is_scored_as_it_stands():
+    result = analyse_position(STALEMATE_FEN, LIMITS)
+    assert (result['best_move'], result['score']) == (None, 0)
+
+def test_invalid_fen_gives_an_error_record():
+    result = analyse_position('8/8/8 w', LIMITS)
+    assert result == {'fen': '8/8/8 w', 'error': 'expected 8 ranks, got 3'}
+
+def test_every_position_gets_a_record():
+    lines = ['# mates', WHITE_MATES_FEN + ' id "white";', '', 'not a fen w', BLACK_MATES_FEN]
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(analyse_positions(read_positions(lines), limits=LIMITS, quiescence_depth=0, max_pending=1, executor=executor))
+
+    results = sorted(results, key=lambda result: result['index'])
+    assert [result['index'] for result in results] == [0, 1, 2]
+    assert results[0]['id'] == 'white' and results[0]['best_move'] == 'a1a8'
+    assert 'error' in results[1] and 'best_move' not in results[1]
+    assert results[2]['best_move'] == 'b8b1'
+
+def test_max_pending_has_to_be_positive():
+    with pytest.raises(ValueError):
+        next(analyse_positions([], limits=LIMITS, max_pending=0, executor=ThreadPoolExecutor(max_workers=1)))
+
+def test_main_writes_json_lines(tmp_path):
+    (input_path, output_path) = (tmp_path / 'positions.epd', tmp_path / 'results.jsonl')
+    input_path.write_text(f"{WHITE_MATES_FEN}\n{STALEMATE_FEN}\n")
+    assert main([str(input_path), '--output', str(output_path), '--depth', '2', '--workers', '1']) == 0
+    results = [json.loads(line) for line in output_path.read_text().splitlines()]
+    assert sorted(result['fen'] for result in results) == sorted([WHITE_MATES_FEN, STALEMATE_FEN])
+
+def test_main_needs_a_limit(tmp_path):
+    with pytest.raises(SystemExit):
+        main([str(tmp_path / 'positions.epd')])
@@ -0,0 +1,24 @@
+from board import Board, BitBoard, BitBoardAnalyzer, BoardAnalyzer
+from perft import create_board, perft
+
+# pins, checks by sliders and knights, double check and pawns on both sides
+FENS = (
+    '4k3/8/8/8/8/8/4r3/R3K2R w - - 0 1',
+    '4k3/4r3/8/8/1b6/8/3PN3/4K3 w - - 0 1',
+    '4k3/8/8/8/8/3n4/8/R3K3 w - - 0 1',
+    '4k3/8/8/1b6/8/8/4r3/4K3 w - - 0 1',
+    'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R b - - 0 1',
+)
+
+
+def get_moves(board: Board, board_analyzer: type[BoardAnalyzer]) -> set[str]:
+    return {move.to_uci() for move in board_analyzer.get_all_valid_moves(color=board.get_side_to_move(), board=board)}
+
+def test_bitboard_analyzer_finds_the_same_moves():
+    for fen in FENS:
+        assert get_moves(BitBoard.from_fen(fen), BitBoardAnalyzer) == get_moves(Board.from_fen(fen), BoardAnalyzer), fen
+
+def test_bitboard_analyzer_perft():
+    for position in ('startpos', 'two-knights'):
+        assert perft(board=create_board(position, BitBoard), board_analyzer=BitBoardAnalyzer(), depth=3) == \
+            perft(board=create_board(position), board_analyzer=BoardAnalyzer(), depth=3)
@@ -0,0 +1,198 @@
+import random
+
+import pytest
+
+from board import Board, BoardAnalyzer
+from chess_enums import ChessPieceColor, ChessPieceType
+from exceptions import InvalidFenException
+from historical_move import pack_move_record, unpack_move_record
+from move import Move, get_move
+from perft import create_board
+
+# the "kiwipete" middlegame, pieces attack and defend each other on every line
+MIDDLEGAME_FEN = 'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w - - 0 1'
+STEPS: dict[ChessPieceType, tuple[tuple[int, int], ...]] = {
+    ChessPieceType.KNIGHT: ((1, 2), (2, 1), (-1, 2), (-2, 1), (1, -2), (2, -1), (-1, -2), (-2, -1)),
+    ChessPieceType.KING: ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)),
+    ChessPieceType.ROOK: ((1, 0), (-1, 0), (0, 1), (0, -1)),
+    ChessPieceType.BISHOP: ((1, 1), (1, -1), (-1, 1), (-1, -1)),
+}
+STEPS[ChessPieceType.QUEEN] = STEPS[ChessPieceType.ROOK] + STEPS[ChessPieceType.BISHOP]
+
+
+def attacks(board: Board, row: int, col: int, x: int, y: int) -> bool:
+    # walks from the piece towards (x, y), independent of the lookup tables
+    piece = board.get_piece_at(row, col)
+    if (piece_type := piece.get_type()) is ChessPieceType.PAWN:
+        # from_fen boards have white pawns moving up
+        direction = 1 if piece.get_color() is ChessPieceColor.WHITE else -1
+        return x == row + direction and abs(y - col) == 1
+    for (step_x, step_y) in STEPS[piece_type]:
+        (curr_x, curr_y) = (row + step_x, col + step_y)
+        while 0 <= curr_x < 8 and 0 <= curr_y < 8:
+            if (curr_x, curr_y) == (x, y):
+                return True
+            if piece_type in (ChessPieceType.KNIGHT, ChessPieceType.KING) or board.get_piece_at(curr_x, curr_y) is not None:
+                break
+            (curr_x, curr_y) = (curr_x + step_x, curr_y + step_y)
+    return False
+
+
+def test_attackers_match_walking_every_piece():
+    board = Board.from_fen(MIDDLEGAME_FEN)
+    for color in ChessPieceColor:
+        for (x, y) in ((x, y) for x in range(8) for y in range(8)):
+            expected = {piece for piece in board.get_pieces(color=color) if attacks(board, piece.get_row(), piece.get_col(), x, y)}
+            assert set(BoardAnalyzer.iter_attackers(x=x, y=y, by_color=color, board=board)) == expected, (color, x, y)
+            assert BoardAnalyzer.is_square_attacked(x=x, y=y, by_color=color, board=board) is bool(expected)
+
+def test_check_detection():
+    # the e-file rook checks, the bishop's diagonal is blocked by the pawn
+    board = Board.from_fen('4k3/8/8/8/1b6/2P5/8/4K2r w - - 0 1')
+    assert BoardAnalyzer.is_there_any_threat_to_king(color=ChessPieceColor.WHITE, board=board)
+    assert not BoardAnalyzer.is_there_any_threat_to_king(color=ChessPieceColor.BLACK, board=board)
+    assert [piece.get_type() for piece in BoardAnalyzer.iter_attackers(x=0, y=4, by_color=ChessPieceColor.BLACK, board=board)] == [ChessPieceType.ROOK]
+
+# pins on files and diagonals, checks by a slider and a knight, and a double check
+LEGAL_MOVE_FENS = (
+    MIDDLEGAME_FEN,
+    '4k3/4r3/8/8/1b6/8/3PN3/4K3 w - - 0 1',
+    '4k3/8/8/8/8/3n4/8/R3K3 w - - 0 1',
+    '4k3/8/8/1b6/8/8/4r3/4K3 w - - 0 1',
+    '4k3/8/8/8/8/2n5/8/R3K2r w - - 0 1',
+    '3qk3/8/8/8/8/8/3R4/3K4 w - - 0 1',
+)
+
+
+def get_moves_by_filtering(board: Board, color: ChessPieceColor) -> set[str]:
+    # every pseudo-legal move that doesn't leave the king attacked
+    moves = [move for piece in tuple(board.get_pieces(color=color)) for move in piece.get_moves(board=board, board_analyzer=BoardAnalyzer)]
+    return {move.to_uci() for move in BoardAnalyzer.filter_moves(color=color, moves=moves, board=board)}
+
+
+def test_legal_moves_match_make_unmake_filtering():
+    for fen in LEGAL_MOVE_FENS:
+        board = Board.from_fen(fen)
+        for color in ChessPieceColor:
+            moves = {move.to_uci() for move in BoardAnalyzer.get_all_valid_moves(color=color, board=board)}
+            assert moves == get_moves_by_filtering(board=board, color=color), (fen, color)
+
+def test_pinned_piece_moves_along_the_pin():
+    board = Board.from_fen('3qk3/8/8/8/8/8/3R4/3K4 w - - 0 1')
+    rook = board.get_piece_at(1, 3)
+    assert BoardAnalyzer.get_pinned_pieces(color=ChessPieceColor.WHITE, board=board) == {rook: {(row, 3) for row in range(1, 8)}}
+    assert {move.to_uci() for move in BoardAnalyzer.get_valid_moves(piece=rook, board=board)} == {'d2d3', 'd2d4', 'd2d5', 'd2d6', 'd2d7', 'd2d8'}
+
+def test_double_check_leaves_only_king_moves():
+    board = Board.from_fen('4k3/8/8/8/8/5n2/8/R3K2r w - - 0 1')
+    assert {move.x1 * 8 + move.y1 for move in BoardAnalyzer.get_all_valid_moves(color=ChessPieceColor.WHITE, board=board)} == {4}
+
+
+def play(board: Board, moves: str):
+    for text in moves.split():
+        move = Move.from_uci(text)
+        board.make_move(x1=move.x1, y1=move.y1, x2=move.x2, y2=move.y2)
+
+def test_move_records_round_trip():
+    assert unpack_move_record(pack_move_record(1, 4, 3, 4)) is get_move(1, 4, 3, 4)
+
+def test_history_has_to_hold_a_move():
+    with pytest.raises(ValueError):
+        Board.from_fen(MIDDLEGAME_FEN, max_history=0)
+
+def test_full_history_drops_the_oldest_moves():
+    board = Board.from_fen(MIDDLEGAME_FEN, max_history=3)
+    play(board, 'a1b1 a8b8 b1a1')
+    fen = board.to_fen()
+    play(board, 'b8a8 a1b1 a8b8')
+    assert board.get_history_length() == 3
+    for _ in range(4):
+        board.unmake_move()
+    # only the last three moves could be taken back
+    assert board.to_fen() == fen
+    assert board.get_history_length() == 0
+
+def test_last_move_keeps_the_captured_piece():
+    board = Board.from_fen(MIDDLEGAME_FEN)
+    assert board.get_last_move() is None
+    victim = board.get_piece_at(5, 0)
+    play(board, 'e2a6')
+    last_move = board.get_last_move()
+    assert last_move.positions is Move.from_uci('e2a6')
+    assert last_move.killed_piece is victim
+    assert last_move.moved_piece is board.get_piece_at(5, 0)
+    board.unmake_move()
+    assert board.get_piece_at(5, 0) is victim
+    assert victim in board.get_pieces(color=ChessPieceColor.BLACK)
+
+STALEMATE_FEN = '7k/5Q2/6K1/8/8/8/8/8 b - - 0 1'
+
+
+def test_moves_can_be_played_while_iterating():
+    board = Board.from_fen(MIDDLEGAME_FEN)
+    fen = board.to_fen()
+    seen = []
+    for move in BoardAnalyzer.iter_valid_moves(color=ChessPieceColor.WHITE, board=board):
+        board.make_move(x1=move.x1, y1=move.y1, x2=move.x2, y2=move.y2)
+        board.unmake_move()
+        seen.append(move)
+    assert seen == BoardAnalyzer.get_all_valid_moves(color=ChessPieceColor.WHITE, board=board)
+    assert board.to_fen() == fen
+
+def test_has_moves_stops_at_the_first_move():
+    yielded = []
+    class CountingAnalyzer(BoardAnalyzer):
+        @classmethod
+        def iter_valid_moves(cls, color: ChessPieceColor, board: Board):
+            for move in super().iter_valid_moves(color=color, board=board):
+                yielded.append(move)
+                yield move
+
+    assert CountingAnalyzer.has_moves(color=ChessPieceColor.WHITE, board=Board.from_fen(MIDDLEGAME_FEN))
+    assert len(yielded) == 1
+    assert not BoardAnalyzer.has_moves(color=ChessPieceColor.BLACK, board=Board.from_fen(STALEMATE_FEN))
+
+
+def get_evaluation_terms(board: Board) -> tuple:
+    return (board.get_material_balance(), board.midgame_score, board.endgame_score, board.phase, dict(board.get_piece_counts()))
+
+def test_evaluation_terms_match_a_fresh_board():
+    generator = random.Random(7)
+    board = Board.from_fen(MIDDLEGAME_FEN)
+    start_terms = get_evaluation_terms(board)
+    for _ in range(60):
+        if not (moves := BoardAnalyzer.get_all_valid_moves(color=board.get_side_to_move(), board=board)):
+            break
+        move = generator.choice(moves)
+        board.make_move(x1=move.x1, y1=move.y1, x2=move.x2, y2=move.y2)
+        assert get_evaluation_terms(board) == get_evaluation_terms(Board.from_fen(board.to_fen()))
+
+    while board.get_history_length():
+        board.unmake_move()
+    assert get_evaluation_terms(board) == start_terms
+
+def test_material_balance_is_from_whites_point_of_view():
+    # a white rook against a black knight
+    board = Board.from_fen('4k3/8/8/3n4/8/8/8/R3K3 w - - 0 1')
+    assert board.get_material_balance() == board.get_piece_at(0, 0).get_points() - board.get_piece_at(4, 3).get_points() > 0
+
+
+def test_fen_round_trip():
+    assert create_board('startpos').to_fen() == 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1'
+    for fen in (MIDDLEGAME_FEN, STALEMATE_FEN, '4k3/8/8/8/8/8/4P3/4K3 b - - 0 1'):
+        assert Board.from_fen(fen).to_fen() == fen
+    # the position part of an EPD line is enough
+    assert Board.from_fen('4k3/8/8/8/8/8/4P3/4K3 b').to_fen() == '4k3/8/8/8/8/8/4P3/4K3 b - - 0 1'
+
+def test_invalid_fens_are_rejected():
+    for (fen, reason) in (
+        ('4k3/8/8/8/8/8/4P3/4K3', 'side to move'),
+        ('4k3/8/8/8/8/8/4P3/4K3 x', 'side to move'),
+        ('4k3/8/8/8/8/8/4K3 w', 'expected 8 ranks'),
+        ('4k3/8/8/8/8/8/4X3/4K3 w', 'unknown piece'),
+        ('4k3p/8/8/8/8/8/8/4K3 w', 'more than 8 files'),
+        ('4k2/8/8/8/8/8/8/4K3 w', "doesn't cover 8 files"),
+        ('8/8/8/8/8/8/8/4K3 w', 'black king'),
+    ):
+        with pytest.raises(InvalidFenException, match=reason):
+            Board.from_fen(fen)
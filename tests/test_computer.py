@@ -0,0 +1,107 @@
+import math
+import threading
+import time
+
+import pytest
+
+from board import Board, BoardAnalyzer
+from chess_enums import ChessPieceColor
+from chess_game_data import ChessGameData
+from chess_enums import BoundType
+from computer import SearchContext, SearchLimits, get_ai_move, get_game_mode, get_ponder_move, quiescence
+from move import Move
+from search_stats import SearchStats
+
+FEN = 'r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w - - 0 1'
+# Qxd5 wins a pawn at the horizon and loses the queen to exd5 right after
+POISONED_PAWN_FEN = '8/7k/4p3/3p4/3Q4/8/8/K7 w - - 0 1'
+
+
+def create_game_data(fen: str = FEN, depth: int = 3, quiescence_depth: int = 2) -> ChessGameData:
+    board = Board.from_fen(fen)
+    return ChessGameData(
+        game_mode=get_game_mode(computers_color=board.get_side_to_move()),
+        board=board,
+        board_analyzer=BoardAnalyzer(),
+        depth=depth,
+        quiescence_depth=quiescence_depth
+    )
+
+def get_legal_moves(game_data: ChessGameData) -> list:
+    return BoardAnalyzer.get_all_valid_moves(color=game_data.board.get_side_to_move(), board=game_data.board)
+
+
+def test_limits_are_validated():
+    for limits in ({'max_depth': 0}, {'time_limit': 0}, {'node_limit': 0}):
+        with pytest.raises(ValueError):
+            SearchLimits(**limits)
+
+def test_search_deepens_up_to_max_depth():
+    stats = SearchStats()
+    game_data = create_game_data()
+    move = get_ai_move(game_data=game_data, limits=SearchLimits(max_depth=2), stats=stats)
+    assert move in get_legal_moves(game_data)
+    assert stats.completed_depth == 2
+    assert sorted(stats.depth_times) == [1, 2]
+
+def test_node_limit_stops_the_search():
+    stats = SearchStats()
+    game_data = create_game_data(depth=6)
+    move = get_ai_move(game_data=game_data, limits=SearchLimits(node_limit=500), stats=stats)
+    assert move in get_legal_moves(game_data)
+    # the node past the limit aborts the search
+    assert stats.nodes == 501
+    assert stats.completed_depth < 6
+
+def test_time_limit_stops_the_search():
+    game_data = create_game_data(depth=10)
+    start = time.perf_counter()
+    move = get_ai_move(game_data=game_data, limits=SearchLimits(time_limit=0.2))
+    assert time.perf_counter() - start < 2
+    assert move in get_legal_moves(game_data)
+
+def test_stopped_search_still_returns_a_legal_move():
+    stop_event = threading.Event()
+    stop_event.set()
+    stats = SearchStats()
+    game_data = create_game_data()
+    move = get_ai_move(game_data=game_data, stop_event=stop_event, stats=stats)
+    assert move in get_legal_moves(game_data)
+    assert stats.completed_depth == 0
+
+def test_board_is_restored_after_an_aborted_search():
+    game_data = create_game_data(depth=6)
+    fen = game_data.board.to_fen()
+    get_ai_move(game_data=game_data, limits=SearchLimits(node_limit=300))
+    assert game_data.board.to_fen() == fen
+    assert game_data.board.get_history_length() == 0
+
+def test_quiescence_sees_the_recapture_past_the_horizon():
+    assert get_ai_move(game_data=create_game_data(fen=POISONED_PAWN_FEN, depth=1, quiescence_depth=0)).to_uci() == 'd4d5'
+    stats = SearchStats()
+    assert get_ai_move(game_data=create_game_data(fen=POISONED_PAWN_FEN, depth=1, quiescence_depth=2), stats=stats).to_uci() != 'd4d5'
+    assert stats.quiescence_nodes > 0
+
+def test_quiescence_without_depth_is_the_static_evaluation():
+    game_data = create_game_data(fen=POISONED_PAWN_FEN)
+    (score, move) = quiescence(game_data, computers_turn=True, alpha=math.inf, beta=-math.inf, ply=0, context=SearchContext(limits=SearchLimits()), quiescence_depth=0)
+    assert move is None
+    assert score == BoardAnalyzer.evaluate_board(game_mode=game_data.game_mode, board=game_data.board)
+
+def test_ponder_move_is_the_expected_reply_if_legal():
+    # the computer plays black, so the ponder move is white's
+    game_data = ChessGameData(game_mode=get_game_mode(computers_color=ChessPieceColor.BLACK), board=Board.from_fen(POISONED_PAWN_FEN), board_analyzer=BoardAnalyzer())
+    key = game_data.board.get_hash()
+    # without an expectation the best ordered move, here the only capture
+    assert get_ponder_move(game_data=game_data).to_uci() == 'd4d5'
+
+    game_data.transposition_table.store(key=key, depth=1, bound=BoundType.EXACT, score=0, best_move=Move.from_uci('a1b1'))
+    assert get_ponder_move(game_data=game_data).to_uci() == 'a1b1'
+
+    game_data.transposition_table.store(key=key, depth=2, bound=BoundType.EXACT, score=0, best_move=Move.from_uci('a1a3'))
+    assert get_ponder_move(game_data=game_data).to_uci() == 'd4d5'
+
+def test_no_ponder_move_without_legal_moves():
+    board = Board.from_fen('R5k1/5ppp/8/8/8/8/8/6K1 b - - 0 1')
+    game_data = ChessGameData(game_mode=get_game_mode(computers_color=ChessPieceColor.WHITE), board=board, board_analyzer=BoardAnalyzer())
+    assert get_ponder_move(game_data=game_data) is None
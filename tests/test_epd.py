@@ -0,0 +1,31 @@
+import pytest
+
+from board import BitBoard
+from epd import iter_epd_file, iter_epd_lines, parse_epd_line
+from exceptions import InvalidFenException
+
+EPD_LINE = 'r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w - - bm Bb5; id "ruy lopez";'
+FEN_LINE = '4k3/8/8/8/8/8/4P3/4K3 b - - 3 40'
+
+
+def test_parse_epd_line_splits_the_operations():
+    (fen, operations) = parse_epd_line(EPD_LINE)
+    assert fen == 'r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w - -'
+    assert operations == {'bm': 'Bb5', 'id': 'ruy lopez'}
+
+def test_parse_epd_line_keeps_the_move_counters_of_a_fen():
+    assert parse_epd_line(FEN_LINE) == (FEN_LINE, dict())
+
+def test_iter_epd_lines_skips_blank_lines_and_comments():
+    records = list(iter_epd_lines(['# openings', '', EPD_LINE, FEN_LINE], board_class=BitBoard))
+    assert [record.line_number for record in records] == [3, 4]
+    assert all(isinstance(record.board, BitBoard) for record in records)
+    assert records[0].operations['id'] == 'ruy lopez'
+    # the move counters aren't kept
+    assert records[1].board.to_fen() == '4k3/8/8/8/8/8/4P3/4K3 b - - 0 1'
+
+def test_invalid_fen_reports_its_line_number(tmp_path):
+    path = tmp_path / 'positions.epd'
+    path.write_text(f"{FEN_LINE}\n\n4k3/8/8/8/8/8/4P3/4K4 w - -\n")
+    with pytest.raises(InvalidFenException, match='line 3: '):
+        list(iter_epd_file(str(path)))
@@ -0,0 +1,28 @@
+import pytest
+
+from board import Board, BoardAnalyzer
+from chess_enums import ChessPieceColor
+from move import Move, get_move
+
+
+def test_moves_are_interned():
+    assert get_move(1, 4, 3, 4) is get_move(1, 4, 3, 4)
+    assert Move.from_uci('e2e4') is get_move(1, 4, 3, 4)
+    board = Board.from_fen('4k3/8/8/8/8/8/4P3/4K3 w - - 0 1')
+    # move generation hands out the same instances
+    assert any(move is get_move(1, 4, 3, 4) for move in BoardAnalyzer.get_all_valid_moves(color=ChessPieceColor.WHITE, board=board))
+
+def test_uci_round_trip():
+    for text in ('a1h8', 'h8a1', 'e2e4', 'g8f6'):
+        assert Move.from_uci(text).to_uci() == text
+
+def test_invalid_uci_moves_are_rejected():
+    for text in ('e2e9', 'i2e4', 'e2e', 'e2e4q'):
+        with pytest.raises(ValueError):
+            Move.from_uci(text)
+
+def test_pieces_have_no_instance_dict():
+    piece = Board.from_fen('4k3/8/8/8/8/8/4P3/4K3 w - - 0 1').get_piece_at(1, 4)
+    assert not hasattr(piece, '__dict__')
+    with pytest.raises(AttributeError):
+        piece.extra = 1
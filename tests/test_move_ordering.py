@@ -0,0 +1,47 @@
+from board import Board, BoardAnalyzer
+from chess_enums import ChessPieceColor
+from move import Move
+from move_ordering import MoveOrderer
+
+# the queen on d5 can be taken by pawn, knight and queen, the rook on b5
+# by the knight and the pawn on a4 by knight and queen
+FEN = '4k3/8/8/1r1q4/p3P3/2N5/8/3QK3 w - - 0 1'
+CAPTURES = ['e4d5', 'c3d5', 'd1d5', 'c3b5', 'c3a4', 'd1a4']
+
+
+def get_ordered_moves(orderer: MoveOrderer, board: Board, ply: int = 0, tt_move: Move | None = None) -> list[str]:
+    moves = BoardAnalyzer.get_all_valid_moves(color=ChessPieceColor.WHITE, board=board)
+    return [move.to_uci() for move in orderer.order_moves(moves=moves, board=board, ply=ply, tt_move=tt_move)]
+
+
+def test_captures_come_first_by_victim_then_attacker():
+    ordered = get_ordered_moves(MoveOrderer(), Board.from_fen(FEN))
+    assert ordered[:len(CAPTURES)] == CAPTURES
+
+def test_transposition_table_move_comes_before_captures():
+    ordered = get_ordered_moves(MoveOrderer(), Board.from_fen(FEN), tt_move=Move.from_uci('e1f2'))
+    assert ordered[:2] == ['e1f2', 'e4d5']
+
+def test_killers_follow_captures_at_their_ply():
+    board = Board.from_fen(FEN)
+    orderer = MoveOrderer()
+    for text in ('e1f1', 'd1d3'):
+        orderer.record_cutoff(move=Move.from_uci(text), board=board, ply=2, depth=1)
+    # the latest killer is tried first
+    assert get_ordered_moves(orderer, board, ply=2)[len(CAPTURES):len(CAPTURES) + 2] == ['d1d3', 'e1f1']
+    # other plies only see them through the history scores
+    assert get_ordered_moves(orderer, board, ply=3)[len(CAPTURES):len(CAPTURES) + 2] == ['e1f1', 'd1d3']
+
+def test_history_orders_quiet_moves_by_depth_of_their_cutoffs():
+    board = Board.from_fen(FEN)
+    orderer = MoveOrderer()
+    orderer.record_cutoff(move=Move.from_uci('c3e2'), board=board, ply=5, depth=1)
+    orderer.record_cutoff(move=Move.from_uci('d1c1'), board=board, ply=6, depth=3)
+    assert get_ordered_moves(orderer, board)[len(CAPTURES):len(CAPTURES) + 2] == ['d1c1', 'c3e2']
+
+def test_captures_are_not_remembered():
+    board = Board.from_fen(FEN)
+    orderer = MoveOrderer()
+    orderer.record_cutoff(move=Move.from_uci('e4d5'), board=board, ply=0, depth=4)
+    assert orderer.killers[0] == [None, None]
+    assert not any(orderer.history)
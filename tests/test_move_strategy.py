@@ -0,0 +1,38 @@
+from board import Board, BoardAnalyzer
+from move_strategy import BISHOP_RAYS, KING_TARGETS, KNIGHT_TARGETS, PAWN_CAPTURE_TARGETS, ROOK_RAYS
+
+A1 = 0
+D4 = 3 * 8 + 3
+H8 = 63
+
+
+def get_targets(fen: str, square: str) -> set[str]:
+    board = Board.from_fen(fen)
+    piece = board.get_piece_at(int(square[1]) - 1, ord(square[0]) - ord('a'))
+    return {move.to_uci()[2:] for move in piece.iter_moves(board=board, board_analyzer=BoardAnalyzer)}
+
+
+def test_jump_tables_stay_on_the_board():
+    assert set(KNIGHT_TARGETS[A1]) == {(1, 2), (2, 1)}
+    assert len(KNIGHT_TARGETS[D4]) == 8
+    assert [len(KING_TARGETS[square]) for square in (A1, 1, D4)] == [3, 5, 8]
+    assert set(PAWN_CAPTURE_TARGETS[1][8]) == {(2, 1)}
+    assert set(PAWN_CAPTURE_TARGETS[-1][D4]) == {(2, 2), (2, 4)}
+
+def test_rays_run_outwards_from_the_square():
+    assert sorted(len(ray) for ray in ROOK_RAYS[A1]) == [0, 0, 7, 7]
+    assert sorted(len(ray) for ray in BISHOP_RAYS[H8]) == [0, 0, 0, 7]
+    for rays in (ROOK_RAYS[D4], BISHOP_RAYS[D4]):
+        for ray in rays:
+            distances = [max(abs(row - 3), abs(col - 3)) for (row, col) in ray]
+            assert distances == list(range(1, len(ray) + 1))
+
+def test_sliders_stop_at_the_first_piece():
+    # the rook captures the knight on d6 but not past it, and stops before its own pawn on f4
+    fen = '4k3/3p4/3n4/8/3R1P2/8/8/4K3 w - - 0 1'
+    assert get_targets(fen, 'd4') == {'d5', 'd6', 'd3', 'd2', 'd1', 'c4', 'b4', 'a4', 'e4'}
+
+def test_knight_and_king_skip_own_pieces():
+    fen = '4k3/8/8/8/8/2P5/8/1N2K3 w - - 0 1'
+    assert get_targets(fen, 'b1') == {'a3', 'd2'}
+    assert get_targets(fen, 'e1') == {'d1', 'f1', 'd2', 'e2', 'f2'}
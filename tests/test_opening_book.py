@@ -0,0 +1,69 @@
+import random
+
+from board import BoardAnalyzer
+from move import Move
+from opening_book import ENTRY_STRUCT, OpeningBook, decode_move, polyglot_key
+from perft import create_board
+
+# the reference keys from the Polyglot book format description
+REFERENCE_KEYS = (
+    ('', 0x463b96181691fc9c),
+    ('e2e4', 0x823c9b50fd114196),
+    ('e2e4 d7d5', 0x0756b94461c50fb0),
+    ('e2e4 d7d5 e4e5', 0x662fafb965db29d4),
+    ('e2e4 d7d5 e4e5 f7f5', 0x22a48b5a8e47ff78),
+    ('e2e4 d7d5 e4e5 f7f5 e1e2', 0x652a607ca3f242c1),
+    ('e2e4 d7d5 e4e5 f7f5 e1e2 e8f7', 0x00fdd303c946bdd9),
+    ('a2a4 b7b5 h2h4 b5b4 c2c4', 0x3c8123ea7b067637),
+)
+
+
+def create_position(moves: str):
+    board = create_board('startpos')
+    for text in moves.split():
+        move = Move.from_uci(text)
+        board.make_move(x1=move.x1, y1=move.y1, x2=move.x2, y2=move.y2)
+    return board
+
+def encode_move(text: str) -> int:
+    move = Move.from_uci(text)
+    return move.y2 | move.x2 << 3 | move.y1 << 6 | move.x1 << 9
+
+def write_book(path: str, entries: list[tuple[int, str, int]]):
+    with open(path, 'wb') as file:
+        for (key, text, weight) in sorted(entries):
+            file.write(ENTRY_STRUCT.pack(key, encode_move(text), weight, 0))
+
+
+def test_reference_keys():
+    for (moves, key) in REFERENCE_KEYS:
+        assert polyglot_key(create_position(moves)) == key, moves
+
+def test_promotions_are_not_decoded():
+    assert decode_move(encode_move('e2e4')) is Move.from_uci('e2e4')
+    assert decode_move(encode_move('e7e8') | 4 << 12) is None
+
+def test_book_moves_are_picked_by_weight(tmp_path):
+    path = str(tmp_path / 'book.bin')
+    start_key = polyglot_key(create_position(''))
+    write_book(path, [
+        (start_key, 'e2e4', 3),
+        (start_key, 'd2d4', 1),
+        # not legal in the start position
+        (start_key, 'e2e5', 100),
+        (polyglot_key(create_position('e2e4')), 'e7e5', 1),
+    ])
+    with OpeningBook(path=path) as book:
+        board = create_position('')
+        assert sorted(entry.move.to_uci() for entry in book.get_entries(board)) == ['d2d4', 'e2e4', 'e2e5']
+        moves = [book.get_move(board=board, board_analyzer=BoardAnalyzer, rng=random.Random(seed)).to_uci() for seed in range(40)]
+        assert set(moves) == {'e2e4', 'd2d4'}
+        assert moves.count('e2e4') > moves.count('d2d4')
+        assert book.get_move(board=create_position('e2e4'), board_analyzer=BoardAnalyzer).to_uci() == 'e7e5'
+        assert book.get_move(board=create_position('d2d4'), board_analyzer=BoardAnalyzer) is None
+
+def test_empty_book(tmp_path):
+    path = tmp_path / 'empty.bin'
+    path.write_bytes(b'')
+    with OpeningBook(path=str(path)) as book:
+        assert book.get_move(board=create_position(''), board_analyzer=BoardAnalyzer) is None
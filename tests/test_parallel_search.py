@@ -0,0 +1,105 @@
+import threading
+
+from board import Board, BitBoard, BitBoardAnalyzer, BoardAnalyzer
+from chess_enums import ChessPieceColor, GameMode
+from chess_game_data import ChessGameData
+from computer import SearchContext, SearchLimits, get_ai_move, get_game_mode, minimax
+from move import Move
+from parallel_search import _search_root_moves, get_ai_move_parallel
+from search_stats import SearchStats
+from test_tablebase import write_table
+
+# the computer plays white on from_fen boards, whose pawns are oriented
+# for WHITE_DOWN while the search runs in BLACK_DOWN
+FEN = '4k3/8/8/4q3/3P4/8/8/4K3 w - - 0 1'
+# after Rh1+ the pawn's capture on e5 only exists below the root
+CHECK_FEN = '7k/8/8/4n3/3P4/8/8/K5R1 w - - 0 1'
+DEPTH = 3
+# black to move, Ke8 walks into the made up "white mates in 5" entry of write_table
+TABLEBASE_FEN = '3k4/8/8/8/4P3/8/8/4K3 b - - 0 1'
+
+
+def search_root_moves(board: Board, board_analyzer_class: type[BoardAnalyzer], root_moves: list[Move], tablebase_directory: str | None = None) -> dict[int, list[tuple[float, Move]]]:
+    (results, _) = _search_root_moves(
+        position=board.to_compact(),
+        board_class=type(board),
+        board_analyzer_class=board_analyzer_class,
+        game_mode=get_game_mode(computers_color=board.get_side_to_move()),
+        quiescence_depth=2,
+        tablebase_directory=tablebase_directory,
+        max_depth=DEPTH,
+        limits=SearchLimits(),
+        root_moves=root_moves
+    )
+    return results
+
+def create_game_data(fen: str, threads: int) -> ChessGameData:
+    return ChessGameData(
+        game_mode=get_game_mode(computers_color=ChessPieceColor.WHITE),
+        board=Board.from_fen(fen),
+        board_analyzer=BoardAnalyzer(),
+        depth=DEPTH,
+        quiescence_depth=2,
+        threads=threads
+    )
+
+
+def test_compact_board_keeps_pawn_direction():
+    board = Board.from_fen(FEN)
+    copy = Board.from_compact(position=board.to_compact())
+    moves = {move.to_uci() for move in BoardAnalyzer.get_all_valid_moves(color=ChessPieceColor.WHITE, board=copy)}
+    assert 'd4e5' in moves
+    assert 'd4d3' not in moves
+    assert copy.get_pawn_game_mode() is board.get_pawn_game_mode() is GameMode.WHITE_DOWN
+
+def test_parallel_scores_match_serial_scores():
+    board = Board.from_fen(CHECK_FEN)
+    game_mode = get_game_mode(computers_color=ChessPieceColor.WHITE)
+    assert game_mode is GameMode.BLACK_DOWN
+    game_data = ChessGameData(game_mode=game_mode, board=board, board_analyzer=BoardAnalyzer(), depth=DEPTH, quiescence_depth=2)
+
+    for root_move in BoardAnalyzer.get_all_valid_moves(color=ChessPieceColor.WHITE, board=board):
+        results = search_root_moves(board=board, board_analyzer_class=BoardAnalyzer, root_moves=[root_move])
+        board.make_move(x1=root_move.x1, y1=root_move.y1, x2=root_move.x2, y2=root_move.y2)
+        try:
+            (serial_score, _) = minimax(game_data, DEPTH - 1, computers_turn=False, ply=1, context=SearchContext(limits=SearchLimits()))
+        finally:
+            board.unmake_move()
+        game_data.transposition_table.clear()
+
+        assert results[DEPTH] == [(serial_score, root_move)], root_move.to_uci()
+
+def test_workers_search_with_the_callers_board_type():
+    moves = BoardAnalyzer.get_all_valid_moves(color=ChessPieceColor.WHITE, board=Board.from_fen(CHECK_FEN))
+    assert search_root_moves(board=BitBoard.from_fen(CHECK_FEN), board_analyzer_class=BitBoardAnalyzer, root_moves=moves) == \
+        search_root_moves(board=Board.from_fen(CHECK_FEN), board_analyzer_class=BoardAnalyzer, root_moves=moves)
+
+def test_workers_probe_the_callers_tablebases(tmp_path):
+    write_table(str(tmp_path))
+    board = Board.from_fen(TABLEBASE_FEN)
+    root_moves = [Move.from_uci('d8e8')]
+    without_tablebase = search_root_moves(board=board, board_analyzer_class=BoardAnalyzer, root_moves=root_moves)
+    with_tablebase = search_root_moves(board=board, board_analyzer_class=BoardAnalyzer, root_moves=root_moves, tablebase_directory=str(tmp_path))
+    assert with_tablebase[1] != without_tablebase[1]
+
+def test_get_ai_move_searches_in_parallel_when_asked():
+    stats = SearchStats()
+    move = get_ai_move(game_data=create_game_data(fen=CHECK_FEN, threads=2), stats=stats)
+    assert move in BoardAnalyzer.get_all_valid_moves(color=ChessPieceColor.WHITE, board=Board.from_fen(CHECK_FEN))
+    assert stats.completed_depth == DEPTH
+    assert stats.best_move == move
+    assert stats.nodes > 0
+
+def test_node_limit_is_shared_by_the_workers():
+    stats = SearchStats()
+    get_ai_move_parallel(game_data=create_game_data(fen=CHECK_FEN, threads=2), workers=2, limits=SearchLimits(node_limit=200), stats=stats)
+    # every worker stops on the first node past its share
+    assert stats.nodes <= 200 + 2
+
+def test_stop_event_stops_the_workers():
+    stop_event = threading.Event()
+    stop_event.set()
+    stats = SearchStats()
+    move = get_ai_move_parallel(game_data=create_game_data(fen=CHECK_FEN, threads=2), workers=2, stop_event=stop_event, stats=stats)
+    assert move is not None
+    assert stats.completed_depth == 0
@@ -0,0 +1,21 @@
+import json
+
+from board import BoardAnalyzer
+from perft import KNOWN_NODE_COUNTS, create_board, main, perft
+
+
+def test_start_position_node_counts():
+    for (depth, nodes) in KNOWN_NODE_COUNTS['startpos'].items():
+        if depth <= 3:
+            assert perft(board=create_board('startpos'), board_analyzer=BoardAnalyzer(), depth=depth) == nodes
+
+def test_baseline_recorded_at_zero_speed(tmp_path, capsys):
+    baseline = tmp_path / 'baseline.json'
+    baseline.write_text(json.dumps({'startpos': {'depth': 1, 'nodes': 20, 'seconds': 0.0, 'nodes_per_second': 0.0}}))
+    assert main(['--position', 'startpos', '--depth', '1', '--baseline', str(baseline)]) == 0
+    assert 'baseline speed' not in capsys.readouterr().out
+
+def test_mismatch_against_baseline_fails(tmp_path):
+    baseline = tmp_path / 'baseline.json'
+    baseline.write_text(json.dumps({'two-knights': {'depth': 1, 'nodes': 1, 'seconds': 1.0, 'nodes_per_second': 1.0}}))
+    assert main(['--position', 'two-knights', '--depth', '1', '--baseline', str(baseline)]) == 1
@@ -0,0 +1,38 @@
+from board import Board, BoardAnalyzer
+from chess_enums import ChessPieceColor
+
+CHECKMATE_FEN = 'R5k1/5ppp/8/8/8/8/8/6K1 b - - 0 1'
+STALEMATE_FEN = '7k/5Q2/6K1/8/8/8/8/8 b - - 0 1'
+CHECK_FEN = '6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1'
+
+
+def get_status(fen: str):
+    return BoardAnalyzer.get_position_status(board=Board.from_fen(fen))
+
+
+def test_checkmate():
+    status = get_status(CHECKMATE_FEN)
+    assert (status.side_to_move, status.in_check, status.has_moves) == (ChessPieceColor.BLACK, True, False)
+    assert status.is_checkmate() and status.is_terminal() and not status.is_draw()
+    assert status.get_winner() is ChessPieceColor.WHITE
+    board = Board.from_fen(CHECKMATE_FEN)
+    assert BoardAnalyzer.is_winner(color=ChessPieceColor.WHITE, board=board)
+    assert not BoardAnalyzer.is_winner(color=ChessPieceColor.BLACK, board=board)
+
+def test_stalemate():
+    status = get_status(STALEMATE_FEN)
+    assert status.is_stalemate() and status.is_draw() and status.is_terminal()
+    assert status.get_winner() is None
+
+def test_insufficient_material():
+    for fen in ('8/8/4k3/8/8/3NK3/8/8 w - - 0 1', '8/8/2b1k3/8/8/3BK3/8/8 w - - 0 1'):
+        status = get_status(fen)
+        assert status.insufficient_material and status.is_draw() and status.is_terminal(), fen
+    # bishops on squares of different colors can still mate
+    assert not get_status('8/2b5/4k3/8/8/3BK3/8/8 w - - 0 1').insufficient_material
+
+def test_game_goes_on():
+    status = get_status(CHECK_FEN)
+    assert status.has_moves and not status.in_check
+    assert not (status.is_terminal() or status.is_draw() or status.is_checkmate())
+    assert not BoardAnalyzer.is_terminal(board=Board.from_fen(CHECK_FEN))
@@ -0,0 +1,22 @@
+import random
+
+from board import Board
+from search_benchmark import BENCHMARK_POSITIONS, run_benchmark
+
+
+def test_seeded_runs_are_reproducible():
+    (fen, _) = BENCHMARK_POSITIONS['rook-endgame']
+    first = run_benchmark(board=Board.from_fen(fen), depth=2, seed='rook-endgame')
+    second = run_benchmark(board=Board.from_fen(fen), depth=2, seed='rook-endgame')
+
+    assert first['seed'] == 'rook-endgame'
+    assert (first['nodes'], first['best_move']) == (second['nodes'], second['best_move'])
+    assert [depth['nodes'] for depth in first['depths']] == [depth['nodes'] for depth in second['depths']]
+
+def test_seeded_run_leaves_the_global_random_state_alone():
+    (fen, _) = BENCHMARK_POSITIONS['rook-endgame']
+    random.seed(1)
+    expected = random.random()
+    random.seed(1)
+    run_benchmark(board=Board.from_fen(fen), depth=1, seed='rook-endgame')
+    assert random.random() == expected
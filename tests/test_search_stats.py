@@ -0,0 +1,50 @@
+import random
+
+from board import Board, BoardAnalyzer
+from chess_game_data import ChessGameData
+from computer import SearchLimits, get_ai_move, get_game_mode
+from search_stats import SearchStats
+
+FEN = 'r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w - - 0 1'
+
+
+def create_game_data() -> ChessGameData:
+    board = Board.from_fen(FEN)
+    return ChessGameData(
+        game_mode=get_game_mode(computers_color=board.get_side_to_move()),
+        board=board,
+        board_analyzer=BoardAnalyzer(),
+        quiescence_depth=1
+    )
+
+
+def test_progress_is_reported_after_every_depth():
+    reports = []
+    stats = SearchStats()
+    get_ai_move(game_data=create_game_data(), limits=SearchLimits(max_depth=3), stats=stats, progress_callback=lambda stats: reports.append((stats.completed_depth, stats.nodes)))
+    assert [depth for (depth, _) in reports] == [1, 2, 3]
+    assert [nodes for (_, nodes) in reports] == sorted(nodes for (_, nodes) in reports)
+    assert stats.best_move is not None and stats.score is not None
+
+def test_progress_is_reported_every_interval_nodes():
+    nodes = []
+    stats = SearchStats()
+    get_ai_move(game_data=create_game_data(), limits=SearchLimits(max_depth=2), stats=stats, progress_callback=lambda stats: nodes.append(stats.nodes), progress_interval=50)
+    assert [count for count in nodes if count % 50 == 0] == list(range(50, stats.nodes + 1, 50))
+
+def test_every_search_counts_its_own_nodes():
+    (first, second) = (SearchStats(), SearchStats())
+    # ties are broken at random, which can change the next depth's move order
+    random_state = random.getstate()
+    try:
+        for stats in (first, second):
+            random.seed(0)
+            get_ai_move(game_data=create_game_data(), limits=SearchLimits(max_depth=2), stats=stats)
+    finally:
+        random.setstate(random_state)
+    assert first.nodes == second.nodes > 0
+
+def test_rates_of_an_empty_search():
+    data = SearchStats().to_dict()
+    assert (data['first_move_cutoff_rate'], data['tt_hit_rate'], data['best_move']) == (0.0, 0.0, None)
+    assert data['nodes'] == 0
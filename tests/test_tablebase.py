@@ -0,0 +1,34 @@
+import os
+
+from board import Board
+from chess_enums import GameMode, TablebaseResult
+from factory import SimpleChessPieceFactory
+from tablebase import TABLE_SUFFIX, Tablebases, _get_index
+
+# white king e1, black king e8, white pawn e4 with white to move; the same
+# position upside down for a board whose white pawns move down
+FEN = '4k3/8/8/8/4P3/8/8/4K3 w - - 0 1'
+MIRRORED_FEN = '4K3/8/8/4P3/8/8/8/4k3 w - - 0 1'
+
+
+def write_table(directory: str):
+    # every real KPvK position is a draw without promotions, so a single
+    # made up entry shows which position a probe looks at
+    values = bytearray(2 * 64 ** 3)
+    values[_get_index(0, [0 * 8 + 4, 7 * 8 + 4, 3 * 8 + 4])] = 5
+    with open(os.path.join(directory, 'KPvK' + TABLE_SUFFIX), 'wb') as file:
+        file.write(values)
+
+
+def test_probe_mirrors_boards_with_pawns_moving_down(tmp_path):
+    write_table(str(tmp_path))
+    with Tablebases(directory=str(tmp_path)) as tablebases:
+        board = Board.from_fen(FEN)
+        mirrored = Board.from_fen(MIRRORED_FEN, chess_piece_factory=SimpleChessPieceFactory(game_mode=GameMode.BLACK_DOWN))
+        assert mirrored.get_pawn_game_mode() is GameMode.BLACK_DOWN
+
+        assert tablebases.probe(board).distance_to_mate == 5
+        assert tablebases.probe(mirrored).result is TablebaseResult.WIN
+        assert tablebases.probe(mirrored).distance_to_mate == 5
+        # the same squares with pawns moving up are a different position
+        assert tablebases.probe(Board.from_fen(MIRRORED_FEN)).result is TablebaseResult.DRAW
@@ -0,0 +1,84 @@
+import math
+
+import pytest
+
+from board import Board, BoardAnalyzer
+from chess_enums import BoundType, ChessPieceColor
+from chess_game_data import ChessGameData
+from computer import SearchContext, SearchLimits, get_game_mode, minimax
+from move import get_move
+from transposition_table import TranspositionTable
+
+FEN = 'r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w - - 0 1'
+MOVE = get_move(0, 1, 2, 2)
+
+
+def get_colliding_keys(table: TranspositionTable, count: int) -> list[int]:
+    # keys that land in the same bucket
+    return [1 + index * (table.mask + 1) for index in range(count)]
+
+def search(table: TranspositionTable, alpha: float = math.inf, beta: float = -math.inf) -> float:
+    board = Board.from_fen(FEN)
+    game_data = ChessGameData(
+        game_mode=get_game_mode(computers_color=ChessPieceColor.WHITE),
+        board=board,
+        board_analyzer=BoardAnalyzer(),
+        quiescence_depth=0,
+        transposition_table=table
+    )
+    (score, _) = minimax(game_data, 2, computers_turn=True, alpha=alpha, beta=beta, context=SearchContext(limits=SearchLimits()))
+    return score
+
+
+def test_store_and_probe():
+    table = TranspositionTable(size_mb=1)
+    table.store(key=42, depth=3, bound=BoundType.EXACT, score=1.5, best_move=MOVE)
+    entry = table.probe(42)
+    assert (entry.depth, entry.bound, entry.score, entry.best_move) == (3, BoundType.EXACT, 1.5, MOVE)
+    assert table.probe(43) is None
+    table.clear()
+    assert table.probe(42) is None
+
+def test_size_has_to_be_positive():
+    with pytest.raises(ValueError):
+        TranspositionTable(size_mb=0)
+
+def test_bucket_keeps_the_deepest_entry_of_the_search():
+    table = TranspositionTable(size_mb=1)
+    (deep, shallow, newer) = get_colliding_keys(table, 3)
+    table.store(key=deep, depth=5, bound=BoundType.EXACT, score=0, best_move=None)
+    table.store(key=shallow, depth=2, bound=BoundType.EXACT, score=0, best_move=None)
+    # the second slot is always replaced
+    table.store(key=newer, depth=1, bound=BoundType.EXACT, score=0, best_move=None)
+    assert table.probe(deep) is not None
+    assert table.probe(shallow) is None
+    assert table.probe(newer) is not None
+
+    # entries of an earlier search give way even to shallower ones
+    table.new_search()
+    table.store(key=shallow, depth=1, bound=BoundType.EXACT, score=0, best_move=None)
+    assert table.probe(deep) is None
+    assert table.probe(shallow) is not None
+
+def test_bound_flags_follow_the_search_window():
+    table = TranspositionTable(size_mb=1)
+    exact_score = search(table)
+    key = Board.from_fen(FEN).get_hash()
+    assert table.probe(key).bound is BoundType.EXACT
+
+    # the computer (minimizing) already has a better score: the search
+    # fails high and only proves a lower bound
+    table.clear()
+    score = search(table, alpha=exact_score - 1)
+    assert table.probe(key).bound is BoundType.LOWER
+    assert exact_score - 1 <= score <= exact_score
+
+    # the player already has a better score: the search fails low
+    table.clear()
+    score = search(table, beta=exact_score + 1)
+    assert table.probe(key).bound is BoundType.UPPER
+    assert exact_score <= score <= exact_score + 1
+
+def test_stored_entries_give_the_same_score():
+    table = TranspositionTable(size_mb=1)
+    assert search(table) == search(table)
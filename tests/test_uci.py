@@ -0,0 +1,40 @@
+import io
+
+from uci import UciEngine
+
+MOVES = 'e2e4 e7e5 g1f3 b8c6 f3e5'
+
+
+def run(engine: UciEngine, commands: list[str]) -> list[str]:
+    for command in commands:
+        engine.handle(command)
+        if command.startswith('go'):
+            engine.search_thread.join()
+    return engine.output.getvalue().splitlines()
+
+def get_last_score(lines: list[str]) -> int:
+    info = [line.split() for line in lines if line.startswith('info depth')][-1]
+    return int(info[info.index('cp') + 1])
+
+
+def test_engine_plays_both_colors_in_one_session():
+    engine = UciEngine(output=io.StringIO())
+    run(engine, [f"position startpos moves {MOVES}", 'go depth 3'])
+    session_lines = run(engine, [f"position startpos moves {MOVES} c6e5", 'go depth 2'])
+
+    fresh_lines = run(UciEngine(output=io.StringIO()), [f"position startpos moves {MOVES} c6e5", 'go depth 2'])
+
+    assert get_last_score(session_lines) == get_last_score(fresh_lines)
+    assert session_lines[-1] == fresh_lines[-1]
+
+def test_bestmove_is_legal_for_the_side_to_move():
+    lines = run(UciEngine(output=io.StringIO()), ['position startpos moves e2e4', 'go depth 1'])
+    assert lines[-1].startswith('bestmove ')
+    assert lines[-1].split()[1][1] in '78'
+
+def test_threads_option_searches_in_parallel():
+    lines = run(UciEngine(output=io.StringIO()), ['setoption name Threads value 2', 'position startpos moves e2e4', 'go depth 2'])
+    assert not any('unknown option' in line for line in lines)
+    assert lines[-1].startswith('bestmove ')
+    assert lines[-1].split()[1][1] in '78'
+    assert any(line.startswith('info depth 2 ') for line in lines)
@@ -0,0 +1,52 @@
+import random
+
+from board import Board, BitBoard, BoardAnalyzer
+from chess_enums import ChessPieceColor
+from move import Move
+from perft import create_board
+from zobrist import compute_hash
+
+MIDDLEGAME_FEN = 'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w - - 0 1'
+
+
+def get_full_hash(board: Board) -> int:
+    pieces = [*board.get_pieces(color=ChessPieceColor.WHITE), *board.get_pieces(color=ChessPieceColor.BLACK)]
+    return compute_hash(pieces=pieces, side_to_move=board.get_side_to_move())
+
+def play(board: Board, moves: str):
+    for text in moves.split():
+        move = Move.from_uci(text)
+        board.make_move(x1=move.x1, y1=move.y1, x2=move.x2, y2=move.y2)
+
+
+def test_incremental_hash_matches_a_full_recompute():
+    generator = random.Random(5)
+    for board in (Board.from_fen(MIDDLEGAME_FEN), BitBoard.from_fen(MIDDLEGAME_FEN)):
+        hashes = [board.get_hash()]
+        for _ in range(40):
+            if not (moves := BoardAnalyzer.get_all_valid_moves(color=board.get_side_to_move(), board=board)):
+                break
+            move = generator.choice(moves)
+            board.make_move(x1=move.x1, y1=move.y1, x2=move.x2, y2=move.y2)
+            assert board.get_hash() == get_full_hash(board)
+            hashes.append(board.get_hash())
+
+        # unmaking walks back through the same keys
+        while len(hashes) > 1:
+            hashes.pop()
+            board.unmake_move()
+            assert board.get_hash() == hashes[-1]
+
+def test_transpositions_share_a_hash_and_the_side_to_move_does_not():
+    board = create_board('startpos')
+    start_hash = board.get_hash()
+    play(board, 'g1f3 g8f6 f3g1 f6g8')
+    assert board.get_hash() == start_hash
+
+    first = create_board('startpos')
+    play(first, 'e2e4 e7e5 d2d4')
+    second = create_board('startpos')
+    play(second, 'd2d4 e7e5 e2e4')
+    assert first.get_hash() == second.get_hash()
+
+    assert Board.from_fen(MIDDLEGAME_FEN).get_hash() != Board.from_fen(MIDDLEGAME_FEN.replace(' w ', ' b ')).get_hash()
@@ -0,0 +1,72 @@
+from dataclasses import dataclass
+
+from chess_enums import BoundType
+from move import Move
+
+# rough size in bytes of one stored entry (the entry object, its score and
+# the bucket slot pointing to it), used to turn a memory budget into a slot count
+ENTRY_SIZE_BYTES = 120
+
+
+@dataclass(frozen=True, slots=True)
+class TranspositionEntry:
+    key: int
+    depth: int
+    bound: BoundType
+    score: float
+    best_move: Move | None
+    generation: int
+
+
+class TranspositionTable:
+    # two-tier buckets: the first slot of a bucket keeps the deepest
+    # result (unless it is left over from an earlier search), the second
+    # slot is always replaced
+    def __init__(self, size_mb: float = 16):
+        if (size_mb <= 0):
+            raise ValueError(f"size of transposition table has to be positive (given: {size_mb})")
+
+        buckets = 1
+        while buckets * 2 * 2 * ENTRY_SIZE_BYTES <= size_mb * 1024 * 1024:
+            buckets *= 2
+
+        self.mask = buckets - 1
+        self.slots: list[TranspositionEntry | None] = [None] * (2 * buckets)
+        self.generation = 0
+
+    def new_search(self):
+        self.generation += 1
+
+    def clear(self):
+        self.slots = [None] * len(self.slots)
+        self.generation = 0
+
+    def probe(self, key: int) -> TranspositionEntry | None:
+        index = (key & self.mask) << 1
+        if (entry := self.slots[index]) is not None and entry.key == key:
+            return entry
+        if (entry := self.slots[index + 1]) is not None and entry.key == key:
+            return entry
+        return None
+
+    def store(self, key: int, depth: int, bound: BoundType, score: float, best_move: Move | None):
+        index = (key & self.mask) << 1
+        entry = TranspositionEntry(
+            key=key,
+            depth=depth,
+            bound=bound,
+            score=score,
+            best_move=best_move,
+            generation=self.generation
+        )
+
+        deep_entry = self.slots[index]
+        if (
+            deep_entry is None
+            or deep_entry.key == key
+            or depth >= deep_entry.depth
+            or deep_entry.generation != self.generation
+        ):
+            self.slots[index] = entry
+        else:
+            self.slots[index + 1] = entry
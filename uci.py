@@ -0,0 +1,247 @@
+import sys
+import threading
+from typing import TextIO
+
+from board import Board, BoardAnalyzer
+from chess_enums import ChessPieceColor
+from chess_game_data import ChessGameData
+from computer import UNLIMITED_DEPTH, SearchLimits, get_ai_move, get_game_mode
+from exceptions import InvalidFenException
+from move import Move
+from opening_book import OpeningBook
+from search_stats import SearchStats
+from tablebase import Tablebases
+from transposition_table import TranspositionTable
+
+# nothing in here (or in what it imports) may load pygame, the engine runs
+# headless inside tournament and analysis tools
+ENGINE_NAME = 'chess-minimax'
+START_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1'
+DEFAULT_HASH_MB = 16
+MAX_THREADS = 64
+# with a clock and no "movestogo" the remaining time is split over this many moves
+DEFAULT_MOVES_TO_GO = 30
+
+
+def get_time_limit(parameters: dict[str, int], color: ChessPieceColor) -> float | None:
+    # seconds to spend on this move from the "go" parameters
+    if 'movetime' in parameters:
+        return parameters['movetime'] / 1000
+    (time_key, increment_key) = ('wtime', 'winc') if color is ChessPieceColor.WHITE else ('btime', 'binc')
+    if time_key not in parameters:
+        return None
+
+    remaining = parameters[time_key] / 1000
+    increment = parameters.get(increment_key, 0) / 1000
+    moves_to_go = parameters.get('movestogo', DEFAULT_MOVES_TO_GO)
+    # never plan to use more than half of what is left
+    return max(0.01, min(remaining / max(moves_to_go, 1) + increment / 2, remaining / 2))
+
+
+class UciEngine:
+    def __init__(self, output: TextIO = sys.stdout):
+        self.output = output
+        self.output_lock = threading.Lock()
+        self.board = Board.from_fen(START_FEN)
+        self.hash_mb = DEFAULT_HASH_MB
+        self.transposition_table = TranspositionTable(size_mb=self.hash_mb)
+        # color the table's scores were stored for, see start_search
+        self.search_color: ChessPieceColor | None = None
+        self.opening_book: OpeningBook | None = None
+        self.tablebases: Tablebases | None = None
+        self.quiescence_depth = 4
+        # worker processes splitting the root moves, 1 searches in the engine's thread
+        self.threads = 1
+        self.search_thread: threading.Thread | None = None
+        self.stop_event = threading.Event()
+
+    def send(self, line: str):
+        # the search thread and the input loop both write
+        with self.output_lock:
+            self.output.write(line + '\n')
+            self.output.flush()
+
+    def handle(self, line: str) -> bool:
+        # runs one command, returns False once the engine should exit
+        tokens = line.split()
+        if not tokens:
+            return True
+        (command, arguments) = (tokens[0], tokens[1:])
+
+        if command == 'uci':
+            self.send(f"id name {ENGINE_NAME}")
+            self.send('id author chess-minimax contributors')
+            self.send(f"option name Hash type spin default {DEFAULT_HASH_MB} min 1 max 4096")
+            self.send('option name QuiescenceDepth type spin default 4 min 0 max 32')
+            self.send(f"option name Threads type spin default 1 min 1 max {MAX_THREADS}")
+            self.send('option name BookFile type string default <empty>')
+            self.send('option name TablebasePath type string default <empty>')
+            self.send('uciok')
+        elif command == 'isready':
+            self.send('readyok')
+        elif command == 'setoption':
+            self.stop_search()
+            self.set_option(arguments)
+        elif command == 'ucinewgame':
+            self.stop_search()
+            self.transposition_table.clear()
+        elif command == 'position':
+            self.stop_search()
+            self.set_position(arguments)
+        elif command == 'go':
+            self.stop_search()
+            self.start_search(arguments)
+        elif command == 'stop':
+            self.stop_search()
+        elif command == 'quit':
+            self.stop_search()
+            return False
+        else:
+            self.send(f"info string unknown command {command}")
+
+        return True
+
+    def set_option(self, arguments: list[str]):
+        # setoption name <name> [value <value>]
+        text = ' '.join(arguments)
+        (name, _, value) = text.removeprefix('name ').partition(' value ')
+        name = name.strip().lower()
+        value = value.strip()
+        try:
+            if name == 'hash':
+                self.hash_mb = int(value)
+                self.transposition_table = TranspositionTable(size_mb=self.hash_mb)
+            elif name == 'quiescencedepth':
+                self.quiescence_depth = max(0, int(value))
+            elif name == 'threads':
+                self.threads = min(max(1, int(value)), MAX_THREADS)
+            elif name == 'bookfile':
+                if self.opening_book is not None:
+                    self.opening_book.close()
+                self.opening_book = OpeningBook(path=value) if value and value != '<empty>' else None
+            elif name == 'tablebasepath':
+                if self.tablebases is not None:
+                    self.tablebases.close()
+                self.tablebases = Tablebases(directory=value) if value and value != '<empty>' else None
+            else:
+                self.send(f"info string unknown option {name}")
+        except (OSError, ValueError) as exception:
+            self.send(f"info string can't set {name}: {exception}")
+
+    def set_position(self, arguments: list[str]):
+        # position (startpos | fen <fen>) [moves <move>...]
+        if 'moves' in arguments:
+            moves = arguments[arguments.index('moves') + 1:]
+            arguments = arguments[:arguments.index('moves')]
+        else:
+            moves = []
+
+        if arguments[:1] == ['startpos']:
+            fen = START_FEN
+        elif arguments[:1] == ['fen']:
+            fen = ' '.join(arguments[1:])
+        else:
+            self.send('info string expected startpos or fen')
+            return
+
+        try:
+            board = Board.from_fen(fen)
+        except InvalidFenException as exception:
+            self.send(f"info string {exception}")
+            return
+
+        for text in moves:
+            try:
+                move = Move.from_uci(text)
+            except ValueError:
+                move = None
+            if move is None or move not in BoardAnalyzer.get_all_valid_moves(color=board.get_side_to_move(), board=board):
+                self.send(f"info string illegal move {text}, ignoring the rest")
+                break
+            board.make_move(x1=move.x1, y1=move.y1, x2=move.x2, y2=move.y2)
+
+        self.board = board
+
+    def start_search(self, arguments: list[str]):
+        parameters: dict[str, int] = dict()
+        for (key, value) in zip(arguments, arguments[1:]):
+            if key in ('depth', 'nodes', 'movetime', 'wtime', 'btime', 'winc', 'binc', 'movestogo') and value.lstrip('-').isdigit():
+                parameters[key] = int(value)
+
+        color = self.board.get_side_to_move()
+        # minimax stores scores relative to the game mode, which follows
+        # the side to move here, so they'd be read with the wrong sign
+        if color is not self.search_color:
+            self.transposition_table.clear()
+            self.search_color = color
+        time_limit = None if 'infinite' in arguments else get_time_limit(parameters=parameters, color=color)
+        limits = SearchLimits(
+            max_depth=max(parameters['depth'], 1) if 'depth' in parameters else None,
+            time_limit=time_limit,
+            node_limit=max(parameters['nodes'], 1) if 'nodes' in parameters else None
+        )
+        game_data = ChessGameData(
+            game_mode=get_game_mode(computers_color=color),
+            board=self.board,
+            board_analyzer=BoardAnalyzer(),
+            depth=UNLIMITED_DEPTH,
+            quiescence_depth=self.quiescence_depth,
+            transposition_table=self.transposition_table,
+            opening_book=self.opening_book,
+            tablebases=self.tablebases,
+            threads=self.threads
+        )
+
+        self.stop_event = threading.Event()
+        self.search_thread = threading.Thread(
+            target=self._search,
+            args=(game_data, limits, self.stop_event, 'infinite' in arguments),
+            daemon=True
+        )
+        self.search_thread.start()
+
+    def _search(self, game_data: ChessGameData, limits: SearchLimits, stop_event: threading.Event, infinite: bool):
+        move = get_ai_move(
+            game_data=game_data,
+            limits=limits,
+            stop_event=stop_event,
+            stats=SearchStats(),
+            progress_callback=self._report
+        )
+        if infinite:
+            # UCI only allows bestmove after "stop", even if the depth cap was reached
+            stop_event.wait()
+        self.send(f"bestmove {move.to_uci() if move is not None else '0000'}")
+
+    def _report(self, stats: SearchStats):
+        if stats.score is None:
+            return
+        # minimax scores for the computer's opponent, UCI wants the side to move
+        info = (
+            f"info depth {stats.completed_depth} score cp {round(-stats.score * 100)} nodes {stats.nodes} "
+            f"time {round(stats.get_elapsed_time() * 1000)} nps {round(stats.get_nodes_per_second())}"
+        )
+        if stats.best_move is not None:
+            info += f" pv {stats.best_move.to_uci()}"
+        self.send(info)
+
+    def stop_search(self):
+        if self.search_thread is not None:
+            self.stop_event.set()
+            self.search_thread.join()
+            self.search_thread = None
+
+
+def main() -> int:
+    engine = UciEngine()
+    for line in sys.stdin:
+        if not engine.handle(line):
+            break
+    else:
+        engine.stop_search()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
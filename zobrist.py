@@ -0,0 +1,26 @@
+import random
+
+from chess_enums import ChessPieceColor, ChessPieceType
+from intefaces import IChessPiece
+
+# fixed seed so that keys (and anything cached by them) are stable
+# between runs and between processes
+_random = random.Random(0x5EED_C4E55)
+
+PIECE_KEYS: dict[tuple[ChessPieceColor, ChessPieceType], tuple[int, ...]] = {
+    (color, piece_type): tuple(_random.getrandbits(64) for _ in range(64))
+    for color in ChessPieceColor for piece_type in ChessPieceType
+}
+# xored into the hash whenever black is the side to move
+BLACK_TO_MOVE_KEY = _random.getrandbits(64)
+
+
+def get_piece_key(piece: IChessPiece, x: int, y: int) -> int:
+    return PIECE_KEYS[(piece.get_color(), piece.get_type())][x * 8 + y]
+
+def compute_hash(pieces: list[IChessPiece], side_to_move: ChessPieceColor) -> int:
+    key = BLACK_TO_MOVE_KEY if side_to_move is ChessPieceColor.BLACK else 0
+    for piece in pieces:
+        key ^= get_piece_key(piece, piece.get_row(), piece.get_col())
+    
+    return key